@@ -0,0 +1,18 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "oled-screen.py")
+
+
+@pytest.fixture(scope="session")
+def oled():
+    """oled-screen.py as a module (the file name can't be imported)."""
+    spec = importlib.util.spec_from_file_location("oled_screen", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    # registered, so its functions pickle (atlas_tile_sdfs's pool)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -1,22 +1,48 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import time
+# (stage, perf_counter() at its end) for the StartupTimeline main() reports
+STARTUP_MARKS = [("interpreter", time.perf_counter())]
+
 import moderngl
 import numpy as np
-from scipy.ndimage import distance_transform_edt as edt
-import time
 import math
 import threading
 import queue
-from collections import deque
+import asyncio
+from collections import deque, OrderedDict
+import heapq
+import itertools
+import calendar
+import re
+import urllib.parse
 import random
-import feedparser
-import requests
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
-from PIL import Image
 import os
 import subprocess
+import json
+import hashlib
+import email.utils
+import ctypes
+import errno
+import socket
+import argparse
+import struct
+import glob
+import select
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+try:
+    import tomllib
+except ImportError:       # Python < 3.11: no config file, the constants below apply
+    tomllib = None
+# feedparser, requests and PIL are imported where first used, off the path to the first frame
+STARTUP_MARKS.append(("imports", time.perf_counter()))
+import pygame
+from pygame.locals import *
+STARTUP_MARKS.append(("pygame import", time.perf_counter()))
 
 # -------------------------
 # Configuration
@@ -26,11 +52,27 @@ HEIGHT = 600 # 280
 CLOCK_W = 210
 FEED_W = WIDTH - CLOCK_W
 FPS = 30
+FPS_MIN = 8               # loop rate floor while nothing on screen moves fast
+MOTION_STEP_PX = 1.5      # largest per-frame step (pixels) that still reads as smooth motion
 SCROLL_SPEED = 20.0       # pixels per second for high-res
 MAX_TEXT_CHARS = 200
-FETCH_INTERVAL = 60.0
+FETCH_INTERVAL = 60.0     # headlines
+WEATHER_FETCH_INTERVAL = 60.0
+FETCH_TIMEOUT = 10.0      # seconds per request (connect and read each)
+FETCH_BACKOFF_BASE = 5.0  # first retry delay after a failure; doubles per consecutive failure
+FETCH_BACKOFF_MAX = 600.0
+FETCH_POOL_SIZE = 4       # keep-alive connections per host
+FETCH_QUEUE_SIZE = 8      # fetched results waiting for the render thread; the oldest is dropped when full
+HTTP_CACHE = True         # conditional GETs + on-disk response cache (CACHE_DIR/http)
+OPEN_METEO_LAG = 60.0     # seconds after a new Open-Meteo interval starts before we expect the update
+WEATHER_LOCATION = ("Warsaw", 52.23, 21.01)    # (label, latitude, longitude)
 INJECT_EVERY = 10
-MAX_RSS_PER_FETCH = 30
+MAX_RSS_PER_FETCH = 30    # per feed
+FEED_URLS = [
+    "http://feeds.bbci.co.uk/news/rss.xml",
+]
+DEDUP_TTL = 6 * 3600.0    # an item stays suppressed this long after it was last fetched
+DEDUP_CAPACITY = 100000   # hashed keys kept at most (two per item: title and link)
 
 SCROLL_H = 280
 ROW_PADDING_Y = 2
@@ -43,6 +85,7 @@ SMALL_FONT_SIZE = 18
 TINY_FONT_SIZE = 12
 LINE_H = FONT_SIZE + 2 * ROW_PADDING_Y
 ICON_SIZE = FONT_SIZE
+ATLAS_SIZES = tuple(sorted({FONT_SIZE, TINY_FONT_SIZE}, reverse=True))   # font sizes in the SDF atlas
 
 TESS_SIZE = 180
 TESS_CHANGE_INTERVAL = 5
@@ -50,9 +93,72 @@ TESS_ROT_SPEED = 0.5
 TESS_X = WIDTH - (TESS_SIZE * 0.5) - 50
 TESS_Y = (TESS_SIZE * 0.5) + 50
 
+WALLPAPER = "/home/adamh/bin/forest-3804001-1920.jpg"
+WALLPAPER_SLIDESHOW = []  # more pictures shown in turn after WALLPAPER; empty = a still wallpaper
+WALLPAPER_INTERVAL = 600.0   # seconds per slide
+WALLPAPER_FADE = 3.0      # crossfade length
+WALLPAPER_UPLOAD_ROWS = 64   # rows of the next slide uploaded per frame while it streams in
+
+DISPLAY_NAME = "HDMI-A-1"     # output (DRM connector / wlr-randr name) the panel is on
+DRM_SYSFS = "/sys/class/drm"  # connector status: <DRM_SYSFS>/card*-<DISPLAY_NAME>/status
+HOTPLUG_RECHECK = 2.0     # re-read the connector status this often even without a uevent
+HOTPLUG_SETTLE = 1.0      # a replugged output must stay connected this long before we reopen
+HOTPLUG_RETRY = 0.25      # wlr-randr retry while the compositor hasn't enabled the output yet
+
+CLOCK_ZONE = "Europe/Warsaw"
+# (label, zone, position angle on the face: 0 = right, 90 = below, 180 = left)
+SUBDIAL_ZONES = [
+    ("RI", "America/New_York", 180),
+    ("NV", "America/Los_Angeles", 0),
+    ("IND", "Asia/Calcutta", 90),
+]
+# (label, zone) listed as "LABEL HH:MM" under the digital clock, in as many columns as fit
+WORLD_CLOCK_ROWS = []
+ZONE_SEARCH_STEP = 7 * 86400.0    # transition search: probe weekly, then bisect to the second
+ZONE_SEARCH_HORIZON = 400 * 86400.0
+
 PARTICLE_COUNT = 120
 PARTICLE_SPEED = 30.0
 
+ATLAS_CHARS = " !\"#$%&'()*+,-./0123456789:;<=>?@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_`abcdefghijklmnopqrstuvwxyz{|}~°C"
+ATLAS_FONT = "dejavusans"
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "oled-screen")
+ATLAS_CACHE_VERSION = 3   # bump when build_sdf_atlas output changes
+ATLAS_WORKERS = os.cpu_count() or 1   # processes computing glyph SDF tiles on an atlas cache miss
+ATLAS_PARALLEL_TILES = 512  # fewer tiles than this are done in-process (a pool costs ~100 ms to start)
+GLYPH_CACHE_SLOTS = 64    # atlas cells for characters outside ATLAS_CHARS, rasterised on first use (LRU)
+GLYPH_RASTER_BUDGET = 2.0 # ms per frame spent rasterising new glyphs; the rest wait for the next frame
+WALLPAPER_CACHE_VERSION = 1  # bump when scale_wallpaper output changes
+# last-known-good headlines, weather and scroll position, shown at startup while the first
+# fetches are still out; None disables
+SNAPSHOT_FILE = os.path.join(CACHE_DIR, "snapshot.json")
+SNAPSHOT_VERSION = 1      # bump when SingleScroller.snapshot() changes shape
+SNAPSHOT_INTERVAL = 60.0  # seconds between saves (and one at exit)
+SNAPSHOT_MAX_AGE = 24 * 3600.0   # older snapshots are not restored
+
+TEXT_BATCHING = True      # False -> legacy path: one draw call per glyph
+TEXT_BATCH_CAPACITY = 4096  # glyph quads per atlas before an early flush
+TEXT_RUN_CACHE = True     # draw strings from GPU-resident laid-out runs
+TEXT_RUN_CACHE_SIZE = 256 # runs kept resident (LRU)
+TICKER_STRIP = True       # bake scroller rows once into a ring texture, scroll it as one quad
+
+DAMAGE_TRACKING = True    # redraw only the regions that changed into a persistent frame buffer
+DAMAGE_MAX_BOXES = 512    # more damage boxes a frame than this redraw their bounding box (particles: the frame)
+GL_STATE_FILTER = True    # skip uniform, texture-bind and line-width writes that change nothing
+SWAP_WITH_DAMAGE = True   # pass those regions to eglSwapBuffersWithDamage when the driver has it
+
+PROFILE = True            # per-phase CPU (perf_counter_ns) and GPU (timer query) frame timings
+PROFILE_WINDOW = 512      # frames kept per phase (ring buffer)
+PROFILE_INTERVAL = 60.0   # seconds between summary dumps
+PROFILE_FILE = os.path.join(CACHE_DIR, "frame-profile.json")
+# the latest summary is served to anyone connecting here (e.g. `socat - UNIX-CONNECT:<path>`); None disables
+PROFILE_SOCKET = os.path.join(os.environ.get("XDG_RUNTIME_DIR", "/tmp"), "oled-screen-profile.sock")
+
+# TOML file overriding the settings above by name (e.g. `SCROLL_SPEED = 30.0`); watched and
+# applied live, see CONFIG_LIVE. Not read in --headless runs unless given with --config.
+CONFIG_FILE = os.path.join(os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config")),
+                           "oled-screen", "config.toml")
+
 # Colors
 COLOR_WHITE = (1.0, 1.0, 1.0, 1.0)
 COLOR_GLOW = (1.0, 0.85, 0.35, 0.45)
@@ -225,127 +331,638 @@ WEATHER_MAP = {
 def get_weather_desc_and_icon(code):
     return WEATHER_MAP.get(code, ("Unknown", 'cloud'))
 
+# -------------------------
+# HTTP response cache
+# -------------------------
+class HttpCache:
+    """
+    GETs through a requests session with an on-disk cache (CACHE_DIR/http) that survives
+    restarts. A response stays fresh for Cache-Control max-age / Expires (no-cache/no-store:
+    0), or for ttl(parsed) when the headers give neither, and is served without touching
+    the network until then; after that it is revalidated with If-None-Match /
+    If-Modified-Since. A 304 (or a fresh hit) returns the parsed value kept in memory, so
+    the body is neither downloaded nor parsed.
+    """
+    def __init__(self, session, directory=None):
+        self.session = session
+        self.directory = (directory or os.path.join(CACHE_DIR, "http")) if HTTP_CACHE else None
+        self.entries = {}    # url -> {"meta": {...}, "value": parsed or None}
+        self.lock = threading.Lock()
+        self._stats = {"fresh": 0, "not_modified": 0, "downloaded": 0, "bytes_in": 0, "parse_ms": 0.0}
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest()[:32])
+
+    def _load(self, url):
+        entry = self.entries.get(url)
+        if entry is not None or self.directory is None:
+            return entry
+        try:
+            with open(self._path(url) + ".json") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+        entry = {"meta": meta, "value": None}
+        self.entries[url] = entry
+        return entry
+
+    def _store(self, url, meta, body):
+        if self.directory is None or meta.get("no_store"):
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            base = self._path(url)
+            # body first: the .json only points at a complete body
+            with open(base + ".tmp.body", "wb") as f:
+                f.write(body)
+            os.replace(base + ".tmp.body", base + ".body")
+            with open(base + ".tmp.json", "w") as f:
+                json.dump(meta, f)
+            os.replace(base + ".tmp.json", base + ".json")
+        except OSError as e:
+            print(f"HTTP cache not written: {e}")
+
+    def _value(self, url, entry, parse, body=None):
+        if entry["value"] is None:
+            if body is None:
+                with open(self._path(url) + ".body", "rb") as f:
+                    body = f.read()
+            t0 = time.perf_counter()
+            entry["value"] = parse(body)
+            with self.lock:
+                self._stats["parse_ms"] += (time.perf_counter() - t0) * 1000.0
+        return entry["value"]
+
+    @staticmethod
+    def _freshness(headers):
+        """Seconds of freshness granted by the headers; None if they say nothing."""
+        cc = [d.strip().lower() for d in headers.get("Cache-Control", "").split(",") if d.strip()]
+        if "no-store" in cc or "no-cache" in cc:
+            return 0.0
+        for d in cc:
+            if d.startswith("max-age="):
+                try:
+                    return max(0.0, float(d[8:]) - float(headers.get("Age", 0)))
+                except ValueError:
+                    return 0.0
+        if "Expires" in headers:
+            try:
+                expires = email.utils.parsedate_to_datetime(headers["Expires"]).timestamp()
+                date = email.utils.parsedate_to_datetime(headers.get("Date") or headers["Expires"]).timestamp()
+                return max(0.0, expires - date)
+            except (TypeError, ValueError):
+                return 0.0
+        return None
+
+    @staticmethod
+    def _lifetime(freshness, value, ttl):
+        """The headers' freshness; only when they say nothing, the ttl(value) hint."""
+        if freshness is None and ttl is not None:
+            freshness = ttl(value)
+        return freshness or 0.0
+
+    def get(self, url, parse, ttl=None):
+        """Parsed body of url; ttl(parsed) stands in for missing cache headers (e.g. an RSS <ttl>)."""
+        with self.lock:
+            entry = self._load(url)
+        now = time.time()
+        if entry is not None and now < entry["meta"]["expires"]:
+            try:
+                value = self._value(url, entry, parse)
+                with self.lock:
+                    self._stats["fresh"] += 1
+                return value
+            except (OSError, ValueError):
+                self._forget(url)
+                entry = None
+
+        headers = {}
+        if entry is not None:
+            if entry["meta"].get("etag"):
+                headers["If-None-Match"] = entry["meta"]["etag"]
+            if entry["meta"].get("last_modified"):
+                headers["If-Modified-Since"] = entry["meta"]["last_modified"]
+        resp = self.session.get(url, headers=headers, timeout=FETCH_TIMEOUT)
+        freshness = self._freshness(resp.headers)
+        no_store = "no-store" in resp.headers.get("Cache-Control", "").lower()
+        if resp.status_code == 304 and entry is not None:
+            try:
+                value = self._value(url, entry, parse)
+            except (OSError, ValueError):
+                # the cached body went missing or is unreadable: forget it, fetch unconditionally
+                self._forget(url)
+                return self.get(url, parse, ttl)
+            meta = entry["meta"]
+            meta["etag"] = resp.headers.get("ETag", meta.get("etag"))
+            meta["last_modified"] = resp.headers.get("Last-Modified", meta.get("last_modified"))
+            meta["expires"] = now + self._lifetime(freshness, value, ttl)
+            self._store_meta(url, meta)
+            with self.lock:
+                self._stats["not_modified"] += 1
+            return value
+        resp.raise_for_status()
+
+        body = resp.content
+        entry = {"meta": {"url": url, "etag": resp.headers.get("ETag"),
+                          "last_modified": resp.headers.get("Last-Modified"), "no_store": no_store},
+                 "value": None}
+        value = self._value(url, entry, parse, body)
+        entry["meta"]["expires"] = now + self._lifetime(freshness, value, ttl)
+        with self.lock:
+            self._stats["downloaded"] += 1
+            try:
+                self._stats["bytes_in"] += resp.raw.tell() or len(body)   # on the wire, i.e. still gzipped
+            except (AttributeError, ValueError):
+                self._stats["bytes_in"] += len(body)
+            if not no_store:
+                self.entries[url] = entry
+        self._store(url, entry["meta"], body)
+        return value
+
+    def _forget(self, url):
+        with self.lock:
+            self.entries.pop(url, None)
+        if self.directory is not None:
+            try:
+                os.remove(self._path(url) + ".json")
+            except OSError:
+                pass
+
+    def _store_meta(self, url, meta):
+        if self.directory is None or meta.get("no_store"):
+            return
+        try:
+            base = self._path(url)
+            with open(base + ".tmp.json", "w") as f:
+                json.dump(meta, f)
+            os.replace(base + ".tmp.json", base + ".json")
+        except OSError as e:
+            print(f"HTTP cache not written: {e}")
+
+    def stats(self):
+        with self.lock:
+            return dict(self._stats, parse_ms=round(self._stats["parse_ms"], 1))
+
 # -------------------------
 # Fetchers
 # -------------------------
-def fetch_headlines(url="http://feeds.bbci.co.uk/news/rss.xml", max_items=20):
-    try:
-        feed = feedparser.parse(url)
-        return [entry.title for entry in feed.entries[:max_items]]
-    except Exception:
-        return []
+def parse_feed(body):
+    import feedparser    # on the fetch workers
+    return feedparser.parse(body)
 
-def fetch_weather_warsaw():
+def rss_ttl(feed):
+    """The channel's <ttl> (minutes) in seconds."""
+    try:
+        return float(feed.feed.get("ttl")) * 60.0
+    except (TypeError, ValueError):
+        return None
+
+def open_meteo_ttl(data):
+    """Seconds until Open-Meteo publishes the next current_weather interval (default 15 min)."""
+    cw = data.get("current_weather", {})
+    interval = float(cw.get("interval") or 900)
+    try:
+        observed = datetime.fromisoformat(cw["time"]).replace(tzinfo=timezone.utc).timestamp()
+        observed -= float(data.get("utc_offset_seconds", 0))
+    except (KeyError, TypeError, ValueError):
+        observed = time.time() // interval * interval
+    remaining = observed + interval + OPEN_METEO_LAG - time.time()
+    return remaining if remaining > 0 else None
+
+# Both raise on network/HTTP errors; FetchScheduler owns retries. http: a shared HttpCache.
+def fetch_feed(url, max_items, http):
+    """[(published epoch, title, link)] of an RSS/Atom feed; undated entries keep feed order."""
+    feed = http.get(url, parse_feed, ttl=rss_ttl)
+    now = time.time()
+    items = []
+    for i, entry in enumerate(feed.entries[:max_items]):
+        stamp = entry.get("published_parsed") or entry.get("updated_parsed")
+        published = calendar.timegm(stamp) if stamp else now - i
+        items.append((published, entry.get("title", ""), entry.get("link", "")))
+    return items
+
+def fetch_weather_warsaw(http):
+    place, lat, lon = WEATHER_LOCATION
     url = ("https://api.open-meteo.com/v1/forecast?"
-           "latitude=52.23&longitude=21.01&current_weather=true&timezone=Europe/Warsaw")
+           f"latitude={lat:.2f}&longitude={lon:.2f}&current_weather=true&timezone=auto")
+    cw = http.get(url, json.loads, ttl=open_meteo_ttl).get("current_weather", {})
+    temp = cw.get("temperature")
+    wind = cw.get("windspeed")
+    code = cw.get("weathercode", 0)
+    desc, icon = get_weather_desc_and_icon(code)
+    if temp is not None and wind is not None:
+        txt = f"{place}: {temp:.1f}°C, Wind {wind:.1f} km/h, {desc}"
+    else:
+        txt = f"{place}: {desc}"
+    if len(txt) > 128:
+        txt = txt[:124] + "."
+    return txt, icon
+
+# -------------------------
+# Feed item dedup
+# -------------------------
+_WORDS = re.compile(r"\w+")
+_TRACKING_PARAMS = ("utm_", "at_", "ns_")
+
+def normalise_title(title):
+    return " ".join(_WORDS.findall(title.casefold()))
+
+def normalise_link(link):
+    """Scheme, www., fragment, trailing slash and tracking parameters don't make a new item."""
+    parts = urllib.parse.urlsplit(link.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    query = "&".join(p for p in parts.query.split("&") if p and not p.startswith(_TRACKING_PARAMS))
+    return host + parts.path.rstrip("/") + ("?" + query if query else "")
+
+class DedupIndex:
+    """
+    Recently seen feed items, keyed by 8-byte hashes of the normalised title and link. An
+    item counts as seen if either key is present. Keys expire DEDUP_TTL after they were last
+    seen; insertion order is expiry order, so expiry is O(1) per key and the index never
+    exceeds `capacity` keys.
+    """
+    def __init__(self, ttl=DEDUP_TTL, capacity=DEDUP_CAPACITY):
+        self.ttl = ttl
+        self.capacity = capacity
+        self.keys = OrderedDict()    # key -> last seen
+
+    @staticmethod
+    def _key(text):
+        return hashlib.blake2b(text.encode(), digest_size=8).digest()
+
+    def seen(self, title, link, now=None):
+        """True if the item was seen within the TTL; either way it is marked seen now."""
+        now = time.time() if now is None else now
+        keys = [self._key("t:" + normalise_title(title))]
+        if link:
+            keys.append(self._key("l:" + normalise_link(link)))
+        dup = any(key in self.keys for key in keys)
+        for key in keys:
+            self.keys[key] = now
+            self.keys.move_to_end(key)
+        while self.keys:
+            key, last = next(iter(self.keys.items()))
+            if now - last < self.ttl and len(self.keys) <= self.capacity:
+                break
+            self.keys.popitem(last=False)
+        return dup
+
+    def __len__(self):
+        return len(self.keys)
+
+# -------------------------
+# Fetch scheduler
+# -------------------------
+class FetchScheduler:
+    """
+    Runs every source on its own schedule in an asyncio loop on a background thread.
+    sources: {name: (fetch, interval)}, fetch(http) being a blocking call. Fetches run
+    concurrently (asyncio.to_thread) over one keep-alive connection pool, each bounded by
+    FETCH_TIMEOUT; failures back off exponentially with jitter. Results go to `results`, a
+    bounded queue of (name, value) the render thread drains. stats() has per-source
+    latency and failure counters. fetch is called with `http`, an HttpCache on the pool.
+    """
+    def __init__(self, sources):
+        self.sources = sources
+        # room for one pending result per source on top, so coalescing below can't overflow
+        self.results = queue.Queue(maxsize=FETCH_QUEUE_SIZE + len(sources))
+        # the session is made on the scheduler thread (see _run); nothing fetches before that
+        self.session = None
+        self.http = HttpCache(None)
+        self._stats = {name: self._new_stats() for name in sources}
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self._first_pending = len(sources)
+        self._first_round = threading.Event()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def _new_stats():
+        return {"ok": 0, "failed": 0, "timeouts": 0, "dropped": 0, "consecutive_failures": 0,
+                "last_ms": None, "mean_ms": None, "max_ms": None, "last_error": None}
+
+    def _run(self):
+        import requests    # here, so its import overlaps the render thread's startup
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=FETCH_POOL_SIZE, pool_maxsize=FETCH_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.http.session = self.session
+        asyncio.set_event_loop(self.loop)
+        for name, (fetch, interval) in self.sources.items():
+            self._tasks[name] = self.loop.create_task(self._source_loop(name, fetch, interval, first=True))
+        self.loop.run_forever()
+        self.loop.close()
+
+    def update(self, sources, restart=()):
+        """
+        Switch to a new {name: (fetch, interval)}. Sources that are new, have a new interval
+        or are named in `restart` start over (fetching right away), removed ones are
+        cancelled, the rest keep their schedule and statistics. Callable from any thread.
+        """
+        def apply():
+            for name in list(self._tasks):
+                if name not in sources or name in restart or sources[name][1] != self.sources[name][1]:
+                    self._tasks.pop(name).cancel()
+            with self._lock:
+                self._stats = {name: self._stats.get(name) or self._new_stats() for name in sources}
+            for name, (fetch, interval) in sources.items():
+                if name not in self._tasks:
+                    self._tasks[name] = self.loop.create_task(self._source_loop(name, fetch, interval))
+            self.sources = sources
+        with self.results.mutex:
+            self.results.maxsize = max(self.results.maxsize, FETCH_QUEUE_SIZE + len(sources))
+        self.loop.call_soon_threadsafe(apply)
+
+    def wait_first_round(self, timeout=FETCH_TIMEOUT + 1.0):
+        """Block until every source finished its first attempt (or timeout)."""
+        self._first_round.wait(timeout)
+
+    async def _source_loop(self, name, fetch, interval, first=False):
+        while True:
+            ok = await self._fetch_once(name, fetch)
+            if first:
+                first = False
+                with self._lock:
+                    self._first_pending -= 1
+                    if self._first_pending == 0:
+                        self._first_round.set()
+            failures = self._stats[name]["consecutive_failures"]
+            if ok:
+                delay = interval
+            else:
+                backoff = min(FETCH_BACKOFF_MAX, FETCH_BACKOFF_BASE * 2 ** (failures - 1))
+                delay = backoff / 2.0 + random.uniform(0.0, backoff / 2.0)
+                print(f"Fetch {name} failed {failures}x ({self._stats[name]['last_error']}); retry in {delay:.0f} s")
+            await asyncio.sleep(delay)
+
+    async def _fetch_once(self, name, fetch):
+        t0 = time.perf_counter()
+        error = None
+        try:
+            # the request's own timeouts end the worker thread; this bounds the wait for it
+            value = await asyncio.wait_for(asyncio.to_thread(fetch, self.http), FETCH_TIMEOUT * 2)
+        except asyncio.TimeoutError:
+            error = "timeout"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        ms = (time.perf_counter() - t0) * 1000.0
+        with self._lock:
+            st = self._stats[name]
+            st["last_ms"] = round(ms, 1)
+            st["max_ms"] = round(max(ms, st["max_ms"] or 0.0), 1)
+            if error is None:
+                st["ok"] += 1
+                st["consecutive_failures"] = 0
+                st["mean_ms"] = round(ms if st["mean_ms"] is None else st["mean_ms"] + (ms - st["mean_ms"]) / st["ok"], 1)
+            else:
+                st["failed"] += 1
+                st["timeouts"] += error == "timeout"
+                st["consecutive_failures"] += 1
+                st["last_error"] = error[:200]
+        if error is None:
+            self._hand_off(name, value)
+        return error is None
+
+    def _hand_off(self, name, value):
+        try:
+            self.results.put_nowait((name, value))
+            return
+        except queue.Full:
+            pass
+        # render thread is behind: keep only the newest pending result of each source
+        # (this thread is the only producer, so the re-put below cannot overflow)
+        pending = {}
+        while True:
+            try:
+                source, old = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if source in pending:
+                with self._lock:
+                    self._stats[source]["dropped"] += 1
+                del pending[source]
+            pending[source] = old
+        if name in pending:
+            with self._lock:
+                self._stats[name]["dropped"] += 1
+            del pending[name]
+        pending[name] = value
+        for item in pending.items():
+            self.results.put_nowait(item)
+
+    def stats(self):
+        with self._lock:
+            return {name: dict(st) for name, st in self._stats.items()}
+
+    async def _shutdown(self):
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.loop.stop()
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop)
+        self.thread.join(timeout=2)
+        if self.session is not None:
+            self.session.close()
+
+# -------------------------
+# Startup snapshot
+# -------------------------
+def load_snapshot(path):
+    """The dict store_snapshot() wrote to path, or None if there is none (or it is damaged)."""
     try:
-        resp = requests.get(url, timeout=5).json()
-        cw = resp.get("current_weather", {})
-        temp = cw.get("temperature")
-        wind = cw.get("windspeed")
-        code = cw.get("weathercode", 0)
-        desc, icon = get_weather_desc_and_icon(code)
-        if temp is not None and wind is not None:
-            txt = f"Warsaw: {temp:.1f}°C, Wind {wind:.1f} km/h, {desc}"
-        else:
-            txt = f"Warsaw: {desc}"
-        if len(txt) > 128:
-            txt = txt[:124] + "."
-        return txt, icon
-    except Exception:
-        return "Weather fetch error", 'cloud'
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Snapshot: {path}: {e}")
+        return None
+    if not isinstance(data, dict):
+        print(f"Snapshot: {path}: not an object ({type(data).__name__}), ignored")
+        return None
+    return data
+
+def store_snapshot(path, data):
+    """Write data as compact JSON, replacing path atomically so a power cut leaves the old one."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"Snapshot not written: {e}")
 
 class SingleScroller:
-    def __init__(self, area_width, area_height, inject_every=INJECT_EVERY, max_rss_per_fetch=MAX_RSS_PER_FETCH, speed=SCROLL_SPEED):
+    def __init__(self, area_width, area_height, inject_every=INJECT_EVERY, max_rss_per_fetch=MAX_RSS_PER_FETCH, speed=SCROLL_SPEED,
+                 feeds=FEED_URLS, fetch_feed=fetch_feed, fetch_weather=fetch_weather_warsaw, snapshot=None):
+        """
+        snapshot: file the state is restored from now and saved to by save_snapshot(); with
+        one the constructor doesn't wait for the network. None waits for the first fetches.
+        """
         self.width = area_width
         self.height = area_height
         self.inject_every = max(1, int(inject_every))
         self.max_rss_per_fetch = max_rss_per_fetch
         self.speed = speed
         self.offset = 0.0                # pixel offset into the first visual row
+        self.fetch_feed = fetch_feed
+        self.fetch_weather = fetch_weather
         self.line_h = LINE_H
         self.visible_rows = max(1, self.height // self.line_h)
 
-        # SOURCE: only RSS items waiting to be displayed (leftmost = oldest)
+        # SOURCE: only RSS items waiting to be displayed, (published, title) by publish time
         self.rows = deque()
 
         # VISUAL: rows currently on screen (or partially below it).
         # Items are tuples: ('rss', title, icon) or ('weather', text, icon)
         self.visual = deque()
+        # rows popped off the top so far: visual[i] is row number head + i for its whole life
+        self.head = 0
 
-        # producer queue & thread
-        self.feed_queue = queue.Queue()
-        self._stop_event = threading.Event()
-        self.producer_thread = threading.Thread(target=self._producer_loop, daemon=True)
-        self.producer_thread.start()
+        # background fetches; feed_queue is the scheduler's bounded hand-off of (source, result)
+        self.fetcher = FetchScheduler(self._sources(feeds))
+        self.feed_queue = self.fetcher.results
 
-        # dedupe set only for `rows`
-        self.titles = set()
+        # items already queued, shown or recently scrolled off, across all feeds
+        self.dedup = DedupIndex(DEDUP_TTL, DEDUP_CAPACITY)
         self.skip = {"no feed items", "bbc news app", "play now"}
         self.latest_weather = None
 
         # how many RSS rows were moved into visual since the last weather injection
         self.rss_since_weather = 0
 
+        # called with the drawn text of a row once it has scrolled off and is not on screen twice
+        self.on_row_evicted = None
+
+        # icon -> ((atlas key, colour), ...) per layer; cleared when the icon colours change
+        self.icon_layers = {}
+
         # reasonable capacity for rows buffer
         self.capacity = max(4, 4 * self.visible_rows + self.max_rss_per_fetch)
 
-        # seed latest weather and initial headlines
-        try:
-            wtxt, wicon = fetch_weather_warsaw()
-        except Exception:
-            wtxt, wicon = "Weather fetch error", 'cloud'
-        self.latest_weather = (wtxt, wicon)
-
-        headlines = fetch_headlines(max_items=self.max_rss_per_fetch)
-        for title in headlines[::-1]:
-            if title:
-                self.feed_queue.put((title, 'rss'))
-
-    def _producer_loop(self):
-        while not self._stop_event.is_set():
-            # keep weather cached
+        # last-known-good state: shown at once, replaced as fresh items arrive
+        self.snapshot_path = snapshot
+        self.restored = None         # (age in seconds, rows) of the snapshot restored
+        if snapshot is not None:
             try:
-                wtxt, wicon = fetch_weather_warsaw()
-            except Exception:
-                wtxt, wicon = "Weather fetch error", 'cloud'
-            self.latest_weather = (wtxt, wicon)
-
-            # fetch headlines and enqueue them for the main thread to drain
-            headlines = fetch_headlines(max_items=self.max_rss_per_fetch)
-            for title in headlines[::-1]:
-                if not title:
-                    continue
-                self.feed_queue.put((title, 'rss'))
-
-            time.sleep(FETCH_INTERVAL)
+                self.restore(load_snapshot(snapshot))
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Snapshot: {snapshot}: unreadable ({e!r}), starting empty")
+        else:
+            # seed latest weather and initial headlines: every source's first (concurrent) attempt
+            self.fetcher.wait_first_round()
+            self._drain_feed_queue_to_rows()
+            if self.latest_weather is None:
+                self.latest_weather = ("Weather fetch error", 'cloud')
+
+    def snapshot(self):
+        """The state worth keeping across a restart, as JSON-ready values."""
+        return {
+            "version": SNAPSHOT_VERSION,
+            "saved": round(time.time()),
+            "weather": self.latest_weather,
+            "rows": list(self.rows),
+            "visual": list(self.visual),
+            "offset": round(self.offset, 1),
+            "rss_since_weather": self.rss_since_weather,
+        }
+
+    def restore(self, data):
+        """Take over a snapshot() unless it is missing, from another version or too old."""
+        if not data or data.get("version") != SNAPSHOT_VERSION:
+            return
+        age = max(0.0, time.time() - data["saved"])
+        if age > SNAPSHOT_MAX_AGE:
+            print(f"Snapshot: {age / 3600.0:.0f} h old, not restored")
+            return
+        weather = tuple(data["weather"]) if data["weather"] is not None else None
+        rows = deque((float(published), str(title)) for published, title in data["rows"][-self.capacity:])
+        visual = deque((str(kind), str(text), str(icon)) for kind, text, icon in data["visual"])
+        offset = min(float(data["offset"]), self.line_h - 1.0)
+        since_weather = int(data["rss_since_weather"])
+        self.latest_weather, self.rows, self.visual, self.offset = weather, rows, visual, offset
+        self.rss_since_weather = since_weather
+        # the feeds will bring the same items again
+        for _, title in self.rows:
+            self.dedup.seen(title, None)
+        for kind, title, _ in self.visual:
+            if kind == 'rss':
+                self.dedup.seen(title, None)
+        self.restored = (age, len(self.rows) + len(self.visual))
+
+    def save_snapshot(self):
+        if self.snapshot_path is not None:
+            store_snapshot(self.snapshot_path, self.snapshot())
 
     def stop(self):
-        self._stop_event.set()
-        self.producer_thread.join(timeout=2)
+        self.fetcher.stop()
+
+    def _sources(self, feeds):
+        sources = {'weather': (lambda http: self.fetch_weather(http=http), WEATHER_FETCH_INTERVAL)}
+        for url in feeds:
+            sources['feed:' + url] = (lambda http, url=url: self.fetch_feed(url, self.max_rss_per_fetch, http=http),
+                                      FETCH_INTERVAL)
+        return sources
+
+    def set_sources(self, feeds, restart=()):
+        """Fetch `feeds` (and weather) at the current intervals; unchanged sources keep running."""
+        self.fetcher.update(self._sources(feeds), restart)
+
+    def set_line_height(self, line_h):
+        self.line_h = line_h
+        self.visible_rows = max(1, self.height // self.line_h)
+        self.capacity = max(4, 4 * self.visible_rows + self.max_rss_per_fetch)
+        self.offset = min(self.offset, line_h - 1.0)
 
     def _drain_feed_queue_to_rows(self):
         """
-        Move items from feed_queue into rows (right side). Deduplicate by title.
-        titles set tracks only what is in `rows`.
+        Move new items from feed_queue into rows, merged by publish time. Items the dedup
+        index has seen (same normalised title or link, any feed) are dropped.
         """
+        fresh = []
         while not self.feed_queue.empty():
             try:
-                item = self.feed_queue.get_nowait()
+                source, result = self.feed_queue.get_nowait()
             except queue.Empty:
                 break
-            title = item[0].strip() if isinstance(item[0], str) else item[0]
-            if not title or title.lower() in self.skip:
-                continue
-            if title in self.titles:
-                # skip duplicate in rows
+            if source == 'weather':
+                self.latest_weather = result
                 continue
-            self.rows.append((title, 'rss'))
-            self.titles.add(title)
-            # enforce capacity (drop the oldest if over)
-            if len(self.rows) > self.capacity:
-                old = self.rows.popleft()
-                self.titles.discard(old[0] if isinstance(old[0], str) else old[0])
+            for published, title, link in result:
+                title = title.strip()
+                if not title or title.lower() in self.skip or self.dedup.seen(title, link):
+                    continue
+                fresh.append((published, title))
+        if not fresh:
+            return
+        fresh.sort()
+        if not any(kind == 'rss' and title != 'no feed items' for kind, title, _ in self.visual):
+            # only placeholders on screen (nothing had arrived yet): start over with the news
+            self._restart_visual()
+        self.rows = deque(heapq.merge(self.rows, fresh))
+        # enforce capacity (drop the oldest if over)
+        while len(self.rows) > self.capacity:
+            self.rows.popleft()
+
+    def _restart_visual(self):
+        """Drop every row on screen; the next fill starts at the top under new row numbers."""
+        dropped = {text for _, text, _ in self.visual}
+        self.head += len(self.visual)
+        self.visual.clear()
+        self.offset = 0.0
+        # placeholders re-seeded for the cyclic repeat
+        self.rows = deque(row for row in self.rows if row[1] != 'no feed items')
+        if self.on_row_evicted is not None:
+            for text in dropped:
+                self.on_row_evicted(self.display_text(text))
 
     def _ensure_visual_filled(self):
         """
@@ -369,10 +986,7 @@ class SingleScroller:
 
             # Prefer to take one RSS from rows (source) if available
             if len(self.rows) > 0:
-                title, kind = self.rows.popleft()
-                if isinstance(title, str):
-                    # title lived in rows -> remove from dedupe set
-                    self.titles.discard(title)
+                _, title = self.rows.popleft()
                 icon = 'rss'
                 self.visual.append(('rss', title, icon))
                 self.rss_since_weather += 1
@@ -385,8 +999,7 @@ class SingleScroller:
                 if len(rss_from_visual) > 0:
                     # copy them back into rows so the stream repeats
                     for (_, title, _) in rss_from_visual:
-                        self.rows.append((title, 'rss'))
-                        self.titles.add(title)
+                        self.rows.append((0.0, title))
                     # loop will then consume from rows in next iteration
                     continue
                 else:
@@ -421,77 +1034,142 @@ class SingleScroller:
             popped = self.visual.popleft()
             # popped rss/weather simply leave visual — rows were already removed earlier
             self.offset -= self.line_h
+            self.head += 1
+            if self.on_row_evicted is not None and all(v[1] != popped[1] for v in self.visual):
+                self.on_row_evicted(self.display_text(popped[1]))
 
         # refill bottom as needed (and possibly inject weather)
         self._ensure_visual_filled()
 
-    def render(self, glyph_uvs_main, atlas_size_main, sdf_prog, quad_vao, render_sdf_text):
-        line_h = self.line_h
-        offset = self.offset
+    @staticmethod
+    def display_text(text):
+        return text if len(text) <= MAX_TEXT_CHARS else text[:MAX_TEXT_CHARS - 1] + '…'
 
-        total_h = len(self.visual) * line_h
+    def base_offset(self):
         # if visual shorter than screen, anchor to top (don't shift)
-        base_offset = offset if total_h > self.height else 0.0
+        return self.offset if len(self.visual) * self.line_h > self.height else 0.0
+
+    def view(self):
+        """What render() draws from; equal views give identical pixels."""
+        return self.base_offset(), tuple(self.visual)
+
+    def render(self, glyph_uvs, atlas_h, emit_icon, render_sdf_text):
+        base_offset = self.base_offset()
 
         for idx, item in enumerate(self.visual):
-            y_pos = idx * line_h - base_offset
+            y_pos = idx * self.line_h - base_offset
 
             # stop when beyond screen
             if y_pos > HEIGHT:
                 break
+            self.render_row(item, y_pos, glyph_uvs, atlas_h, emit_icon, render_sdf_text)
 
-            kind, text, icon = item[0], item[1], item[2]
+    def render_row(self, item, y_pos, glyph_uvs, atlas_h, emit_icon, render_sdf_text):
+        """One visual row (icon layers and text) with its top edge at y_pos."""
+        line_h = self.line_h
+        kind, text, icon = item[0], item[1], item[2]
 
-            # --- render icon layers if present ---
+        # --- render icon layers if present ---
+        layers = self.icon_layers.get(icon)
+        if layers is None:
             if icon in ICON_LAYER_COLORS:
-                for v, col in ICON_LAYER_COLORS[icon].items():
-                    icon_key = 'icon:' + icon + ':' + str(v)
-                    if icon_key in glyph_uvs_main:
-                        u1, v1, u2, v2 = glyph_uvs_main[icon_key]
-                        icon_h = int((v2 - v1) * atlas_size_main)
-                        icon_y = y_pos + (line_h - icon_h) / 2.0
-                        sdf_prog['position'].value = (CLOCK_W + LEFT_PAD, icon_y)
-                        sdf_prog['size'].value = (ICON_SIZE, ICON_SIZE)
-                        sdf_prog['uv_offset'].value = (u1, v1)
-                        sdf_prog['uv_size'].value = (u2 - u1, v2 - v1)
-                        sdf_prog['text_color'].value = (col[0], col[1], col[2], 1.0)
-                        sdf_prog['glow_color'].value = (col[0], col[1], col[2], 0.35)
-                        sdf_prog['threshold'].value = 0.5
-                        sdf_prog['edge'].value = 0.02
-                        sdf_prog['glow_size'].value = 0.12
-                        quad_vao.render(moderngl.TRIANGLE_STRIP)
+                layers = tuple(('icon:' + icon + ':' + str(v), col) for v, col in ICON_LAYER_COLORS[icon].items())
             else:
-                icon_key = 'icon:' + icon
-                if icon_key in glyph_uvs_main:
-                    u1, v1, u2, v2 = glyph_uvs_main[icon_key]
-                    icon_h = int((v2 - v1) * atlas_size_main)
-                    icon_y = y_pos + (line_h - icon_h) / 2.0
-                    sdf_prog['position'].value = (CLOCK_W + LEFT_PAD, icon_y)
-                    sdf_prog['size'].value = (ICON_SIZE, ICON_SIZE)
-                    sdf_prog['uv_offset'].value = (u1, v1)
-                    sdf_prog['uv_size'].value = (u2 - u1, v2 - v1)
-                    sdf_prog['text_color'].value = (ICON_COLORS.get(icon, COLOR_WHITE)[0],
-                                                    ICON_COLORS.get(icon, COLOR_WHITE)[1],
-                                                    ICON_COLORS.get(icon, COLOR_WHITE)[2], 1.0)
-                    sdf_prog['glow_color'].value = (ICON_COLORS.get(icon, COLOR_WHITE)[0],
-                                                    ICON_COLORS.get(icon, COLOR_WHITE)[1],
-                                                    ICON_COLORS.get(icon, COLOR_WHITE)[2], 0.35)
-                    sdf_prog['threshold'].value = 0.5
-                    sdf_prog['edge'].value = 0.02
-                    sdf_prog['glow_size'].value = 0.12
-                    quad_vao.render(moderngl.TRIANGLE_STRIP)
-
-            # --- render text ---
-            txt_x = CLOCK_W + LEFT_PAD + ICON_SIZE + GAP_ICON_TEXT
-            text_to_draw = text if len(text) <= MAX_TEXT_CHARS else text[:MAX_TEXT_CHARS - 1] + '…'
-            render_sdf_text(text_to_draw, txt_x, y_pos + ROW_PADDING_Y, font_h=FONT_SIZE,
-                            text_color=(1.0, 1.0, 1.0, 1.0),
-                            glow_color=(0.9, 0.8, 0.4, 0.12))
+                layers = (('icon:' + icon, ICON_COLORS.get(icon, COLOR_WHITE)),)
+            self.icon_layers[icon] = layers
+        for icon_key, col in layers:
+            if icon_key in glyph_uvs:
+                u1, v1, u2, v2 = glyph_uvs[icon_key]
+                icon_h = int(round((v2 - v1) * atlas_h))
+                icon_y = y_pos + (line_h - icon_h) / 2.0
+                emit_icon(icon_key, CLOCK_W + LEFT_PAD, icon_y, col)
+
+        # --- render text ---
+        txt_x = CLOCK_W + LEFT_PAD + ICON_SIZE + GAP_ICON_TEXT
+        render_sdf_text(self.display_text(text), txt_x, y_pos + ROW_PADDING_Y, font_h=FONT_SIZE,
+                        text_color=(1.0, 1.0, 1.0, 1.0),
+                        glow_color=(0.9, 0.8, 0.4, 0.12))
+
+# -------------------------
+# World clock
+# -------------------------
+class WorldClock:
+    """
+    Wall time in any number of zones for the price of an addition. Each zone's UTC offset is
+    resolved once and cached until its next transition (DST change or rule change), found by
+    probing the zone's offset forward and bisecting; frames in between never touch tzdata.
+    Unknown zones fall back to the system local time, with a warning once.
+    """
+    def __init__(self):
+        self.cache = {}    # zone -> (offset seconds, valid from, valid until)
+        self.resolves = 0
+
+    @staticmethod
+    def _utcoffset(tz, t):
+        return datetime.fromtimestamp(t, tz).utcoffset().total_seconds()
+
+    def _resolve(self, zone, now_t):
+        self.resolves += 1
+        try:
+            tz = ZoneInfo(zone)
+        except Exception as e:
+            if zone not in self.cache:
+                print(f"World clock: {zone}: {e}; using local time")
+            # local time has its own transitions; look again on the next hour
+            return time.localtime(now_t).tm_gmtoff, now_t, (now_t // 3600 + 1) * 3600
+        offset = self._utcoffset(tz, now_t)
+        # transitions fall on whole seconds: bisect integers so `hi` lands exactly on one
+        lo = math.floor(now_t)
+        hi = None
+        while lo - now_t < ZONE_SEARCH_HORIZON:
+            probe = lo + int(ZONE_SEARCH_STEP)
+            if self._utcoffset(tz, probe) != offset:
+                hi = probe
+                break
+            lo = probe
+        if hi is None:
+            return offset, now_t, lo
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if self._utcoffset(tz, mid) == offset:
+                lo = mid
+            else:
+                hi = mid
+        return offset, now_t, hi
+
+    def offset(self, zone, now_t):
+        entry = self.cache.get(zone)
+        if entry is None or not entry[1] <= now_t < entry[2]:
+            entry = self._resolve(zone, now_t)
+            self.cache[zone] = entry
+        return entry[0]
+
+    def local(self, zone, now_t):
+        """Local wall-clock seconds since the epoch (whole seconds), as for time.gmtime()."""
+        return math.floor(now_t) + int(self.offset(zone, now_t))
+
+    def hms(self, zone, now_t):
+        t = self.local(zone, now_t) % 86400
+        return t // 3600, t // 60 % 60, t % 60
+
+    def angles(self, zone, now_t):
+        """Hour, minute and second hand angles in degrees clockwise from 12."""
+        h, m, s = self.hms(zone, now_t)
+        minute = m + s / 60.0
+        return (h % 12 + minute / 60.0) * 30.0, minute * 6.0, s * 6.0
+
+    def strftime(self, fmt, zone, now_t):
+        return time.strftime(fmt, time.gmtime(self.local(zone, now_t)))
 
 # -------------------------
 # Tesseract (enhanced)
 # -------------------------
 class Tesseract:
+    """
+    4D hypercube. The 32 edges are uploaded once; each frame only the accumulated 4D
+    rotation is sent (one mat4 uniform). Projection, shadow offset and the inner/outer
+    colour split by w all happen in VERT_TESS.
+    """
     def __init__(self, size=TESS_SIZE, change_interval=TESS_CHANGE_INTERVAL, rot_speed=TESS_ROT_SPEED):
         self.size = size
         self.scale = float(size) / 4.0
@@ -502,217 +1180,548 @@ class Tesseract:
         self._eps = 0.1
         self.planes = [(0,1),(0,2),(0,3),(1,2),(1,3),(2,3)]
         self.plane = random.choice(self.planes)
-        self.last_change = time.time()
-        self.vertices = [[float(x), float(y), float(z), float(w)]
-                         for x in (-1.0,1.0) for y in (-1.0,1.0) for z in (-1.0,1.0) for w in (-1.0,1.0)]
-        self.edges = []
-        for i in range(len(self.vertices)):
-            for j in range(i+1, len(self.vertices)):
-                diff = sum(abs(self.vertices[i][k] - self.vertices[j][k]) for k in range(4))
-                if abs(diff - 2.0) < 1e-6:
-                    self.edges.append((i,j))
+        self.since_change = 0.0
+        self.vertices = np.array([[x, y, z, w] for x in (-1.0,1.0) for y in (-1.0,1.0)
+                                  for z in (-1.0,1.0) for w in (-1.0,1.0)], 'f8')
+        # edges join vertices that differ in exactly one coordinate
+        differ = (self.vertices[:, None, :] != self.vertices[None, :, :]).sum(axis=2)
+        self.edges = np.argwhere(np.triu(differ == 1))
+        # accumulated rotation: current vertex = rotation @ original vertex
+        self.rotation = np.eye(4)
+        self.vao = None
 
     def rotate(self, plane, dangle):
         c = math.cos(dangle)
         s = math.sin(dangle)
         i, j = plane
-        for v in self.vertices:
-            vi = v[i]
-            vj = v[j]
-            v[i] = vi * c - vj * s
-            v[j] = vi * s + vj * c
-
-    def project_4d_to_3d(self, v):
-        denom = self.camera4 - v[3]
-        if denom < self._eps:
-            denom = self._eps
-        factor = self.camera4 / denom
-        return [v[0]*factor, v[1]*factor, v[2]*factor]
-
-    def project_3d_to_2d(self, p):
-        denom = self.camera3 - p[2]
-        if denom < self._eps:
-            denom = self._eps
-        factor = self.camera3 / denom
-        return [p[0]*factor, p[1]*factor]
+        step = np.eye(4)
+        step[i, i] = c
+        step[i, j] = -s
+        step[j, i] = s
+        step[j, j] = c
+        self.rotation = step @ self.rotation
 
     def update(self, dt):
         self.rotate(self.plane, self.rot_speed * dt)
-        if time.time() - self.last_change > self.change_interval:
+        self.since_change += dt
+        if self.since_change > self.change_interval:
             self.plane = random.choice(self.planes)
-            self.last_change = time.time()
-
-    def render(self, ctx, line_prog):
-        proj3ds = [self.project_4d_to_3d(v) for v in self.vertices]
-        proj2ds = [self.project_3d_to_2d(p) for p in proj3ds]
-
-        shadow_line_vertices = []
-        main_line_vertices_outer = []
-        main_line_vertices_inner = []
-        for i, j in self.edges:
-            p1 = proj2ds[i]
-            p2 = proj2ds[j]
-            x1 = TESS_X + p1[0] * self.scale
-            y1 = TESS_Y + p1[1] * self.scale
-            x2 = TESS_X + p2[0] * self.scale
-            y2 = TESS_Y + p2[1] * self.scale
-            shadow_line_vertices.extend([x1 + 2.0, y1 + 2.0, x2 + 2.0, y2 + 2.0])
-            w_avg = (self.vertices[i][3] + self.vertices[j][3]) / 2.0
-            if w_avg >= 0.0:
-                main_line_vertices_outer.extend([x1, y1, x2, y2])
-            else:
-                main_line_vertices_inner.extend([x1, y1, x2, y2])
-
-        if len(shadow_line_vertices) > 0:
-            svbo = ctx.buffer(np.array(shadow_line_vertices, 'f4').tobytes())
-            sva = ctx.vertex_array(line_prog, svbo, 'in_pos')
-            line_prog['line_color'].value = (0.04, 0.04, 0.04, 0.95)
-            ctx.line_width = 3.0
-            sva.render(moderngl.LINES)
-            sva.release()
-            svbo.release()
-
-        if len(main_line_vertices_outer) > 0:
-            ovbo = ctx.buffer(np.array(main_line_vertices_outer, 'f4').tobytes())
-            ova = ctx.vertex_array(line_prog, ovbo, 'in_pos')
-            line_prog['line_color'].value = (1.0, 0.76, 0.18, 1.0)
-            ctx.line_width = 1.6
-            ova.render(moderngl.LINES)
-            ova.release()
-            ovbo.release()
-
-        if len(main_line_vertices_inner) > 0:
-            ivbo = ctx.buffer(np.array(main_line_vertices_inner, 'f4').tobytes())
-            iva = ctx.vertex_array(line_prog, ivbo, 'in_pos')
-            line_prog['line_color'].value = (0.78, 0.9, 1.0, 1.0)
-            ctx.line_width = 1.6
-            iva.render(moderngl.LINES)
-            iva.release()
-            ivbo.release()
-
-    def dim(self, ctx, dim_prog, quad_vbo):
-        dim_prog['position'].value = (TESS_X - TESS_SIZE * 0.75, TESS_Y - TESS_SIZE * 0.75)
-        dim_prog['size'].value = (TESS_SIZE * 1.5, TESS_SIZE * 1.5)
+            self.since_change = 0.0
+            # re-orthonormalise so rounding never shears the cube
+            u, _, vt = np.linalg.svd(self.rotation)
+            self.rotation = u @ vt
+
+    def screen_points(self):
+        """CPU mirror of VERT_TESS for the 16 vertices (pixels); used for damage and pacing."""
+        v = self.vertices @ self.rotation.T
+        p3 = v[:, :3] * (self.camera4 / np.maximum(self.camera4 - v[:, 3], self._eps))[:, None]
+        p2 = p3[:, :2] * (self.camera3 / np.maximum(self.camera3 - p3[:, 2], self._eps))[:, None]
+        return np.array([TESS_X, TESS_Y]) + p2 * self.scale
+
+    def upload(self, ctx, prog):
+        """
+        Static geometry: every edge endpoint carries the edge midpoint (for the colour
+        split by average w). The edge list is stored twice, first as the shadow pass.
+        """
+        ends = self.vertices[self.edges.reshape(-1)]
+        mids = np.repeat((self.vertices[self.edges[:, 0]] + self.vertices[self.edges[:, 1]]) / 2.0, 2, axis=0)
+        shadow = np.concatenate([np.ones(len(ends)), np.zeros(len(ends))])
+        data = np.column_stack((np.vstack((ends, ends)), np.vstack((mids, mids)), shadow)).astype('f4')
+        self.vbo = ctx.buffer(data)
+        self.vao = ctx.vertex_array(prog, [(self.vbo, '4f 4f 1f', 'in_vert', 'in_mid', 'in_shadow')])
+        self.edge_vertices = len(ends)
+        self.prog = prog
+        prog['center'].value = (TESS_X, TESS_Y)
+        prog['scale'].value = self.scale
+        prog['cameras'].value = (self.camera4, self.camera3)
+        prog['eps'].value = self._eps
+        prog['shadow_offset'].value = (2.0, 2.0)
+        prog['shadow_color'].value = (0.04, 0.04, 0.04, 0.95)
+        prog['outer_color'].value = (1.0, 0.76, 0.18, 1.0)
+        prog['inner_color'].value = (0.78, 0.9, 1.0, 1.0)
+
+    def release(self):
+        self.vao.release()
+        self.vbo.release()
+
+    def render(self, state):
+        state.uniform(self.prog, 'rotation', tuple(self.rotation.T.flatten()))
+        state.line_width(3.0)
+        self.vao.render(moderngl.LINES, vertices=self.edge_vertices, first=0)
+        # inner edges go last so they stay on top, as before
+        state.line_width(1.6)
+        for side in (1.0, -1.0):
+            state.uniform(self.prog, 'side', side)
+            self.vao.render(moderngl.LINES, vertices=self.edge_vertices, first=self.edge_vertices)
+
+    def dim(self, state, dim_prog, dim_vao):
+        state.uniform(dim_prog, 'position', (TESS_X - TESS_SIZE * 0.75, TESS_Y - TESS_SIZE * 0.75))
+        state.uniform(dim_prog, 'size', (TESS_SIZE * 1.5, TESS_SIZE * 1.5))
         # Use black with moderate alpha to darken but not hide the content behind.
         # Recommended alpha range: 0.30 .. 0.55; I used 0.45 as a balanced default.
-        dim_prog['dim_color'].value = (0.0, 0.0, 0.0, 0.30)
-        dim_vao = ctx.vertex_array(dim_prog, quad_vbo, 'in_pos')
+        state.uniform(dim_prog, 'dim_color', (0.0, 0.0, 0.0, 0.30))
         dim_vao.render(moderngl.TRIANGLE_STRIP)
-        dim_vao.release()
 
 # -------------------------
 # Particles (decorative)
 # -------------------------
-class Particle:
-    def __init__(self):
-        self.pos = [random.uniform(0, WIDTH), random.uniform(0, HEIGHT)]
-        self.vel = [random.uniform(-PARTICLE_SPEED, PARTICLE_SPEED), random.uniform(-PARTICLE_SPEED, PARTICLE_SPEED)]
-        self.size = random.uniform(1.0, 3.0)
-        self.color = (random.uniform(0.6, 1.0), random.uniform(0.6, 1.0), random.uniform(0.6, 1.0), 0.35)
-
-particles = [Particle() for _ in range(PARTICLE_COUNT)]
-
-def update_particles(dt):
-    for p in particles:
-        p.pos[0] += p.vel[0] * dt
-        p.pos[1] += p.vel[1] * dt
-        if p.pos[0] < 0 or p.pos[0] > WIDTH:
-            p.vel[0] = -p.vel[0]
-        if p.pos[1] < 0 or p.pos[1] > HEIGHT:
-            p.vel[1] = -p.vel[1]
+PARTICLE_REBASE_INTERVAL = 600.0   # seconds; keeps the shader's time small enough for float32
+
+class ParticleField:
+    """
+    Decorative particles computed entirely in the vertex shader. Origin, velocity, size and
+    colour are uploaded once; each vertex is advanced to the elapsed time and folded back
+    into the screen (a triangle wave, i.e. bouncing off the edges), so drawing the whole
+    field is one POINTS call; the elapsed time is the Frame block's `time`.
+    """
+    def __init__(self, count=PARTICLE_COUNT, seed=None):
+        rng = np.random.default_rng(seed)
+        self.count = count
+        self.origin = np.column_stack((rng.uniform(0, WIDTH, count), rng.uniform(0, HEIGHT, count)))
+        self.vel = rng.uniform(-PARTICLE_SPEED, PARTICLE_SPEED, (count, 2))
+        self.size = rng.uniform(1.0, 3.0, count)
+        self.color = np.column_stack((rng.uniform(0.6, 1.0, (count, 3)), np.full(count, 0.35)))
+        self.max_speed = float(np.hypot(self.vel[:, 0], self.vel[:, 1]).max(initial=0.0))
+        self.t0 = None
+        self.vbo = None
+        self.vao = None
+
+    def positions(self, t):
+        """CPU mirror of the shader, used to rebase the origins."""
+        bounds = np.array([WIDTH, HEIGHT], 'f8')
+        m = np.mod(self.origin + self.vel * t, 2.0 * bounds)
+        return bounds - np.abs(bounds - m)
+
+    def _attributes(self):
+        return np.column_stack((self.origin, self.vel, self.size, self.color)).astype('f4')
+
+    def upload(self, ctx, prog):
+        self.vbo = ctx.buffer(self._attributes())
+        self.vao = ctx.vertex_array(prog, [(self.vbo, '2f 2f 1f 4f', 'in_origin', 'in_vel', 'in_size', 'in_color')])
+        self.prog = prog
+
+    def release(self):
+        self.vao.release()
+        self.vbo.release()
+
+    def elapsed(self, now_t):
+        """Shader time at now_t (for FrameUniforms.set_time), counted from t0."""
+        if self.t0 is None:
+            self.t0 = now_t
+        t = now_t - self.t0
+        if t > PARTICLE_REBASE_INTERVAL:
+            # fold elapsed time into the origins once in a while (vectorised, no GL objects)
+            self.origin = self.positions(t)
+            self.t0 = now_t
+            t = 0.0
+            self.vbo.write(self._attributes())
+        return t
+
+    def draw(self):
+        self.vao.render(moderngl.POINTS)
 
 # -------------------------
 # Build SDF atlas (glyphs + icons)
 # -------------------------
-def build_sdf_atlas(font_size):
+def sdf_spread(font_size):
+    """Distance in pixels over which an SDF of this size ramps from inside to outside."""
+    return max(8, font_size // 2)
+
+def pack_shelves(sizes, width):
+    """
+    Shelf packing: (w, h) rects placed tallest first, left to right in rows of `width`.
+    Returns ([(x, y)] in input order, height used).
+    """
+    pos = [None] * len(sizes)
+    x = y = shelf_h = 0
+    for i in sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0])):
+        w, h = sizes[i]
+        if x + w > width:
+            x, y, shelf_h = 0, y + shelf_h, 0
+        pos[i] = (x, y)
+        x += w
+        shelf_h = max(shelf_h, h)
+    return pos, y + shelf_h
+
+def glyph_bitmap(font, c):
+    """Coverage of c rendered with font as a bool array, flipped for GL (row 0 at the bottom)."""
+    try:
+        surf = font.render(c, True, (255,255,255))
+    except pygame.error:    # zero-width chars (soft hyphen, combining marks) render nothing
+        return np.zeros((0, 0), dtype=bool)
+    if pygame.display.get_surface() is not None:
+        surf = surf.convert_alpha()
+    try:
+        alpha = pygame.surfarray.pixels_alpha(surf)  # <- use alpha to avoid white rects
+        return np.flipud(alpha.T > 0)
+    except Exception:
+        arr3 = pygame.surfarray.array3d(surf)
+        return np.flipud(arr3[:,:,0].T > 0)
+
+def sdf_to_u8(sdf, spread):
+    """Signed distances (pixels, positive inside) as uint8, 128 on the edge, 0/255 at -/+spread."""
+    return ((sdf / (2.0 * spread) + 0.5).clip(0.0, 1.0) * 255.0).astype('u1')
+
+def tile_sdf(bitmap, pad, shape=None):
+    """
+    sdf_to_u8() of bitmap placed at (pad, pad) in an empty tile of shape (default: the
+    bitmap plus pad all round). With pad >= the spread the neighbourhood that matters is
+    all inside the tile, so the EDT never has to see the rest of the atlas.
+    """
+    # scipy is only needed on an atlas cache miss
+    from scipy.ndimage import distance_transform_edt as edt
+    h, w = bitmap.shape
+    tile = np.zeros(shape or (h + 2 * pad, w + 2 * pad), dtype=bool)
+    tile[pad:pad + h, pad:pad + w] = bitmap
+    sdf = edt(tile).astype('f4')
+    sdf -= edt(~tile)
+    return sdf_to_u8(sdf, pad)
+
+def _tile_sdf_batch(tiles):
+    return [tile_sdf(bitmap, pad) for bitmap, pad in tiles]
+
+def atlas_tile_sdfs(tiles, workers=None):
+    """
+    tile_sdf() of each (bitmap, pad) over a pool of `workers` processes. By default that is
+    ATLAS_WORKERS once there are ATLAS_PARALLEL_TILES tiles or more; below that a pool costs
+    more to start than it saves. Workers are forked, so they start at once with scipy
+    loaded; with other threads running (SDL, fetches, a loader) a forked child could wait
+    forever on a lock one of them held, so then the tiles are done in this process instead.
+    spawn / forkserver workers would each re-import this script (pygame, moderngl: ~0.7 s
+    here), more than the EDT they take over.
+    """
+    import multiprocessing
+    if workers is None:
+        workers = ATLAS_WORKERS if len(tiles) >= ATLAS_PARALLEL_TILES else 1
+    if workers > 1 and ('fork' not in multiprocessing.get_all_start_methods() or threading.active_count() > 1):
+        workers = 1
+    if workers <= 1:
+        return _tile_sdf_batch(tiles)
+    import scipy.ndimage  # noqa: F401  (loaded once before the fork, so the workers inherit it)
+    context = multiprocessing.get_context('fork')
+    n = -(-len(tiles) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return [sdf for batch in pool.map(_tile_sdf_batch, [tiles[k:k + n] for k in range(0, len(tiles), n)])
+                for sdf in batch]
+
+def atlas_tiles(font_sizes, chars=None):
+    """
+    Rasterise chars (default ATLAS_CHARS) at every size plus the icon layers. Returns
+    ([(key, bitmap, spread)], glyph_uvs, glyph_widths), the dicts holding the entries of
+    blank glyphs.
+    """
+    chars = ATLAS_CHARS if chars is None else chars
     pygame.font.init()
-    font = pygame.font.SysFont("dejavusans", font_size)
     glyph_widths = {}
     glyph_uvs = {}
+    tiles = []    # (key, bitmap, spread)
+
+    for font_size in font_sizes:
+        font = pygame.font.SysFont(ATLAS_FONT, font_size)
+        for c in chars:
+            arr2 = glyph_bitmap(font, c)
+            if arr2.shape[0] == 0 or arr2.shape[1] == 0:
+                glyph_widths[(font_size, c)] = font_size // 2
+                glyph_uvs[(font_size, c)] = (0.0, 0.0, 0.0, 0.0)
+                continue
+            tiles.append(((font_size, c), arr2, sdf_spread(font_size)))
 
-    atlas_size = 1024
-    atlas_binary = np.zeros((atlas_size, atlas_size), dtype=bool)
-    cur_x = 0
-    cur_y = 0
-    max_h = 0
-
-    # character set
-    chars = " !\"#$%&'()*+,-./0123456789:;<=>?@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_`abcdefghijklmnopqrstuvwxyz{|}~°C"
-
-    for c in chars:
-        surf = font.render(c, True, (255,255,255))
-        surf = surf.convert_alpha()
-        try:
-            alpha = pygame.surfarray.pixels_alpha(surf)  # <- use alpha to avoid white rects
-            arr2 = np.flipud(alpha.T > 0)
-        except Exception:
-            arr3 = pygame.surfarray.array3d(surf)
-            arr2 = np.flipud(arr3[:,:,0].T > 0)
-
-        h = arr2.shape[0]
-        w = arr2.shape[1]
-        if w == 0 or h == 0:
-            glyph_widths[c] = font_size // 2
-            glyph_uvs[c] = (0.0, 0.0, 0.0, 0.0)
-            continue
-
-        if cur_x + w > atlas_size:
-            cur_x = 0
-            cur_y += max_h
-            max_h = 0
-        if cur_y + h > atlas_size:
-            raise RuntimeError("Atlas too small for glyphs")
-
-        atlas_binary[cur_y:cur_y+h, cur_x:cur_x+w] = arr2
-        u1, v1 = cur_x / atlas_size, cur_y / atlas_size
-        u2, v2 = (cur_x + w) / atlas_size, (cur_y + h) / atlas_size
-        glyph_uvs[c] = (u1, v1, u2, v2)
-        glyph_widths[c] = w
-        max_h = max(max_h, h)
-        cur_x += w
-
-    # add icon layers into atlas
+    # icon layers, drawn at ICON_SIZE (= FONT_SIZE): the largest size's spread
+    icon_spread = sdf_spread(max(font_sizes))
     for name, bitmap in icon_bitmaps.items():
         unique_vals = sorted({v for row in bitmap for v in row if v > 0})
-        h = len(bitmap)
-        w = len(bitmap[0])
         for v in unique_vals:
-            binary = create_layer_binary(bitmap, v)
-            if cur_x + w > atlas_size:
-                cur_x = 0
-                cur_y += max_h
-                max_h = 0
-            if cur_y + h > atlas_size:
-                raise RuntimeError("Atlas too small for icons")
-            atlas_binary[cur_y:cur_y+h, cur_x:cur_x+w] = binary
-            u1, v1 = cur_x / atlas_size, cur_y / atlas_size
-            u2, v2 = (cur_x + w) / atlas_size, (cur_y + h) / atlas_size
             key = 'icon:' + name + ('' if len(unique_vals) == 1 else ':' + str(v))
-            glyph_uvs[key] = (u1, v1, u2, v2)
+            tiles.append((key, create_layer_binary(bitmap, v), icon_spread))
+    return tiles, glyph_uvs, glyph_widths
+
+def pack_atlas(tiles):
+    """Padded tile sizes, their (x, y) and the atlas (width, height) for atlas_tiles() output."""
+    sizes = [(b.shape[1] + 2 * pad, b.shape[0] + 2 * pad) for _, b, pad in tiles]
+    # power-of-two width giving the smallest area among packings no taller than wide
+    width = 1 << max(0, math.ceil(math.log2(max(w for w, _ in sizes))))
+    best = None
+    while best is None or width <= 4096:
+        pos, height = pack_shelves(sizes, width)
+        if height <= width and (best is None or width * height < best[0] * best[2]):
+            best = (width, pos, height)
+        width *= 2
+    width, pos, height = best
+    return sizes, pos, (width, -(-height // 4) * 4)
+
+def build_sdf_atlas(font_sizes):
+    """
+    One SDF atlas for ATLAS_CHARS at every size in font_sizes plus the icon layers. Every
+    bitmap gets sdf_spread() of empty border, so neighbours never bleed into each other,
+    and the tiles are shelf-packed into the smallest texture holding them. Each tile's
+    field is computed on its own (see atlas_tile_sdfs), so the cost follows the glyph
+    count, not the atlas area. Glyphs are keyed (size, char), icon layers
+    'icon:<name>[:<value>]'. Returns (sdf uint8 (h, w), (w, h), glyph_uvs, glyph_widths).
+    """
+    tiles, glyph_uvs, glyph_widths = atlas_tiles(font_sizes)
+    sizes, pos, (width, height) = pack_atlas(tiles)
+    sdfs = atlas_tile_sdfs([(bitmap, pad) for _, bitmap, pad in tiles])
+
+    sdf_data = np.zeros((height, width), dtype='u1')
+    for (key, bitmap, pad), (x, y), (tw, th), sdf in zip(tiles, pos, sizes, sdfs):
+        sdf_data[y:y + th, x:x + tw] = sdf
+        h, w = bitmap.shape
+        glyph_uvs[key] = ((x + pad) / width, (y + pad) / height, (x + pad + w) / width, (y + pad + h) / height)
+        glyph_widths[key] = w
+    return sdf_data, (width, height), glyph_uvs, glyph_widths
+
+def atlas_font_path():
+    pygame.font.init()
+    path = pygame.font.match_font(ATLAS_FONT)
+    return path or os.path.join(os.path.dirname(pygame.__file__), pygame.font.get_default_font())
+
+def atlas_cache_key(font_sizes):
+    """Hash of everything build_sdf_atlas output depends on."""
+    h = hashlib.sha256()
+    with open(atlas_font_path(), 'rb') as f:
+        h.update(f.read())
+    h.update(repr((ATLAS_CACHE_VERSION, pygame.version.ver, ATLAS_CHARS, tuple(font_sizes),
+                   sorted(icon_bitmaps.items()))).encode())
+    return h.hexdigest()[:16]
+
+def load_sdf_atlas(font_sizes):
+    """
+    build_sdf_atlas() through an on-disk cache in CACHE_DIR. The SDF is kept as .npy and
+    memory-mapped on load, so warm starts skip rasterisation, the EDT and the scipy import.
+    """
+    base = os.path.join(CACHE_DIR, f"sdf-{'-'.join(map(str, font_sizes))}-{atlas_cache_key(font_sizes)}")
+    try:
+        with open(base + ".json") as f:
+            meta = json.load(f)
+        sdf_data = np.load(base + ".npy", mmap_mode='r')
+        # JSON has no tuple keys: glyphs are stored as [key, uv, width]
+        glyph_uvs, glyph_widths = {}, {}
+        for key, uv, w in meta["glyphs"]:
+            key = tuple(key) if isinstance(key, list) else key
+            glyph_uvs[key] = tuple(uv)
             glyph_widths[key] = w
-            max_h = max(max_h, h)
-            cur_x += w
-
-    # compute SDF
-    dist_inside = edt(atlas_binary)
-    dist_outside = edt(~atlas_binary)
-    sdf = dist_inside - dist_outside
-    max_d = max(8, font_size // 2)
-    sdf_norm = (sdf / (2.0 * max_d) + 0.5).clip(0.0, 1.0)
-    sdf_data = (sdf_norm * 255.0).astype('u1')
+        return sdf_data, tuple(meta["atlas_size"]), glyph_uvs, glyph_widths
+    except (OSError, ValueError, KeyError):
+        pass
+
+    t0 = time.perf_counter()
+    sdf_data, atlas_size, glyph_uvs, glyph_widths = build_sdf_atlas(font_sizes)
+    print(f"Atlas: sizes {', '.join(map(str, font_sizes))} in {atlas_size[0]}x{atlas_size[1]}, "
+          f"built in {1000.0 * (time.perf_counter() - t0):.0f} ms")
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        for name in os.listdir(CACHE_DIR):
+            if name.startswith("sdf-"):
+                os.remove(os.path.join(CACHE_DIR, name))
+        # .npy first: the .json only appears once the entry is complete
+        np.save(base + ".tmp.npy", sdf_data)
+        os.replace(base + ".tmp.npy", base + ".npy")
+        with open(base + ".tmp.json", "w") as f:
+            json.dump({"atlas_size": atlas_size,
+                       "glyphs": [[key, glyph_uvs[key], glyph_widths[key]] for key in glyph_uvs]}, f)
+        os.replace(base + ".tmp.json", base + ".json")
+    except OSError as e:
+        print(f"Atlas cache not written: {e}")
     return sdf_data, atlas_size, glyph_uvs, glyph_widths
 
+class GlyphCache:
+    """
+    The atlas texture: load_sdf_atlas() output on top, GLYPH_CACHE_SLOTS cells below it for
+    characters outside ATLAS_CHARS. lookup() of such a glyph queues it and returns None
+    (the caller leaves its advance); update() rasterises queued glyphs for up to
+    GLYPH_RASTER_BUDGET ms a frame, runs the EDT over each padded tile alone and writes
+    the tile into a free cell, reusing the least recently used one when all are taken
+    (lookup() and touch() count as uses). scipy is imported on a thread when the first
+    such glyph shows up.
+    uvs / widths cover every glyph currently in the texture.
+    """
+    def __init__(self, ctx, atlas, font_sizes):
+        sdf_data, (w, h), uvs, widths = atlas
+        big = max(font_sizes)
+        pad = sdf_spread(big)
+        self.fonts = {size: pygame.font.SysFont(ATLAS_FONT, size) for size in font_sizes}
+        self.cell = (min(w, 2 * big + 2 * pad), self.fonts[big].get_height() + 2 * pad)
+        per_row = w // self.cell[0]
+        rows = -(-GLYPH_CACHE_SLOTS // per_row)
+        self.size = (w, h + rows * self.cell[1])
+        self.texture = ctx.texture(self.size, 1, data=bytes(self.size[0] * self.size[1]))
+        self.texture.write(np.ascontiguousarray(sdf_data).tobytes(), viewport=(0, 0, w, h))
+        self.texture.filter = (moderngl.LINEAR, moderngl.LINEAR)
+        scale = h / self.size[1]
+        self.uvs = {key: (u1, v1 * scale, u2, v2 * scale) for key, (u1, v1, u2, v2) in uvs.items()}
+        self.widths = dict(widths)
+        self.free = [(x * self.cell[0], h + y * self.cell[1])
+                     for y in range(rows) for x in range(per_row)][:GLYPH_CACHE_SLOTS]
+        self.lru = OrderedDict()      # cached key -> cell
+        self.wanted = OrderedDict()   # keys to rasterise, oldest first
+        self.missing = set()          # keys the font has no glyph for
+        # scipy: None not imported yet, False importing, True ready; 'failed' the thread's
+        # import failed (retried on the render thread), 'missing' not installed
+        self.scipy = None
+        self.rasterised = 0
+        self.evictions = 0
+
+    def lookup(self, key):
+        uv = self.uvs.get(key)
+        if uv is not None:
+            if key in self.lru:
+                self.lru.move_to_end(key)
+            return uv
+        if key[0] in self.fonts and key not in self.missing:
+            self.wanted[key] = None
+        return None
+
+    def touch(self, size, text):
+        """Mark the cached glyphs of text at size used, e.g. when a laid-out run is drawn again."""
+        if not self.lru:
+            return
+        for c in text:
+            if (size, c) in self.lru:
+                self.lru.move_to_end((size, c))
+
+    def _import_scipy(self):
+        try:
+            import scipy.ndimage  # noqa: F401  (warms the import in tile_sdf())
+        except Exception as e:
+            print(f"Glyph cache: importing scipy failed ({e!r}); retrying on the render thread")
+            self.scipy = 'failed'
+        else:
+            self.scipy = True
+
+    def update(self):
+        """Rasterise queued glyphs within the budget; returns the keys added and evicted."""
+        added, evicted = [], []
+        if not self.wanted:
+            return added, evicted
+        if self.scipy is not True:
+            if self.scipy is None:
+                self.scipy = False
+                threading.Thread(target=self._import_scipy, daemon=True).start()
+            if self.scipy == 'failed':
+                try:
+                    import scipy.ndimage  # noqa: F401
+                    self.scipy = True
+                except ImportError as e:
+                    print(f"Glyph cache: no scipy ({e}); characters outside ATLAS_CHARS stay blank")
+                    self.scipy = 'missing'
+            if self.scipy == 'missing':
+                self.missing.update(self.wanted)
+                self.wanted.clear()
+            if self.scipy is not True:
+                return added, evicted
+        deadline = time.perf_counter() + GLYPH_RASTER_BUDGET / 1000.0
+        while self.wanted and time.perf_counter() < deadline:
+            key = next(iter(self.wanted))
+            size, c = key
+            font = self.fonts[size]
+            if font.metrics(c)[0] is None:
+                self.missing.add(key)
+                del self.wanted[key]
+                continue
+            bitmap = glyph_bitmap(font, c)
+            if bitmap.shape[0] == 0 or bitmap.shape[1] == 0:
+                self.widths[key] = size // 2
+                self.uvs[key] = (0.0, 0.0, 0.0, 0.0)
+                del self.wanted[key]
+                continue
+            if not self.free and not self.lru:    # GLYPH_CACHE_SLOTS = 0
+                self.missing.update(self.wanted)
+                self.wanted.clear()
+                break
+            if not self.free:
+                old, cell = self.lru.popitem(last=False)
+                del self.uvs[old]
+                self.free.append(cell)
+                evicted.append(old)
+                self.evictions += 1
+            del self.wanted[key]
+            x, y = cell = self.free.pop()
+            pad = sdf_spread(size)
+            cw, ch = self.cell
+            bitmap = bitmap[:ch - 2 * pad, :cw - 2 * pad]
+            self.texture.write(tile_sdf(bitmap, pad, (ch, cw)).tobytes(), viewport=(x, y, cw, ch))
+            w, h = self.size
+            self.uvs[key] = ((x + pad) / w, (y + pad) / h,
+                             (x + pad + bitmap.shape[1]) / w, (y + pad + bitmap.shape[0]) / h)
+            self.widths[key] = bitmap.shape[1]
+            self.lru[key] = cell
+            added.append(key)
+            self.rasterised += 1
+        return added, evicted
+
+    def release(self):
+        self.texture.release()
+
+# -------------------------
+# Wallpaper files
+# -------------------------
+def scale_wallpaper(img, size):
+    """img stretched to size (as the panel has always shown it) and flipped for GL, as (h, w, 3) uint8."""
+    from PIL import Image
+    img = img.convert("RGB").resize(size, Image.LANCZOS)
+    return np.asarray(img.transpose(Image.FLIP_TOP_BOTTOM))
+
+def load_wallpaper(path, size):
+    """
+    scale_wallpaper() of the picture at path through an on-disk cache in CACHE_DIR, kept as
+    raw .npy and memory-mapped on load: after the first start a wallpaper costs no JPEG
+    decode, resize or mipmap build. Raises OSError for unreadable pictures.
+    """
+    st = os.stat(path)
+    tag = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:8]
+    key = hashlib.sha256(repr((WALLPAPER_CACHE_VERSION, st.st_size, st.st_mtime_ns, tuple(size))).encode()).hexdigest()[:16]
+    base = os.path.join(CACHE_DIR, f"wall-{tag}-{key}")
+    try:
+        pixels = np.load(base + ".npy", mmap_mode='r')
+        if pixels.shape == (size[1], size[0], 3):
+            return pixels
+    except (OSError, ValueError):
+        pass
+
+    from PIL import Image    # cache misses only
+    pixels = scale_wallpaper(Image.open(path), size)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        for name in os.listdir(CACHE_DIR):
+            if name.startswith(f"wall-{tag}-"):
+                os.remove(os.path.join(CACHE_DIR, name))
+        np.save(base + ".tmp.npy", pixels)
+        os.replace(base + ".tmp.npy", base + ".npy")
+    except OSError as e:
+        print(f"Wallpaper cache not written: {e}")
+    return pixels
+
+def read_wallpaper(path, bench=False):
+    """
+    load_wallpaper() at panel size, copied into memory so streaming it to the GPU never
+    page-faults on the render thread; runs on the loader thread. With bench a missing
+    path gives the benchmark gradient.
+    """
+    if bench and not os.path.exists(path):
+        return scale_wallpaper(bench_wallpaper(), (WIDTH, HEIGHT))
+    return np.array(load_wallpaper(path, (WIDTH, HEIGHT)))
+
 # -------------------------
 # Moderngl shader sources
 # -------------------------
+# per-frame constants shared by every program: one std140 buffer bound at FRAME_BINDING.
+# Members take the including shader's default precision, as the per-program mvp did.
+FRAME_BINDING = 0
+FRAME_BLOCK = '''
+layout(std140) uniform Frame {
+    mat4 mvp;      // pixels (origin top left) -> NDC
+    vec2 screen;   // WIDTH, HEIGHT
+    float time;    // particle clock, seconds (see ParticleField.elapsed)
+};
+'''
+
 VERT_SDF = '''
 #version 300 es
 precision mediump float;
-
+''' + FRAME_BLOCK + '''
 in vec2 in_pos;
 in vec2 in_uv;
 out vec2 frag_uv;
-uniform mat4 mvp;
 uniform vec2 position;
 uniform vec2 size;
 uniform vec2 uv_offset;
@@ -746,32 +1755,61 @@ void main() {
 }
 '''
 
-VERT_LINE = '''
+# Instanced variant: one instance per glyph quad, all per-glyph state in attributes
+VERT_SDF_BATCH = '''
 #version 300 es
 precision mediump float;
-
+''' + FRAME_BLOCK + '''
 in vec2 in_pos;
-uniform mat4 mvp;
+in vec2 in_uv;
+in vec4 i_rect;          // x, y, w, h (pixels)
+in vec4 i_uv;            // u, v, du, dv
+in vec4 i_text_color;
+in vec4 i_glow_color;
+in float i_glow_size;
+out vec2 frag_uv;
+out vec4 v_text_color;
+out vec4 v_glow_color;
+out float v_glow_size;
+uniform vec2 offset;     // run translation (0 for batched quads)
 void main() {
-    gl_Position = mvp * vec4(in_pos, 0.0, 1.0);
+    vec2 p = in_pos * i_rect.zw + i_rect.xy + offset;
+    gl_Position = mvp * vec4(p, 0.0, 1.0);
+    frag_uv = in_uv * i_uv.zw + i_uv.xy;
+    v_text_color = i_text_color;
+    v_glow_color = i_glow_color;
+    v_glow_size = i_glow_size;
 }
 '''
-FRAG_LINE = '''
+FRAG_SDF_BATCH = '''
 #version 300 es
 precision mediump float;
 
-uniform vec4 line_color;
+in vec2 frag_uv;
+in vec4 v_text_color;
+in vec4 v_glow_color;
+in float v_glow_size;
 out vec4 fragColor;
-void main() { fragColor = line_color; }
+uniform sampler2D tex;
+uniform float threshold;
+uniform float edge;
+void main() {
+    float d = texture(tex, frag_uv).r;
+    float base = smoothstep(threshold - edge, threshold + edge, d);
+    float glow = smoothstep(threshold - v_glow_size, threshold, d) * v_glow_color.a;
+    vec3 color = v_text_color.rgb * base + v_glow_color.rgb * glow;
+    float alpha = clamp(v_text_color.a * base + v_glow_color.a * glow, 0.0, 1.0);
+    if (alpha < 0.01) discard;
+    fragColor = vec4(color, alpha);
+}
 '''
 
 VERT_RADIAL = '''
 #version 300 es
 precision mediump float;
-
+''' + FRAME_BLOCK + '''
 in vec2 in_pos;
 out vec2 frag_pos;
-uniform mat4 mvp;
 uniform vec2 position;
 uniform vec2 size;
 void main() {
@@ -799,36 +1837,81 @@ void main() {
 
 VERT_PART = '''
 #version 300 es
-precision mediump float;
-
-in vec2 in_pos;
-uniform mat4 mvp;
-uniform float size;
+precision highp float;
+''' + FRAME_BLOCK + '''
+in vec2 in_origin;
+in vec2 in_vel;
+in float in_size;
+in vec4 in_color;
+out vec4 v_color;
 void main() {
-    gl_Position = mvp * vec4(in_pos, 0.0, 1.0);
-    gl_PointSize = size;
+    // straight-line motion folded into [0, screen]: bouncing off the screen edges
+    vec2 m = mod(in_origin + in_vel * time, 2.0 * screen);
+    vec2 p = screen - abs(screen - m);
+    gl_Position = mvp * vec4(p, 0.0, 1.0);
+    gl_PointSize = in_size;
+    v_color = in_color;
 }
 '''
 FRAG_PART = '''
 #version 300 es
 precision mediump float;
 
-uniform vec4 p_color;
+in vec4 v_color;
 out vec4 fragColor;
 void main() {
     vec2 coord = gl_PointCoord - vec2(0.5);
     float dist = length(coord);
     float alpha = 1.0 - smoothstep(0.4, 0.6, dist);
-    fragColor = p_color * alpha;
+    fragColor = v_color * alpha;
 }
 '''
 
-VERT_DIM = '''
+VERT_TESS = '''
+#version 300 es
+precision highp float;
+''' + FRAME_BLOCK + '''
+in vec4 in_vert;
+in vec4 in_mid;          // midpoint of this vertex's edge
+in float in_shadow;      // 1.0 for the shadow pass copy of the edge list
+out vec4 v_color;
+uniform mat4 rotation;
+uniform vec2 center;
+uniform float scale;
+uniform vec2 cameras;    // 4D and 3D camera distances
+uniform float eps;
+uniform vec2 shadow_offset;
+uniform vec4 shadow_color;
+uniform vec4 outer_color;
+uniform vec4 inner_color;
+uniform float side;      // main pass: 1.0 draws only outer (w >= 0) edges, -1.0 only inner
+void main() {
+    vec4 v = rotation * in_vert;
+    vec3 p3 = v.xyz * (cameras.x / max(cameras.x - v.w, eps));
+    vec2 p2 = p3.xy * (cameras.y / max(cameras.y - p3.z, eps));
+    vec2 p = center + p2 * scale + shadow_offset * in_shadow;
+    gl_Position = mvp * vec4(p, 0.0, 1.0);
+    bool outer = (rotation * in_mid).w >= 0.0;
+    v_color = mix(outer ? outer_color : inner_color, shadow_color, in_shadow);
+    if (in_shadow < 0.5 && outer != (side > 0.0)) {
+        gl_Position = vec4(2.0, 2.0, 2.0, 1.0);   // both ends outside the clip volume: line dropped
+    }
+}
+'''
+FRAG_TESS = '''
 #version 300 es
 precision mediump float;
 
+in vec4 v_color;
+out vec4 fragColor;
+void main() { fragColor = v_color; }
+'''
+
+VERT_DIM = '''
+#version 300 es
+precision mediump float;
+''' + FRAME_BLOCK + '''
 in vec2 in_pos;
-uniform mat4 mvp;
 uniform vec2 position;
 uniform vec2 size;
 void main() {
@@ -850,9 +1933,8 @@ void main() {
 VERT_DIM_CIRC = '''
 #version 300 es
 precision mediump float;
-
+''' + FRAME_BLOCK + '''
 in vec2 in_pos;
-uniform mat4 mvp;
 uniform vec2 position;
 uniform vec2 size;
 out vec2 texCoord;
@@ -908,10 +1990,9 @@ void main() {
 VERT_CIRCLE = '''
 #version 300 es
 precision mediump float;
-
+''' + FRAME_BLOCK + '''
 in vec2 in_pos;
 out vec2 frag_pos;
-uniform mat4 mvp;
 uniform vec2 position;
 uniform vec2 size;
 void main() {
@@ -920,19 +2001,20 @@ void main() {
     frag_pos = p;
 }
 '''
-VERT_SIMPLE = '''
+# VectorBatch: pixel-space triangles with a colour per vertex
+VERT_VECTOR = '''
 #version 300 es
 precision mediump float;
-
+''' + FRAME_BLOCK + '''
 in vec2 in_pos;
 in vec4 in_color;
 out vec4 v_color;
 void main() {
-    gl_Position = vec4(in_pos, 0.0, 1.0);  // Adjust projection if needed
+    gl_Position = mvp * vec4(in_pos, 0.0, 1.0);
     v_color = in_color;
 }
 '''
-FRAG_SIMPLE = '''
+FRAG_VECTOR = '''
 #version 300 es
 precision mediump float;
 
@@ -943,6 +2025,83 @@ void main() {
 }
 '''
 
+VERT_BLIT = '''
+#version 300 es
+precision mediump float;
+''' + FRAME_BLOCK + '''
+in vec2 in_pos;
+in vec2 in_uv;
+out vec2 frag_uv;
+uniform vec2 position;
+uniform vec2 size;
+void main() {
+    vec2 p = in_pos * size + position;
+    gl_Position = mvp * vec4(p, 0.0, 1.0);
+    frag_uv = in_uv;
+}
+'''
+FRAG_BLIT = '''
+#version 300 es
+precision mediump float;
+
+in vec2 frag_uv;
+out vec4 fragColor;
+uniform sampler2D tex;
+void main() {
+    fragColor = texture(tex, frag_uv);   // premultiplied alpha
+}
+'''
+
+# ticker strip: the band samples the row ring from `scroll` texels down, wrapping (REPEAT)
+VERT_STRIP = '''
+#version 300 es
+precision highp float;
+''' + FRAME_BLOCK + '''
+in vec2 in_pos;
+in vec2 in_uv;
+out vec2 frag_uv;
+uniform vec2 position;
+uniform vec2 size;
+uniform float scroll;
+uniform float ring_h;
+void main() {
+    vec2 p = in_pos * size + position;
+    gl_Position = mvp * vec4(p, 0.0, 1.0);
+    // ring rows count down from the top of the texture, GL rows up from the bottom
+    frag_uv = vec2(in_uv.x, 1.0 - (scroll + in_pos.y * size.y) / ring_h);
+}
+'''
+FRAG_STRIP = '''
+#version 300 es
+precision highp float;
+
+in vec2 frag_uv;
+out vec4 fragColor;
+uniform sampler2D tex;
+void main() {
+    fragColor = texture(tex, frag_uv);   // premultiplied alpha
+}
+'''
+
+VERT_MASK = '''
+#version 300 es
+precision mediump float;
+''' + FRAME_BLOCK + '''
+in vec2 in_pos;
+void main() {
+    // nearest depth: everything the scene draws (z = 0) passes a >= test inside the mask
+    gl_Position = vec4((mvp * vec4(in_pos, 0.0, 1.0)).xy, -1.0, 1.0);
+}
+'''
+FRAG_MASK = '''
+#version 300 es
+precision mediump float;
+
+out vec4 fragColor;
+// opaque black: the damaged pixels start cleared, as a full frame does
+void main() { fragColor = vec4(0.0, 0.0, 0.0, 1.0); }
+'''
+
 VERT_WALL = """
     #version 300 es
     precision mediump float;
@@ -962,61 +2121,1469 @@ FRAG_WALL = """
 
     in vec2 uv;
     uniform sampler2D wall_tex;
+    uniform float alpha;
     out vec4 fragColor;
     
     void main() {
-        fragColor = texture(wall_tex, uv);
+        fragColor = vec4(texture(wall_tex, uv).rgb, alpha);
     }
 """
 
+# -------------------------
+# Batched SDF text (one instanced draw per atlas texture)
+# -------------------------
+class TextBatch:
+    """
+    Collects glyph/icon quads for a frame and draws them with one instanced call per
+    atlas texture. Row layout: rect(4) uv(4) text_color(4) glow_color(4) glow_size(1).
+    """
+    FLOATS = 17
+
+    def __init__(self, ctx, state, prog, quad_vbo, capacity=TEXT_BATCH_CAPACITY):
+        self.state = state
+        self.prog = prog
+        self.capacity = capacity
+        self.instance_vbo = ctx.buffer(reserve=capacity * self.FLOATS * 4, dynamic=True)
+        self.vao = ctx.vertex_array(prog, [
+            (quad_vbo, '2f 2f', 'in_pos', 'in_uv'),
+            (self.instance_vbo, '4f 4f 4f 4f 1f/i',
+             'i_rect', 'i_uv', 'i_text_color', 'i_glow_color', 'i_glow_size'),
+        ])
+        # texture -> (rows array, count); insertion order keeps the atlas draw order stable
+        self.buckets = {}
+        self.draw_calls = 0
+
+    def add(self, texture, rows):
+        """Queue rows (N x FLOATS, see sdf_rows) that sample from texture."""
+        bucket = self.buckets.get(texture)
+        if bucket is None:
+            bucket = [np.empty((self.capacity, self.FLOATS), 'f4'), 0]
+            self.buckets[texture] = bucket
+        start = 0
+        while start < len(rows):
+            if bucket[1] == self.capacity:
+                self._draw(texture, bucket)
+            take = min(self.capacity - bucket[1], len(rows) - start)
+            bucket[0][bucket[1]:bucket[1] + take] = rows[start:start + take]
+            bucket[1] += take
+            start += take
+
+    def _draw(self, texture, bucket):
+        rows, count = bucket
+        if count == 0:
+            return
+        self.instance_vbo.orphan()
+        self.instance_vbo.write(rows[:count])
+        self.state.texture(texture)
+        self.state.uniform(self.prog, 'offset', (0.0, 0.0))
+        self.vao.render(moderngl.TRIANGLE_STRIP, vertices=4, instances=count)
+        self.draw_calls += 1
+        bucket[1] = 0
+
+    def flush(self):
+        """Draw everything queued so far. Call wherever later geometry must land on top of text."""
+        for texture, bucket in self.buckets.items():
+            self._draw(texture, bucket)
+
+def sdf_rows(quads):
+    """Pack (x, y, w, h, (u1, v1, u2, v2), text_color, glow_color, glow_size) quads into TextBatch rows."""
+    rows = np.empty((len(quads), TextBatch.FLOATS), 'f4')
+    for i, (x, y, w, h, uv, text_color, glow_color, glow_size) in enumerate(quads):
+        u1, v1, u2, v2 = uv
+        rows[i] = (x, y, w, h, u1, v1, u2 - u1, v2 - v1, *text_color, *glow_color, glow_size)
+    return rows
+
+# -------------------------
+# GPU-resident text runs
+# -------------------------
+class TextRunCache:
+    """
+    Laid-out strings kept on the GPU, keyed by (text, font_h, text_color, glow_color).
+    A run is laid out once at the origin into its own instance buffer; drawing it is one
+    instanced call plus the `offset` uniform. Least recently used runs are dropped once
+    more than `capacity` are resident, and release_text() drops a string explicitly.
+    on_hit(key) is called when a resident run is drawn again (its glyphs are in use).
+    Dropped buffers go to a free list per power-of-two size class and are rewritten by
+    later runs, so a warm cache allocates no GL objects.
+    """
+    def __init__(self, ctx, state, prog, quad_vbo, layout, capacity=TEXT_RUN_CACHE_SIZE, on_hit=None):
+        self.ctx = ctx
+        self.state = state
+        self.prog = prog
+        self.quad_vbo = quad_vbo
+        self.layout = layout          # (text, font_h, text_color, glow_color) -> (texture, rows)
+        self.capacity = capacity
+        self.on_hit = on_hit
+        self.runs = OrderedDict()     # key -> (texture, vbo, vao, count, size_class)
+        self.free = {}                # size_class -> [(vbo, vao), ...]
+        self.misses = 0
+
+    def _acquire(self, rows):
+        size_class = max(16, 1 << (len(rows) - 1).bit_length())
+        pool = self.free.get(size_class)
+        if pool:
+            vbo, vao = pool.pop()
+            vbo.orphan()
+        else:
+            vbo = self.ctx.buffer(reserve=size_class * TextBatch.FLOATS * 4)
+            vao = self.ctx.vertex_array(self.prog, [
+                (self.quad_vbo, '2f 2f', 'in_pos', 'in_uv'),
+                (vbo, '4f 4f 4f 4f 1f/i', 'i_rect', 'i_uv', 'i_text_color', 'i_glow_color', 'i_glow_size'),
+            ])
+        vbo.write(rows)
+        return vbo, vao, size_class
+
+    def _get(self, key):
+        run = self.runs.get(key)
+        if run is not None:
+            self.runs.move_to_end(key)
+            if self.on_hit is not None:
+                self.on_hit(key)
+            return run
+        self.misses += 1
+        texture, rows = self.layout(*key)
+        if len(rows) == 0:
+            run = (texture, None, None, 0, 0)
+        else:
+            vbo, vao, size_class = self._acquire(rows)
+            run = (texture, vbo, vao, len(rows), size_class)
+        self.runs[key] = run
+        while len(self.runs) > self.capacity:
+            self._recycle(self.runs.popitem(last=False)[1])
+        return run
+
+    def draw(self, key, x, y):
+        texture, _, vao, count, _ = self._get(key)
+        if count == 0:
+            return
+        self.state.texture(texture)
+        self.state.uniform(self.prog, 'offset', (x, y))
+        vao.render(moderngl.TRIANGLE_STRIP, vertices=4, instances=count)
+
+    def release_text(self, text):
+        """Drop every run of `text` (any size/colour), e.g. once a headline scrolled away."""
+        self.release_where(lambda key: key[0] == text)
+
+    def release_where(self, test):
+        """Drop the runs whose key passes test(key)."""
+        for key in [k for k in self.runs if test(k)]:
+            self._recycle(self.runs.pop(key))
+
+    def _recycle(self, run):
+        _, vbo, vao, _, size_class = run
+        if vao is not None:
+            self.free.setdefault(size_class, []).append((vbo, vao))
+
+    def clear(self):
+        """Release all GL objects (runs and free lists)."""
+        for run in self.runs.values():
+            self._recycle(run)
+        self.runs.clear()
+        for pool in self.free.values():
+            for vbo, vao in pool:
+                vao.release()
+                vbo.release()
+        self.free.clear()
+
+# -------------------------
+# Retained layers (baked invariant parts of the frame)
+# -------------------------
+BLEND_FUNC_STRAIGHT = (moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA)
+# baking into a cleared RGBA target with this keeps the target premultiplied
+BLEND_FUNC_BAKE = (moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA, moderngl.ONE, moderngl.ONE_MINUS_SRC_ALPHA)
+BLEND_FUNC_PREMULT = (moderngl.ONE, moderngl.ONE_MINUS_SRC_ALPHA)
+
+class Layer:
+    """
+    Offscreen copy of a screen rectangle (x, y, w, h in pixels). ensure(key, draw) re-runs
+    the normal screen-space draw calls into it only when key differs from the last bake;
+    composite() puts it back on screen with a single textured quad.
+    """
+    def __init__(self, ctx, state, blit_prog, quad_vbo, rect):
+        self.ctx = ctx
+        self.state = state
+        self.blit_prog = blit_prog
+        self.rect = rect
+        x, y, w, h = rect
+        self.texture = ctx.texture((w, h), 4)
+        self.fbo = ctx.framebuffer(color_attachments=[self.texture])
+        # a full-screen viewport shifted so the mvp's pixel space lands on this rect
+        self.fbo.viewport = (-x, y + h - HEIGHT, WIDTH, HEIGHT)
+        self.vao = ctx.vertex_array(blit_prog, quad_vbo, 'in_pos', 'in_uv')
+        self.key = None
+        self.bakes = 0
+
+    def invalidate(self):
+        self.key = None
+
+    def ensure(self, key, draw):
+        if key == self.key:
+            return False
+        prev_fbo = self.ctx.fbo
+        self.fbo.use()
+        self.fbo.clear(0.0, 0.0, 0.0, 0.0)
+        self.ctx.blend_func = BLEND_FUNC_BAKE
+        try:
+            draw()
+        finally:
+            self.ctx.blend_func = BLEND_FUNC_STRAIGHT
+            prev_fbo.use()
+        self.key = key
+        self.bakes += 1
+        return True
+
+    def composite(self):
+        x, y, w, h = self.rect
+        self.state.uniform(self.blit_prog, 'position', (x, y))
+        self.state.uniform(self.blit_prog, 'size', (w, h))
+        self.state.texture(self.texture)
+        self.ctx.blend_func = BLEND_FUNC_PREMULT
+        self.vao.render(moderngl.TRIANGLE_STRIP)
+        self.ctx.blend_func = BLEND_FUNC_STRAIGHT
+
+    def release(self):
+        self.vao.release()
+        self.fbo.release()
+        self.texture.release()
+
+class TickerStrip:
+    """
+    The scroller band (rect) drawn from a ring of pre-rendered rows in one tall texture.
+    sync() bakes each row once, into slot `row number % slots`, when it first shows up;
+    composite() draws the band as a single quad whose texture offset follows the scroll
+    offset, so the per-frame cost does not depend on row count or headline length.
+    """
+    def __init__(self, ctx, state, prog, quad_vbo, rect, line_h, slots):
+        self.ctx = ctx
+        self.state = state
+        self.prog = prog
+        self.rect = rect
+        self.line_h = line_h
+        self.slots = slots
+        self.ring_h = line_h * slots
+        self.texture = ctx.texture((rect[2], self.ring_h), 4)
+        self.texture.repeat_x = False
+        self.fbo = ctx.framebuffer(color_attachments=[self.texture])
+        self.vao = ctx.vertex_array(prog, quad_vbo, 'in_pos', 'in_uv')
+        self.serials = [None] * slots    # row number baked into each slot
+        self.head = 0
+        self.bakes = 0
+
+    def invalidate(self):
+        self.serials = [None] * self.slots
+
+    def sync(self, head, rows, draw_row):
+        """
+        rows[i] is row number head + i. draw_row(row) draws one row at y = 0 in the normal
+        screen pixel space; it lands in its slot, clipped to it. Slots no row maps to are
+        cleared so a short queue leaves the band empty below it.
+        """
+        wanted = {(head + i) % self.slots: (head + i, row)
+                  for i, row in enumerate(itertools.islice(rows, self.slots))}
+        self.head = head
+        prev_fbo = self.ctx.fbo
+        self.ctx.blend_func = BLEND_FUNC_BAKE
+        try:
+            for slot in range(self.slots):
+                serial, row = wanted.get(slot, (None, None))
+                if self.serials[slot] == serial:
+                    continue
+                # GL rows count up from the bottom; slot 0 is the top of the ring
+                box = (0, self.ring_h - (slot + 1) * self.line_h, self.rect[2], self.line_h)
+                self.fbo.scissor = box
+                self.fbo.viewport = (-self.rect[0], box[1] + self.line_h - HEIGHT, WIDTH, HEIGHT)
+                self.fbo.use()
+                self.fbo.clear(0.0, 0.0, 0.0, 0.0, viewport=box)
+                if row is not None:
+                    draw_row(row)
+                    self.bakes += 1
+                self.serials[slot] = serial
+        finally:
+            self.ctx.blend_func = BLEND_FUNC_STRAIGHT
+            prev_fbo.use()
+
+    def composite(self, offset):
+        x, y, w, h = self.rect
+        self.state.uniform(self.prog, 'position', (x, y))
+        self.state.uniform(self.prog, 'size', (w, h))
+        self.state.uniform(self.prog, 'scroll', (self.head % self.slots) * self.line_h + offset)
+        self.state.uniform(self.prog, 'ring_h', self.ring_h)
+        self.state.texture(self.texture)
+        self.ctx.blend_func = BLEND_FUNC_PREMULT
+        self.vao.render(moderngl.TRIANGLE_STRIP)
+        self.ctx.blend_func = BLEND_FUNC_STRAIGHT
+
+    def release(self):
+        self.vao.release()
+        self.fbo.release()
+        self.texture.release()
+
+class Wallpaper:
+    """
+    Panel-sized wallpaper texture(s) sampled 1:1, so no mipmaps. show() swaps the picture at
+    once; fade_to() streams the next one into a second texture through a pixel buffer,
+    WALLPAPER_UPLOAD_ROWS rows per update(), then crossfades over WALLPAPER_FADE seconds.
+    `key` changes whenever what draw() would produce does.
+    """
+    def __init__(self, ctx, state, prog, vao):
+        self.ctx = ctx
+        self.state = state
+        self.prog = prog
+        self.vao = vao
+        self.texture = None
+        self.next = None
+        self.pending = None       # pixels still being streamed into next
+        self.row = 0
+        self.fade_t0 = None
+        self.fade = 0.0
+        self.generation = 0
+        self.pbo = None
+
+    @property
+    def key(self):
+        return (self.generation, round(self.fade * 255))
+
+    @property
+    def nbytes(self):
+        # drivers typically pad RGB8 to 4 bytes a texel
+        return sum(WIDTH * HEIGHT * 4 for tex in (self.texture, self.next) if tex is not None)
+
+    def _texture(self):
+        tex = self.ctx.texture((WIDTH, HEIGHT), 3)
+        tex.repeat_x = tex.repeat_y = False
+        return tex
+
+    def show(self, pixels):
+        tex = self._texture()
+        tex.write(pixels.tobytes())
+        self._drop_next()
+        if self.texture is not None:
+            self.texture.release()
+        self.texture = tex
+        self.generation += 1
+
+    def fade_to(self, pixels):
+        if self.texture is None:
+            self.show(pixels)
+            return
+        if self.next is None:
+            self.next = self._texture()
+        if self.pbo is None:
+            self.pbo = self.ctx.buffer(reserve=WIDTH * 3 * max(1, WALLPAPER_UPLOAD_ROWS), dynamic=True)
+        self.pending = pixels
+        self.row = 0
+        self.fade_t0 = None
+        self.fade = 0.0
+        self.generation += 1
+
+    def _drop_next(self):
+        if self.next is not None:
+            self.next.release()
+        self.next = self.pending = self.fade_t0 = None
+        self.fade = 0.0
+
+    def update(self, now_t):
+        if self.pending is not None:
+            rows = min(self.pbo.size // (WIDTH * 3), HEIGHT - self.row)
+            self.pbo.orphan()
+            self.pbo.write(self.pending[self.row:self.row + rows].tobytes())
+            self.next.write(self.pbo, viewport=(0, self.row, WIDTH, rows))
+            self.row += rows
+            if self.row >= HEIGHT:
+                self.pending = None
+                self.fade_t0 = now_t
+        if self.fade_t0 is not None:
+            self.fade = min(1.0, (now_t - self.fade_t0) / max(WALLPAPER_FADE, 1e-3))
+            if self.fade >= 1.0:
+                self.texture.release()
+                self.texture, self.next = self.next, None
+                self.fade_t0 = None
+                self.fade = 0.0
+                self.generation += 1
+
+    def draw(self):
+        for tex, alpha in ((self.texture, 1.0), (self.next, self.fade)):
+            if tex is not None and alpha > 0.0:
+                self.state.uniform(self.prog, 'alpha', alpha)
+                self.state.texture(tex)
+                self.vao.render(moderngl.TRIANGLE_STRIP)
+
+    def release(self):
+        self._drop_next()
+        for obj in (self.texture, self.pbo):
+            if obj is not None:
+                obj.release()
+        self.texture = self.pbo = None
+
+# -------------------------
+# Persistent streaming geometry buffers
+# -------------------------
+STREAM_VERTICES = 16384   # per vertex format; the buffer is orphaned when it wraps
+GL_ALLOC_REPORT_INTERVAL = 60.0   # seconds between GL object allocation reports
+
+class StreamBuffer:
+    """
+    One persistent dynamic buffer per vertex format for geometry rebuilt every frame.
+    draw() writes the vertices at the next free offset and renders them from a VAO
+    cached per program, so steady-state frames create no GL objects. A draw larger than
+    the buffer grows it (to the next power of two) once.
+    """
+    def __init__(self, ctx, fmt, attrs, floats_per_vertex, capacity=STREAM_VERTICES):
+        self.ctx = ctx
+        self.fmt = fmt
+        self.attrs = attrs
+        self.floats = floats_per_vertex
+        self.capacity = capacity
+        self.buffer = ctx.buffer(reserve=capacity * floats_per_vertex * 4, dynamic=True)
+        self.vaos = {}
+        self.head = 0
+
+    def vao(self, prog):
+        vao = self.vaos.get(prog)
+        if vao is None:
+            vao = self.ctx.vertex_array(prog, [(self.buffer, self.fmt, *self.attrs)])
+            self.vaos[prog] = vao
+        return vao
+
+    def draw(self, prog, mode, vertices):
+        data = np.asarray(vertices, 'f4')
+        count = data.size // self.floats
+        if count == 0:
+            return
+        if count > self.capacity:
+            # the cached VAOs point at the old buffer
+            for vao in self.vaos.values():
+                vao.release()
+            self.vaos = {}
+            self.buffer.release()
+            self.capacity = 1 << (count - 1).bit_length()
+            self.buffer = self.ctx.buffer(reserve=self.capacity * self.floats * 4, dynamic=True)
+            self.head = 0
+        elif self.head + count > self.capacity:
+            # wrap: fresh storage so the GPU can still read last frame's data
+            self.buffer.orphan()
+            self.head = 0
+        self.buffer.write(data, offset=self.head * self.floats * 4)
+        self.vao(prog).render(mode, vertices=count, first=self.head)
+        self.head += count
+
+class VectorBatch:
+    """
+    Frame-scoped 2D geometry in pixel space with a colour per vertex. Lines of any width
+    are emitted as quads, so lines, triangles and circles all end up in one triangle list
+    that flush() draws with a single call, in the order they were added.
+    """
+    def __init__(self, prog, stream):
+        self.prog = prog
+        self.stream = stream      # '2f 4f': in_pos, in_color
+        self.data = []
+        self.draw_calls = 0
+
+    def line(self, x1, y1, x2, y2, width, color):
+        dx, dy = x2 - x1, y2 - y1
+        k = 0.5 * width / (math.hypot(dx, dy) or 1.0)
+        nx, ny = -dy * k, dx * k
+        self.data += (x1 + nx, y1 + ny, *color, x1 - nx, y1 - ny, *color, x2 + nx, y2 + ny, *color,
+                      x2 + nx, y2 + ny, *color, x1 - nx, y1 - ny, *color, x2 - nx, y2 - ny, *color)
+
+    def lines(self, points, width, color):
+        """Segments given as x1, y1, x2, y2, x1, y1, ... (GL_LINES order)."""
+        for i in range(0, len(points) - 3, 4):
+            self.line(points[i], points[i + 1], points[i + 2], points[i + 3], width, color)
+
+    def triangle(self, a, b, c, color_a, color_b=None, color_c=None):
+        self.data += (*a, *color_a, *b, *(color_b or color_a), *c, *(color_c or color_a))
+
+    def circle(self, cx, cy, r, color, segments=16):
+        step = 2.0 * math.pi / segments
+        for i in range(segments):
+            self.triangle((cx, cy), (cx + r * math.cos(i * step), cy + r * math.sin(i * step)),
+                          (cx + r * math.cos((i + 1) * step), cy + r * math.sin((i + 1) * step)), color)
+
+    def flush(self):
+        if self.data:
+            self.stream.draw(self.prog, moderngl.TRIANGLES, self.data)
+            self.data = []
+            self.draw_calls += 1
+
+class GLObjectCounter:
+    """Counts GL objects created through ctx (buffers, VAOs, textures, framebuffers)."""
+    KINDS = ('buffer', 'vertex_array', 'simple_vertex_array', 'texture', 'framebuffer')
+
+    def __init__(self, ctx):
+        self.created = 0
+        for name in self.KINDS:
+            setattr(ctx, name, self._counted(getattr(ctx, name)))
+
+    def _counted(self, create):
+        def counted(*args, **kwargs):
+            self.created += 1
+            return create(*args, **kwargs)
+        return counted
+
+# -------------------------
+# Frame uniforms & redundant-state filter
+# -------------------------
+class FrameUniforms:
+    """
+    The Frame block (FRAME_BLOCK) every program reads instead of its own copy of mvp: one
+    std140 buffer bound at FRAME_BINDING. mvp and screen are written once per context;
+    set_time() rewrites the one float that moves.
+    """
+    TIME_OFFSET = 72    # std140: mat4 at 0, vec2 at 64, float at 72; 80 bytes in all
+
+    def __init__(self, ctx, state, mvp):
+        self.state = state
+        data = np.zeros(20, 'f4')
+        data[:16] = mvp.flatten()
+        data[16:18] = (WIDTH, HEIGHT)
+        self.buffer = ctx.buffer(data)
+        self.buffer.bind_to_uniform_block(FRAME_BINDING)
+        self.time = 0.0
+
+    def set_time(self, t):
+        if GL_STATE_FILTER and t == self.time:
+            self.state.avoided['uniform'] += 1
+            return
+        self.buffer.write(struct.pack('f', t), offset=self.TIME_OFFSET)
+        self.time = t
+        self.state.issued['uniform'] += 1
+
+class GLState:
+    """
+    The last value written to each (program, uniform), the texture on each unit and the
+    line width, so writes that would change nothing are skipped (GL_STATE_FILTER). Writes
+    made while drawing must all come through here or the cache goes stale; one-off setup
+    writes may go straight to the program. issued/avoided count writes by kind until take().
+    """
+    KINDS = ('uniform', 'texture', 'line_width')
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.values = {}      # (program, name) -> value
+        self.bound = {}       # texture unit -> texture
+        self.width = None
+        self.frames = 0
+        self.issued = dict.fromkeys(self.KINDS, 0)
+        self.avoided = dict.fromkeys(self.KINDS, 0)
+
+    def uniform(self, prog, name, value):
+        key = (prog, name)
+        if GL_STATE_FILTER and self.values.get(key) == value:
+            self.avoided['uniform'] += 1
+            return
+        prog[name].value = value
+        self.values[key] = value
+        self.issued['uniform'] += 1
+
+    def texture(self, texture, location=0):
+        if GL_STATE_FILTER and self.bound.get(location) is texture:
+            self.avoided['texture'] += 1
+            return
+        texture.use(location=location)
+        self.bound[location] = texture
+        self.issued['texture'] += 1
+
+    def line_width(self, width):
+        if GL_STATE_FILTER and self.width == width:
+            self.avoided['line_width'] += 1
+            return
+        self.ctx.line_width = width
+        self.width = width
+        self.issued['line_width'] += 1
+
+    def end_frame(self):
+        self.frames += 1
+
+    def stats(self):
+        """Writes issued and avoided per drawn frame since the last take(), by kind."""
+        n = max(1, self.frames)
+        return {"frames": self.frames,
+                "issued": {kind: round(count / n, 1) for kind, count in self.issued.items()},
+                "avoided": {kind: round(count / n, 1) for kind, count in self.avoided.items()}}
+
+    def take(self):
+        """stats() as one line, then start counting afresh."""
+        n = max(1, self.frames)
+        kinds = ", ".join(f"{kind.replace('_', ' ')} {self.issued[kind] / n:.1f}/{self.avoided[kind] / n:.1f}"
+                          for kind in self.KINDS)
+        line = (f"GL state: {sum(self.issued.values()) / n:.1f} writes issued, "
+                f"{sum(self.avoided.values()) / n:.1f} avoided per drawn frame over {self.frames} ({kinds})")
+        self.frames = 0
+        self.issued = dict.fromkeys(self.KINDS, 0)
+        self.avoided = dict.fromkeys(self.KINDS, 0)
+        return line
+
+# -------------------------
+# Damage tracking & frame pacing
+# -------------------------
+EGL_EXTENSIONS = 0x3055
+EGL_DRAW = 0x3059
+
+class DamageTracker:
+    """
+    Screen rectangles (pixels) changed since the last presented frame. The frame is drawn
+    into a persistent offscreen buffer; begin() clears the rectangles to opaque black, writes
+    them into its depth attachment and enables a depth test (plus a scissor on their bounding
+    box), so the unchanged draw sequence only shades pixels inside them and keeps the rest
+    from last frame.
+    """
+    def __init__(self, ctx, fbo, mask_prog, stream):
+        self.ctx = ctx
+        self.fbo = fbo
+        self.mask_prog = mask_prog
+        self.stream = stream
+        self.boxes = []          # (N, 4) arrays of x0, y0, x1, y1
+        self.full = True
+        self.rects = None
+
+    def add(self, x, y, w, h):
+        self.boxes.append(np.array([[x, y, x + w, y + h]], 'f8'))
+
+    def add_points(self, points, radius):
+        """Boxes of the given radius around an (N, 2) array of pixel positions."""
+        self.boxes.append(np.hstack((points - radius, points + radius)))
+
+    def add_full(self):
+        self.full = True
+
+    @property
+    def dirty(self):
+        return self.full or bool(self.boxes)
+
+    def _clipped(self):
+        boxes = np.concatenate(self.boxes)
+        if len(boxes) > DAMAGE_MAX_BOXES:
+            # one mask quad instead of a stream draw sized by the box count
+            boxes = np.concatenate((boxes[:, :2].min(axis=0), boxes[:, 2:].max(axis=0)))[None]
+        boxes[:, 0:4:2] = np.clip(boxes[:, 0:4:2], 0, WIDTH)
+        boxes[:, 1:4:2] = np.clip(boxes[:, 1:4:2], 0, HEIGHT)
+        boxes[:, :2] = np.floor(boxes[:, :2])
+        boxes[:, 2:] = np.ceil(boxes[:, 2:])
+        boxes = boxes[(boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1])]
+        # all off-screen: an empty box keeps the scissor/mask logic uniform
+        return boxes.astype('i4') if len(boxes) else np.zeros((1, 4), 'i4')
+
+    def begin(self):
+        """Bind the frame buffer and restrict drawing to the damage; returns the pixel count."""
+        ctx = self.ctx
+        self.fbo.use()
+        if self.full:
+            ctx.clear(0.0, 0.0, 0.0, 1.0)
+            self.rects = None
+            return WIDTH * HEIGHT
+        boxes = self._clipped()
+        x0, y0 = boxes[:, :2].min(axis=0)
+        x1, y1 = boxes[:, 2:].max(axis=0)
+        ctx.scissor = (int(x0), int(HEIGHT - y1), int(x1 - x0), int(y1 - y0))
+        # moderngl applies an fbo's write masks when it is bound; fbo.clear() ignores the scissor
+        self.fbo.color_mask = (False, False, False, False)
+        self.fbo.use()
+        self.fbo.clear(depth=1.0)
+        self.fbo.color_mask = (True, True, True, True)
+        self.fbo.use()
+        ctx.enable(moderngl.DEPTH_TEST)
+        ctx.depth_func = '1'
+        # the mask quads also clear the colour inside the boxes (opaque, unblended), so
+        # nothing blends over last frame's pixels there when no wallpaper is drawn under it
+        ctx.disable(moderngl.BLEND)
+        bx0, by0, bx1, by1 = boxes.T.astype('f4')
+        quads = np.stack((bx0, by0, bx1, by0, bx0, by1, bx0, by1, bx1, by0, bx1, by1), axis=1)
+        self.stream.draw(self.mask_prog, moderngl.TRIANGLES, quads)
+        ctx.enable(moderngl.BLEND)
+        self.fbo.depth_mask = False
+        self.fbo.use()
+        ctx.depth_func = '>='
+        # GL (bottom-left origin) rects for the swap
+        self.rects = np.column_stack((boxes[:, 0], HEIGHT - boxes[:, 3],
+                                      boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]))
+        return int(min(WIDTH * HEIGHT, (self.rects[:, 2] * self.rects[:, 3]).sum()))
+
+    def end(self):
+        """Back to unrestricted drawing; returns the damaged GL rects (None: whole frame)."""
+        rects = self.rects
+        if rects is not None:
+            self.ctx.disable(moderngl.DEPTH_TEST)
+            self.fbo.depth_mask = True
+            self.ctx.scissor = None
+        self.boxes = []
+        self.full = False
+        return rects
+
+class DamagePresenter:
+    """
+    Presents through eglSwapBuffersWithDamage{KHR,EXT} on SDL's current EGL surface, so the
+    compositor only recomposes the changed rects. Falls back to pygame.display.flip() when
+    EGL, the surface or the extension is unavailable, or a swap fails.
+    """
+    def __init__(self):
+        self.swap = None
+        if not SWAP_WITH_DAMAGE:
+            return
+        try:
+            egl = ctypes.CDLL("libEGL.so.1")
+        except OSError:
+            return
+        egl.eglGetCurrentDisplay.restype = ctypes.c_void_p
+        egl.eglGetCurrentSurface.restype = ctypes.c_void_p
+        egl.eglGetCurrentSurface.argtypes = [ctypes.c_int]
+        egl.eglQueryString.restype = ctypes.c_char_p
+        egl.eglQueryString.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        egl.eglGetProcAddress.restype = ctypes.c_void_p
+        egl.eglGetProcAddress.argtypes = [ctypes.c_char_p]
+        self.display = egl.eglGetCurrentDisplay()
+        self.surface = egl.eglGetCurrentSurface(EGL_DRAW)
+        if not self.display or not self.surface:
+            return
+        extensions = (egl.eglQueryString(self.display, EGL_EXTENSIONS) or b"").split()
+        for suffix in (b"KHR", b"EXT"):
+            if b"EGL_" + suffix + b"_swap_buffers_with_damage" in extensions:
+                proc = egl.eglGetProcAddress(b"eglSwapBuffersWithDamage" + suffix)
+                if proc:
+                    proto = ctypes.CFUNCTYPE(ctypes.c_uint, ctypes.c_void_p, ctypes.c_void_p,
+                                             ctypes.POINTER(ctypes.c_int), ctypes.c_int)
+                    self.swap = proto(proc)
+                    print(f"Presenting with eglSwapBuffersWithDamage{suffix.decode()}")
+                    return
+
+    def present(self, rects):
+        if self.swap is None or rects is None:
+            pygame.display.flip()
+            return
+        flat = np.ascontiguousarray(rects, 'i4')
+        if not self.swap(self.display, self.surface, flat.ctypes.data_as(ctypes.POINTER(ctypes.c_int)), len(flat)):
+            self.swap = None
+            pygame.display.flip()
+
+def frame_rate(speed):
+    """Loop rate (Hz) keeping the fastest motion (pixels/s) within MOTION_STEP_PX per frame."""
+    return max(FPS_MIN, min(FPS, math.ceil(speed / MOTION_STEP_PX)))
+
+# -------------------------
+# Frame profiling
+# -------------------------
+PROFILE_QUERY_LAG = 3     # GPU results are read this many frames later, so readback never stalls
+
+class _Phase:
+    __slots__ = ('profiler', 'row', 'query', 't0')
+
+    def __init__(self, profiler, row):
+        self.profiler = profiler
+        self.row = row
+        self.query = None
+
+    def __enter__(self):
+        prof = self.profiler
+        self.query = prof._query(self.row)
+        if self.query is not None:
+            self.query.__enter__()
+        self.t0 = time.perf_counter_ns()
+
+    def __exit__(self, *exc):
+        prof = self.profiler
+        prof.cpu[self.row, prof.slot] = (time.perf_counter_ns() - self.t0) * 1e-6
+        if self.query is not None:
+            self.query.__exit__(*exc)
+
+class _NoPhase:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+def process_uptime():
+    """Seconds since this process started (kernel start time, so imports count); None off Linux."""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        return time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+class StartupTimeline:
+    """
+    Wall time of each startup stage, from process start to the first presented frame.
+    marks: (stage, perf_counter() at its end), in order; the first stage starts with the
+    process (process_uptime(); with no /proc, at its own end). mark() adds one until done().
+    """
+    def __init__(self, marks=()):
+        uptime = process_uptime()
+        self.t0 = time.perf_counter() - uptime if uptime is not None else None
+        self.marks = list(marks)
+        self.finished = False
+
+    def mark(self, stage):
+        if not self.finished:
+            self.marks.append((stage, time.perf_counter()))
+
+    def done(self, stage):
+        """End the last stage; True the first time (when there is something to report)."""
+        if self.finished:
+            return False
+        self.mark(stage)
+        self.finished = True
+        return True
+
+    def summary(self):
+        start = self.t0 if self.t0 is not None else self.marks[0][1]
+        stages, prev = {}, start
+        for stage, t in self.marks:
+            stages[stage] = round(1000.0 * (t - prev), 1)
+            prev = t
+        return {"total_ms": round(1000.0 * (prev - start), 1), "stages_ms": stages}
+
+    def report(self):
+        summary = self.summary()
+        return (f"{summary['total_ms']:.0f} ms after the process started ("
+                + ", ".join(f"{stage} {ms:.0f}" for stage, ms in summary["stages_ms"].items()) + ")")
+
+class FrameProfiler:
+    """
+    Per-phase timings of the main loop: CPU time from perf_counter_ns and GPU time from
+    GL_TIME_ELAPSED queries (when the driver has them), in fixed-size numpy rings of
+    PROFILE_WINDOW frames. Usage: `with profiler.phase('draw_clock'): ...` between
+    begin_frame() and end_frame(). summary() gives p50/p95/p99 in ms; dump() writes it to
+    PROFILE_FILE and hands it to the PROFILE_SOCKET server. Phases a frame skips stay NaN.
+    `sections` maps extra summary keys to callables returning JSON-able values. GPU queries
+    belong to the context given to attach(); the rings outlive it.
+    """
+    def __init__(self, phases, window=PROFILE_WINDOW, enabled=PROFILE):
+        self.enabled = enabled
+        self.names = list(phases)
+        self.window = window
+        self.cpu = np.full((len(self.names), window), np.nan)
+        self.gpu = np.full((len(self.names), window), np.nan)
+        self.frames = 0
+        self.slot = 0
+        self.latest = b"{}\n"
+        self.sections = {}
+        self._no_phase = _NoPhase()
+        self.query_base = 0
+        self._phases = {name: _Phase(self, row) for row, name in enumerate(self.names)}
+        # queries[lag slot][row], plus which of them were issued in that frame
+        self.queries = None
+        self.issued = [set() for _ in range(PROFILE_QUERY_LAG)]
+        if enabled and PROFILE_SOCKET:
+            threading.Thread(target=self._serve, daemon=True).start()
+
+    def attach(self, ctx):
+        """Time GPU phases with queries of ctx (a new context drops the old one's pending results)."""
+        self.queries = None
+        self.issued = [set() for _ in range(PROFILE_QUERY_LAG)]
+        self.query_base = self.frames
+        if self.enabled and self._has_timer_queries(ctx):
+            try:
+                self.queries = [[ctx.query(time=True) for _ in self.names] for _ in range(PROFILE_QUERY_LAG)]
+            except moderngl.Error as e:
+                print(f"GPU timer queries unavailable: {e}")
+
+    @staticmethod
+    def _has_timer_queries(ctx):
+        ext = ctx.extensions
+        return ctx.version_code >= 330 or 'GL_ARB_timer_query' in ext or 'GL_EXT_disjoint_timer_query' in ext
+
+    def phase(self, name):
+        return self._phases[name] if self.enabled else self._no_phase
+
+    def _query(self, row):
+        if self.queries is None:
+            return None
+        lag = self.frames % PROFILE_QUERY_LAG
+        self.issued[lag].add(row)
+        return self.queries[lag][row]
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.slot = self.frames % self.window
+        self.cpu[:, self.slot] = np.nan
+        self.gpu[:, self.slot] = np.nan
+        if self.queries is not None and self.frames - self.query_base >= PROFILE_QUERY_LAG:
+            # the queries about to be reused belong to frame (frames - lag)
+            lag = self.frames % PROFILE_QUERY_LAG
+            slot = (self.frames - PROFILE_QUERY_LAG) % self.window
+            for row in self.issued[lag]:
+                self.gpu[row, slot] = self.queries[lag][row].elapsed * 1e-6
+            self.issued[lag].clear()
+
+    def end_frame(self):
+        if self.enabled:
+            self.frames += 1
+
+    def summary(self):
+        n = min(self.frames, self.window)
+
+        def stats(samples):
+            samples = samples[~np.isnan(samples)]
+            if not len(samples):
+                return None
+            p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+            return {"p50": round(p50, 3), "p95": round(p95, 3), "p99": round(p99, 3)}
+
+        cpu = self.cpu[:, :n]
+        gpu = self.gpu[:, :n]
+        return {
+            "frames": self.frames,
+            "window": n,
+            "gpu_queries": self.queries is not None,
+            "frame_cpu_ms": stats(np.nansum(cpu, axis=0)),
+            "phases": {name: {"cpu_ms": stats(cpu[row]), "gpu_ms": stats(gpu[row])}
+                       for row, name in enumerate(self.names)},
+            **{key: section() for key, section in self.sections.items()},
+        }
+
+    def dump(self, path=PROFILE_FILE):
+        if not self.enabled:
+            return
+        self.latest = (json.dumps(self.summary(), indent=1) + "\n").encode()
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", "wb") as f:
+                f.write(self.latest)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            print(f"Frame profile not written: {e}")
+
+    def _serve(self):
+        """Every connection to PROFILE_SOCKET gets the latest summary, then is closed."""
+        try:
+            if os.path.exists(PROFILE_SOCKET):
+                os.remove(PROFILE_SOCKET)
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(PROFILE_SOCKET)
+            server.listen(4)
+        except OSError as e:
+            print(f"Frame profile socket unavailable: {e}")
+            return
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                try:
+                    conn.sendall(self.latest)
+                except OSError:
+                    pass
+
+# -------------------------
+# Config file
+# -------------------------
+# settings applied while running: the subsystems to rebuild when one changes (() = read where used)
+CONFIG_LIVE = {
+    "FPS": (), "FPS_MIN": (), "MOTION_STEP_PX": (), "DAMAGE_TRACKING": (), "DAMAGE_MAX_BOXES": (),
+    "PROFILE_INTERVAL": (),
+    "TEXT_BATCHING": (), "TEXT_RUN_CACHE": (), "TICKER_STRIP": ("frame",), "GL_STATE_FILTER": (),
+    "SCROLL_SPEED": ("scroller",), "INJECT_EVERY": ("scroller",), "MAX_RSS_PER_FETCH": ("scroller",),
+    "FEED_URLS": ("fetch",), "FETCH_INTERVAL": ("fetch",), "WEATHER_FETCH_INTERVAL": ("fetch",),
+    "WEATHER_LOCATION": ("weather",),
+    "FETCH_TIMEOUT": (), "FETCH_BACKOFF_BASE": (), "FETCH_BACKOFF_MAX": (), "OPEN_METEO_LAG": (),
+    "SNAPSHOT_INTERVAL": (),
+    "DEDUP_TTL": ("dedup",), "DEDUP_CAPACITY": ("dedup",),
+    "WALLPAPER": ("wallpaper",), "WALLPAPER_SLIDESHOW": ("wallpaper",),
+    "WALLPAPER_INTERVAL": (), "WALLPAPER_FADE": (), "WALLPAPER_UPLOAD_ROWS": (),
+    "PARTICLE_COUNT": ("particles",), "PARTICLE_SPEED": ("particles",),
+    "HOTPLUG_RECHECK": (), "HOTPLUG_SETTLE": (), "HOTPLUG_RETRY": (), "GLYPH_RASTER_BUDGET": (),
+    "TESS_SIZE": ("tesseract",), "TESS_CHANGE_INTERVAL": ("tesseract",), "TESS_ROT_SPEED": ("tesseract",),
+    "FONT_SIZE": ("atlas", "scroller", "ticker", "clock"),
+    "TINY_FONT_SIZE": ("atlas", "clock"),
+    "SMALL_FONT_SIZE": ("clock",),
+    "CLOCK_ZONE": ("clock",), "SUBDIAL_ZONES": ("clock",), "WORLD_CLOCK_ROWS": ("clock",),
+    "COLOR_WHITE": ("ticker",), "ICON_COLORS": ("ticker",), "ICON_LAYER_COLORS": ("ticker",),
+}
+# settings read from the file at startup only (layout, pools, the profiler)
+CONFIG_RESTART = ("WIDTH", "HEIGHT", "CLOCK_W", "SCROLL_H", "ROW_PADDING_Y", "LEFT_PAD", "GAP_ICON_TEXT",
+                  "MAX_TEXT_CHARS", "FETCH_POOL_SIZE", "FETCH_QUEUE_SIZE", "HTTP_CACHE", "ATLAS_FONT",
+                  "ATLAS_CHARS", "TEXT_RUN_CACHE_SIZE", "PROFILE", "PROFILE_WINDOW", "SWAP_WITH_DAMAGE",
+                  "DISPLAY_NAME", "DRM_SYSFS", "GLYPH_CACHE_SLOTS", "ATLAS_WORKERS", "ATLAS_PARALLEL_TILES",
+                  "SNAPSHOT_FILE", "SNAPSHOT_MAX_AGE")
+CONFIG_DEFAULTS = {key: globals()[key] for key in (*CONFIG_LIVE, *CONFIG_RESTART)}
+# the item shape of lists that are empty by default, for config_value()
+CONFIG_LIST_ITEMS = {"WALLPAPER_SLIDESHOW": "", "WORLD_CLOCK_ROWS": ("", "")}
+
+def derive_config():
+    """Recompute the settings derived from others (as in Configuration)."""
+    global FEED_W, LINE_H, ICON_SIZE, ATLAS_SIZES, TESS_X, TESS_Y
+    FEED_W = WIDTH - CLOCK_W
+    LINE_H = FONT_SIZE + 2 * ROW_PADDING_Y
+    ICON_SIZE = FONT_SIZE
+    ATLAS_SIZES = tuple(sorted({FONT_SIZE, TINY_FONT_SIZE}, reverse=True))
+    TESS_X = WIDTH - (TESS_SIZE * 0.5) - 50
+    TESS_Y = (TESS_SIZE * 0.5) + 50
+
+def config_value(default, value):
+    """
+    value from TOML shaped like default: ints for floats, int dict keys, tuples item by item
+    (same length), list items like the default's first (unchecked when the default is empty).
+    """
+    if isinstance(default, bool) or isinstance(value, bool):
+        if type(default) is not type(value):
+            raise TypeError(f"expected {type(default).__name__}, got {value!r}")
+        return value
+    if isinstance(default, float) and isinstance(value, int):
+        return float(value)
+    if isinstance(default, tuple) and isinstance(value, list):
+        if len(value) != len(default):
+            raise ValueError(f"expected {len(default)} items, got {value!r}")
+        return tuple(config_value(d, v) for d, v in zip(default, value))
+    if isinstance(default, list) and isinstance(value, list):
+        return [config_value(default[0], v) for v in value] if default else value
+    if isinstance(default, dict) and isinstance(value, dict):
+        merged = dict(default)
+        for k, v in value.items():
+            key = int(k) if default and all(isinstance(d, int) for d in default) else k
+            merged[key] = config_value(default[key], v) if key in default else v
+        return merged
+    if type(default) is not type(value):
+        raise TypeError(f"expected {type(default).__name__}, got {value!r}")
+    return value
+
+def read_config(path):
+    """
+    Effective settings: CONFIG_DEFAULTS overridden by the file's entries. Unknown or
+    mistyped entries are reported and skipped; a missing file means the defaults. Raises
+    OSError / tomllib.TOMLDecodeError for an unreadable file.
+    """
+    values = dict(CONFIG_DEFAULTS)
+    if path is None or not os.path.exists(path):
+        return values
+    if tomllib is None:
+        print(f"Config: {path} ignored, reading TOML needs Python 3.11")
+        return values
+    with open(path, "rb") as f:
+        data = tomllib.load(f)
+    for key, value in data.items():
+        if key not in values:
+            print(f"Config: unknown setting {key}")
+            continue
+        try:
+            default = CONFIG_DEFAULTS[key]
+            if key in CONFIG_LIST_ITEMS and not default:
+                default = [CONFIG_LIST_ITEMS[key]]
+            values[key] = config_value(default, value)
+        except (TypeError, ValueError, KeyError, IndexError) as e:
+            print(f"Config: {key}: {e}")
+    return values
+
+def apply_config(values, live=True):
+    """
+    Make values the module's settings. Returns {key: value} of what changed; when live,
+    CONFIG_RESTART settings are left as they are (with a note) instead.
+    """
+    changed = {}
+    for key, value in values.items():
+        if globals()[key] == value:
+            continue
+        if live and key not in CONFIG_LIVE:
+            print(f"Config: {key} takes effect after a restart")
+            continue
+        globals()[key] = value
+        changed[key] = value
+    derive_config()
+    return changed
+
+class ConfigWatcher:
+    """
+    changed() is True once after the config file was written, replaced or removed. Watches
+    the file's directory with inotify (editors save by renaming) through a non-blocking fd,
+    so checking every frame is one read() syscall; without inotify (or the directory) it
+    compares the file's mtime once a second.
+    """
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_DELETE = 0x200
+
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path).encode()
+        self.fd = None
+        self.mtime = self._mtime()
+        self.next_stat = 0.0
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            mask = self.IN_CLOSE_WRITE | self.IN_MOVED_FROM | self.IN_MOVED_TO | self.IN_DELETE
+            if libc.inotify_add_watch(fd, os.path.dirname(path).encode(), mask) < 0:
+                err = ctypes.get_errno()
+                os.close(fd)
+                raise OSError(err, os.strerror(err))
+            self.fd = fd
+        except (OSError, AttributeError) as e:
+            print(f"Config: not watching {os.path.dirname(path)} ({e}); checking {path} once a second")
+
+    def _mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def changed(self):
+        if self.fd is None:
+            now = time.monotonic()
+            if now < self.next_stat:
+                return False
+            self.next_stat = now + 1.0
+            mtime = self._mtime()
+            changed, self.mtime = mtime != self.mtime, mtime
+            return changed
+        hit = False
+        while True:
+            try:
+                data = os.read(self.fd, 4096)
+            except BlockingIOError:
+                return hit
+            pos = 0
+            while pos + 16 <= len(data):
+                _, _, _, length = struct.unpack_from("iIII", data, pos)
+                hit |= data[pos + 16:pos + 16 + length].rstrip(b"\0") == self.name
+                pos += 16 + length
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
 # -------------------------
 # Utility: text rendering & pixel width
 # -------------------------
 # These will be created after atlas build in main() because they need glyph_uvs/glyph_widths
 
 def get_display_index(display_name):
-    """Return the Pygame display index for the given display name using wlr-randr."""
-    while True:
+    """
+    The Pygame display index of the named output according to wlr-randr: its position among
+    the enabled outputs. None if it is missing, disabled or wlr-randr fails; 0 if there is
+    no wlr-randr to ask (retrying would never succeed).
+    """
+    try:
+        result = subprocess.run(['wlr-randr'], capture_output=True, text=True, check=True, timeout=5)
+    except FileNotFoundError:
+        print(f"wlr-randr not found; assuming {display_name} is display 0")
+        return 0
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        print(f"Error running wlr-randr: {e}")
+        return None
+    outputs = []    # [name, enabled]
+    for line in result.stdout.splitlines():
+        if line.strip() and not line[0].isspace():
+            outputs.append([line.split()[0], True])
+        elif outputs and line.strip().startswith("Enabled:"):
+            outputs[-1][1] = line.split(":", 1)[1].strip() == "yes"
+    enabled = [name for name, on in outputs if on]
+    return enabled.index(display_name) if display_name in enabled else None
+
+NETLINK_KOBJECT_UEVENT = 15
+
+class OutputMonitor:
+    """
+    Connection state of one DRM connector from <DRM_SYSFS>/card*-<name>/status. Kernel
+    hotplug uevents (a non-blocking NETLINK_KOBJECT_UEVENT socket) trigger a re-read, so
+    poll() costs one recv() per frame; the file is also re-read every HOTPLUG_RECHECK in
+    case events are unavailable. connected is None when sysfs has no such connector.
+    """
+    def __init__(self, name, sysfs=DRM_SYSFS):
+        self.name = name
+        self.sysfs = sysfs
+        self.connected = self._read()
+        self.next_check = time.monotonic() + HOTPLUG_RECHECK
+        self.sock = None
         try:
-            result = subprocess.run(['wlr-randr'], capture_output=True, text=True, check=True)
-            lines = result.stdout.splitlines()
-            index = 0
-            for line in lines:
-                lstripped = line.strip()
-                if lstripped and not line.startswith(' '):
-                    if lstripped.startswith(display_name):
-                        print(f"Display {display_name} found on index {index}.")
-                        return index
-                index += 1
-            print(f"Display {display_name} not found")
-            sleep(1)
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            print(f"Error running wlr-randr.")
-
-# Set SDL/pygame environment variables BEFORE importing pygame/initializing SDL
-# Use wayland backend and instruct SDL which display index should be used for fullscreen
-display_index = get_display_index("HDMI-A-1")
-os.environ.setdefault("SDL_VIDEODRIVER", "wayland")
-os.environ["SDL_VIDEO_FULLSCREEN_DISPLAY"] = str(display_index)
-os.environ["SDL_VIDEO_WINDOW_POS"] = "0,0"
-
-# Now import pygame and create fullscreen window on the chosen display
-import pygame
-from pygame.locals import *
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+            sock.bind((0, 1))    # kernel-assigned port, multicast group 1: kernel uevents
+            sock.setblocking(False)
+            self.sock = sock
+        except (OSError, AttributeError) as e:
+            print(f"Display: no hotplug uevents ({e}); checking {name} every {HOTPLUG_RECHECK:.0f} s")
+        if self.connected is None:
+            print(f"Display: no DRM connector {name} under {sysfs}; unplugs go unnoticed")
+
+    def _read(self):
+        for path in glob.glob(os.path.join(self.sysfs, f"card*-{self.name}", "status")):
+            try:
+                with open(path) as f:
+                    return f.read().strip() == "connected"
+            except OSError:
+                pass
+        return None
+
+    def _uevents(self):
+        hit = False
+        while self.sock is not None:
+            try:
+                hit |= b"SUBSYSTEM=drm" in self.sock.recv(16384)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                if e.errno == errno.ENOBUFS:
+                    # a burst overflowed the socket: events were lost, so re-read the status
+                    hit = True
+                    continue
+                print(f"Display: hotplug uevents failed ({e}); checking {self.name} every {HOTPLUG_RECHECK:.0f} s")
+                self.close()
+                return True
+        return hit
+
+    def poll(self):
+        """'connected' / 'disconnected' when the state changed, else None."""
+        now = time.monotonic()
+        if not self._uevents() and now < self.next_check:
+            return None
+        self.next_check = now + HOTPLUG_RECHECK
+        connected = self._read()
+        if connected == self.connected:
+            return None
+        self.connected = connected
+        return 'connected' if connected else 'disconnected' if connected is False else None
+
+    def wait(self, timeout):
+        """Sleep until a uevent or timeout, then poll()."""
+        if self.sock is not None:
+            select.select([self.sock], [], [], timeout)
+        else:
+            time.sleep(timeout)
+        return self.poll()
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+def wait_for_output(monitor, settle=HOTPLUG_SETTLE):
+    """
+    Block until DISPLAY_NAME is connected, has stayed so for `settle` seconds and is enabled
+    in the compositor. Returns (Pygame display index, perf_counter() when it came up).
+    wlr-randr only runs once the connector is up (or if sysfs doesn't know it).
+    """
+    connected_at = time.perf_counter() if monitor.connected is not False else None
+    waiting = False
+    while True:
+        if connected_at is not None and time.perf_counter() - connected_at >= settle:
+            index = get_display_index(DISPLAY_NAME)
+            if index is not None:
+                print(f"Display {DISPLAY_NAME} found on index {index}.")
+                return index, connected_at
+        if not waiting:
+            print(f"Display: waiting for {DISPLAY_NAME}")
+            waiting = True
+        event = monitor.wait(HOTPLUG_RETRY if connected_at is not None else HOTPLUG_RECHECK)
+        if event == 'connected':
+            connected_at = time.perf_counter()
+        elif event == 'disconnected':
+            connected_at = None
+        elif connected_at is None and monitor.connected is None:
+            connected_at = time.perf_counter() - settle
+
+def init_display(headless=False, monitor=None):
+    """
+    Set the SDL environment (it is read by pygame.init(), not by the import) and start pygame.
+    Returns the fullscreen display index, or None when headless (no window, no wlr-randr).
+    """
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        pygame.init()
+        return None
+    # Use wayland backend and instruct SDL which display index should be used for fullscreen
+    display_index, _ = wait_for_output(monitor, settle=0.0)
+    os.environ.setdefault("SDL_VIDEODRIVER", "wayland")
+    os.environ["SDL_VIDEO_FULLSCREEN_DISPLAY"] = str(display_index)
+    os.environ["SDL_VIDEO_WINDOW_POS"] = "0,0"
+    pygame.init()
+    return display_index
 
-pygame.init()
+# -------------------------
+# Headless benchmark
+# -------------------------
+BENCH_EPOCH = 1767268800.0   # 2026-01-01 12:00 UTC: virtual clock start, so runs draw the same clock
+BENCH_SEED = 1
+
+def bench_feed(url, max_items=20, http=None):
+    """Fixed stand-in for fetch_feed(): long titles, so the text path is fully loaded."""
+    return [(BENCH_EPOCH - 60.0 * i, f"Headline {i}: " + "lorem ipsum dolor sit amet consectetur adipiscing elit " * 3,
+             f"bench://{i}") for i in range(max_items)]
+
+def bench_weather(http=None):
+    return "Warsaw: 11.0°C, Wind 9.0 km/h, Overcast", 'cloud'
+
+class VirtualClock:
+    """
+    Fixed-timestep stand-in for pygame.time.Clock: every tick() advances exactly one step
+    (the requested rate is ignored) and now() replaces time.time() in the loop.
+    """
+    def __init__(self, fps=FPS, start=BENCH_EPOCH):
+        self.step = 1.0 / fps
+        self.t = start
+
+    def now(self):
+        return self.t
+
+    def get_time(self):
+        return int(round(self.step * 1000.0))
+
+    def tick(self, framerate=0):
+        self.t += self.step
+        return self.get_time()
+
+class OffscreenPresenter:
+    """Headless stand-in for DamagePresenter: waits for the GPU so frame times include it."""
+    def __init__(self, ctx):
+        self.ctx = ctx
+
+    def present(self, rects):
+        self.ctx.finish()
+
+def bench_wallpaper(size=(1920, 1280)):
+    """Smooth gradient standing in for WALLPAPER on machines that don't have it."""
+    w, h = size
+    x = np.linspace(0.0, 1.0, w)[None, :, None]
+    y = np.linspace(0.0, 1.0, h)[:, None, None]
+    rgb = 40.0 + 60.0 * x * np.array([0.6, 0.5, 1.0]) + 50.0 * y * np.array([0.2, 1.0, 0.7])
+    from PIL import Image
+    return Image.fromarray(rgb.astype(np.uint8), "RGB")
+
+def bench_atlas(workers=None):
+    """
+    Cold SDF cost of the atlas at ATLAS_SIZES for growing charsets: the legacy fixed
+    1024x1024 EDT pair per size, one EDT over the whole packed atlas, per-tile in process
+    and per-tile over `workers` (default ATLAS_WORKERS) processes. Rasterising is left out.
+    """
+    from scipy.ndimage import distance_transform_edt as edt
+    workers = ATLAS_WORKERS if workers is None else workers
+    blank = np.zeros((1024, 1024), dtype=bool)
+    t0 = time.perf_counter()
+    for _ in ATLAS_SIZES:
+        edt(blank) - edt(~blank)
+    print(f"legacy: {len(ATLAS_SIZES)} x 1024x1024 {1000.0 * (time.perf_counter() - t0):7.1f} ms")
+    latin = "".join(map(chr, range(0xA0, 0x180)))
+    greek_cyrillic = "".join(map(chr, range(0x370, 0x500)))
+    for name, chars in (("ASCII", ATLAS_CHARS), ("+ Latin-1, Latin Ext-A", ATLAS_CHARS + latin),
+                        ("+ Greek, Cyrillic", ATLAS_CHARS + latin + greek_cyrillic)):
+        tiles, _, _ = atlas_tiles(ATLAS_SIZES, chars)
+        sizes, pos, (width, height) = pack_atlas(tiles)
+        binary = np.zeros((height, width), dtype=bool)
+        for (_, bitmap, pad), (x, y) in zip(tiles, pos):
+            binary[y + pad:y + pad + bitmap.shape[0], x + pad:x + pad + bitmap.shape[1]] = bitmap
+        pairs = [(bitmap, pad) for _, bitmap, pad in tiles]
+        t0 = time.perf_counter()
+        edt(binary) - edt(~binary)
+        t1 = time.perf_counter()
+        atlas_tile_sdfs(pairs, workers=1)
+        t2 = time.perf_counter()
+        atlas_tile_sdfs(pairs, workers=workers)
+        t3 = time.perf_counter()
+        print(f"{name:<24} {len(tiles):5d} tiles in {width}x{height}: whole atlas {1000.0 * (t1 - t0):7.1f} ms, "
+              f"per tile {1000.0 * (t2 - t1):7.1f} ms, {workers} processes {1000.0 * (t3 - t2):7.1f} ms")
+
+def percentiles_ms(samples):
+    p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+    return f"p50 {p50:.2f} ms, p95 {p95:.2f} ms, p99 {p99:.2f} ms"
 
 # -------------------------
 # Main program
 # -------------------------
-def main():
-    pygame.font.init()
-    pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MAJOR_VERSION, 3)
-    pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MINOR_VERSION, 0)
-    pygame.display.gl_set_attribute(pygame.GL_CONTEXT_PROFILE_MASK, pygame.GL_CONTEXT_PROFILE_CORE)
-    # pygame.display.set_mode((WIDTH, HEIGHT), DOUBLEBUF | OPENGL)
-    screen = pygame.display.set_mode((WIDTH, HEIGHT), DOUBLEBUF | OPENGL | FULLSCREEN, display=display_index)
-    ctx = moderngl.create_context(require=300)
+def main(headless=False, frames=0, warmup=10, shot=None, config=None, watch_output=False):
+    """
+    Run the display. headless renders into an offscreen framebuffer of a standalone context
+    (EGL, e.g. llvmpipe) with a fixed-step virtual clock and canned feeds, draws `frames`
+    frames and prints throughput and frame-time percentiles (the first `warmup` excluded).
+    config: TOML settings file, applied now and watched for changes. watch_output follows
+    DISPLAY_NAME's connector in headless mode too (always on with a window).
+    Feeds, fetchers and decoded assets live here for the whole run; the window and every
+    GL object belong to run_session(), which ends when the output is unplugged. The next
+    session starts once it is back, so a replug costs a re-upload, not a restart.
+    """
+    startup = StartupTimeline(STARTUP_MARKS)
+    startup.mark("module")
+    if config:
+        try:
+            apply_config(read_config(config), live=False)
+        except (OSError, ValueError) as e:
+            print(f"Config: {config}: {e}; using the defaults")
+    startup.mark("config")
+    # the atlas before any thread starts: SDL_ttf and the display are not thread-safe, so
+    # glyphs are rasterised here, and a cache miss can still fork its EDT workers
+    atlas = (ATLAS_SIZES, load_sdf_atlas(ATLAS_SIZES))
+    startup.mark("atlas")
+    # the first wallpaper loads while the display, fetchers and shaders start
+    loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="loader")
+    first_wallpaper = (WALLPAPER, loader.submit(read_wallpaper, WALLPAPER, headless), time.perf_counter())
+    monitor = OutputMonitor(DISPLAY_NAME, DRM_SYSFS) if watch_output or not headless else None
+    display_index = init_display(headless, monitor)
+    startup.mark("display")
+    if headless:
+        random.seed(BENCH_SEED)
+
+    settings = dict(inject_every=INJECT_EVERY, max_rss_per_fetch=MAX_RSS_PER_FETCH, speed=SCROLL_SPEED, feeds=FEED_URLS)
+    if headless:
+        scroller = SingleScroller(FEED_W, SCROLL_H, fetch_feed=bench_feed, fetch_weather=bench_weather, **settings)
+    else:
+        scroller = SingleScroller(FEED_W, SCROLL_H, snapshot=SNAPSHOT_FILE, **settings)
+    profiler = FrameProfiler(('scroller.update', 'tesseract.update', 'damage', 'wallpaper', 'particles',
+                              'draw_clock', 'scroller.render', 'tesseract.dim', 'tesseract.render', 'present'),
+                             window=PROFILE_WINDOW, enabled=PROFILE)
+    profiler.sections['fetch'] = scroller.fetcher.stats
+    profiler.sections['http_cache'] = scroller.fetcher.http.stats
+    profiler.sections['startup'] = startup.summary
+    startup.mark("scroller")
+    keep = {
+        'scroller': scroller,
+        'tesseract': Tesseract(TESS_SIZE, TESS_CHANGE_INTERVAL, TESS_ROT_SPEED),
+        'particles': ParticleField(PARTICLE_COUNT, seed=BENCH_SEED if headless else None),
+        'atlas': atlas,         # (ATLAS_SIZES, load_sdf_atlas())
+        'wallpaper': None,      # (path, read_wallpaper() pixels) on screen
+        'loader': loader,       # wallpaper files, off the render thread
+        'slides': {'index': 0, 'due': None, 'pending': first_wallpaper},   # pending: (path, future, perf_counter())
+        'profiler': profiler,
+        'watcher': ConfigWatcher(config) if config else None,
+        'clock': VirtualClock(FPS) if headless else pygame.time.Clock(),
+        'frame_times': [],
+        'replugged_at': None,   # perf_counter() of the connector coming back
+        'startup': startup,
+    }
+
+    while run_session(keep, headless, frames, warmup, shot, config, display_index, monitor) == 'unplugged':
+        if not headless:
+            pygame.display.quit()
+        display_index, keep['replugged_at'] = wait_for_output(monitor, HOTPLUG_SETTLE)
+        if not headless:
+            pygame.display.init()
+
+    # cleanup
+    scroller.save_snapshot()
+    scroller.stop()
+    keep['loader'].shutdown(wait=False, cancel_futures=True)
+    if monitor is not None:
+        monitor.close()
+    if keep['watcher'] is not None:
+        keep['watcher'].close()
+
+def run_session(keep, headless, frames, warmup, shot, config, display_index, monitor):
+    """
+    One window (or standalone context) and everything on the GPU, rebuilt from `keep`.
+    Returns 'quit', or 'unplugged' when the monitor reports the output gone.
+    """
+    session_t0 = time.perf_counter()
+    if headless:
+        try:
+            ctx = moderngl.create_standalone_context(require=330, backend='egl')
+        except Exception as e:
+            print(f"EGL standalone context failed ({e}), trying the default backend")
+            ctx = moderngl.create_standalone_context(require=330)
+        display_fbo = ctx.simple_framebuffer((WIDTH, HEIGHT))
+        display_fbo.use()
+        print(f"Headless: {ctx.info['GL_RENDERER']}, {frames} frames at a fixed {1000.0 / FPS:.1f} ms step")
+    else:
+        pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MAJOR_VERSION, 3)
+        pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MINOR_VERSION, 0)
+        pygame.display.gl_set_attribute(pygame.GL_CONTEXT_PROFILE_MASK, pygame.GL_CONTEXT_PROFILE_CORE)
+        # pygame.display.set_mode((WIDTH, HEIGHT), DOUBLEBUF | OPENGL)
+        screen = pygame.display.set_mode((WIDTH, HEIGHT), DOUBLEBUF | OPENGL | FULLSCREEN, display=display_index)
+        ctx = moderngl.create_context(require=300)
+        display_fbo = ctx.fbo
+    gl_objects = GLObjectCounter(ctx)
+    startup = keep['startup']
+    startup.mark("context")
 
     ctx.enable(moderngl.PROGRAM_POINT_SIZE)
     ctx.enable(moderngl.BLEND)
@@ -1025,14 +3592,8 @@ def main():
     except Exception:
         pass
 
-    # Load wallpaper (1600x900)
-    wall_img = Image.open("/home/adamh/bin/forest-3804001-1920.jpg").convert("RGB")
-    wall_img = wall_img.transpose(Image.FLIP_TOP_BOTTOM)  # flip vertically
-    tex_wall = ctx.texture(wall_img.size, 3, wall_img.tobytes())
-    tex_wall.build_mipmaps()
-    # Enable mipmapped filtering for nice downscaling
-    tex_wall.filter = (moderngl.LINEAR_MIPMAP_LINEAR, moderngl.LINEAR)
-    tex_wall.use(location=0)
+    # uniform writes go through state; mvp and the other per-frame constants live in one block
+    state = GLState(ctx)
 
     # MVP matrix mapping pixel coords to NDC
     mvp = np.array([
@@ -1042,41 +3603,44 @@ def main():
         [-1.0, 1.0, 0.0, 1.0]
     ], dtype='f4')
 
-    # Build two atlases: main (with icons) and tiny (glyphs only) for subdials
-    sdf_data_main, atlas_size_main, glyph_uvs_main, glyph_widths_main = build_sdf_atlas(FONT_SIZE)
-    sdf_data_tiny, atlas_size_tiny, glyph_uvs_tiny, glyph_widths_tiny = build_sdf_atlas(TINY_FONT_SIZE)
-
-    tex_main = ctx.texture((atlas_size_main,atlas_size_main),1,data=sdf_data_main.tobytes())
-    tex_main.filter=(moderngl.LINEAR,moderngl.LINEAR)
-    tex_tiny = ctx.texture((atlas_size_tiny,atlas_size_tiny),1,data=sdf_data_tiny.tobytes())
-    tex_tiny.filter=(moderngl.LINEAR,moderngl.LINEAR)
-
-    # compile programs
-    sdf_prog = ctx.program(vertex_shader=VERT_SDF, fragment_shader=FRAG_SDF)
-    sdf_prog['mvp'].value = tuple(mvp.flatten())
-
-    line_prog = ctx.program(vertex_shader=VERT_LINE, fragment_shader=FRAG_LINE)
-    line_prog['mvp'].value = tuple(mvp.flatten())
-
-    radial_prog = ctx.program(vertex_shader=VERT_RADIAL, fragment_shader=FRAG_RADIAL)
-    radial_prog['mvp'].value = tuple(mvp.flatten())
-
-    circle_prog = ctx.program(vertex_shader=VERT_CIRCLE, fragment_shader=FRAG_CIRCLE)
-    circle_prog['mvp'].value = tuple(mvp.flatten())
+    # One atlas: glyphs of every ATLAS_SIZES size (main, tiny for subdials), the icons, and
+    # cells for any other character a headline brings
+    def upload_atlas():
+        if keep['atlas'][0] != ATLAS_SIZES:
+            keep['atlas'] = (ATLAS_SIZES, load_sdf_atlas(ATLAS_SIZES))
+        return GlyphCache(ctx, keep['atlas'][1], ATLAS_SIZES)
 
-    simple_prog = ctx.program(vertex_shader=VERT_SIMPLE, fragment_shader=FRAG_SIMPLE)
-    # simple_prog['mvp'].value = tuple(mvp.flatten())
+    glyphs = upload_atlas()
+    startup.mark("atlas upload")
+    frame = FrameUniforms(ctx, state, mvp)
 
-    particle_prog = ctx.program(vertex_shader=VERT_PART, fragment_shader=FRAG_PART)
-    particle_prog['mvp'].value = tuple(mvp.flatten())
+    def program(vert, frag):
+        prog = ctx.program(vertex_shader=vert, fragment_shader=frag)
+        if prog.get('Frame', None) is not None:
+            prog['Frame'].binding = FRAME_BINDING
+        return prog
 
-    dim_prog = ctx.program(vertex_shader=VERT_DIM, fragment_shader=FRAG_DIM)
-    dim_prog['mvp'].value = tuple(mvp.flatten())
-
-    dim_prog_circ = ctx.program(vertex_shader=VERT_DIM_CIRC, fragment_shader=FRAG_DIM_CIRC)
-    dim_prog_circ['mvp'].value = tuple(mvp.flatten())
-
-    wall_prog = ctx.program(vertex_shader=VERT_WALL, fragment_shader=FRAG_WALL)
+    # compile programs
+    sdf_prog = program(VERT_SDF, FRAG_SDF)
+    sdf_prog['threshold'].value = 0.5
+    sdf_prog['edge'].value = 0.02
+
+    sdf_batch_prog = program(VERT_SDF_BATCH, FRAG_SDF_BATCH)
+    sdf_batch_prog['threshold'].value = 0.5
+    sdf_batch_prog['edge'].value = 0.02
+
+    radial_prog = program(VERT_RADIAL, FRAG_RADIAL)
+    circle_prog = program(VERT_CIRCLE, FRAG_CIRCLE)
+    vector_prog = program(VERT_VECTOR, FRAG_VECTOR)
+    particle_prog = program(VERT_PART, FRAG_PART)
+    tess_prog = program(VERT_TESS, FRAG_TESS)
+    dim_prog = program(VERT_DIM, FRAG_DIM)
+    dim_prog_circ = program(VERT_DIM_CIRC, FRAG_DIM_CIRC)
+    wall_prog = program(VERT_WALL, FRAG_WALL)
+    blit_prog = program(VERT_BLIT, FRAG_BLIT)
+    strip_prog = program(VERT_STRIP, FRAG_STRIP)
+    mask_prog = program(VERT_MASK, FRAG_MASK)
+    startup.mark("shaders")
 
     # Fullscreen quad VBO (two triangles forming [-1,-1] to [1,1])
     quad_vbo_wall = ctx.buffer(
@@ -1097,95 +3661,182 @@ def main():
     ], dtype='f4')
     quad_vbo = ctx.buffer(quad_data.tobytes())
     quad_vao = ctx.vertex_array(sdf_prog, quad_vbo, 'in_pos', 'in_uv')
+    text_batch = TextBatch(ctx, state, sdf_batch_prog, quad_vbo)
+
+    # retained layers: wallpaper (whole screen) and the static clock face incl. day ring
+    wall_layer = Layer(ctx, state, blit_prog, quad_vbo, (0, 0, WIDTH, HEIGHT))
+    clock_layer = Layer(ctx, state, blit_prog, quad_vbo, (0, 0, CLOCK_W + 20, CLOCK_W + 20))
+
+    wall_vao = ctx.vertex_array(wall_prog, [(quad_vbo_wall, "2f", "in_pos")])
+
+    # wallpaper: decoded and scaled on the loader thread; the picture on screen is kept for the next session
+    wallpaper = Wallpaper(ctx, state, wall_prog, wall_vao)
+    slides = keep['slides']
+
+    def request_wallpaper(path):
+        slides['pending'] = (path, keep['loader'].submit(read_wallpaper, path, headless),
+                             time.perf_counter())
+
+    def advance_wallpaper(now_t):
+        """Start the next slide when it is due, hand finished loads to the texture, stream it in."""
+        paths = [WALLPAPER, *WALLPAPER_SLIDESHOW]
+        if slides['pending'] is None and len(paths) > 1 and slides['due'] is not None and now_t >= slides['due']:
+            slides['index'] = (slides['index'] + 1) % len(paths)
+            request_wallpaper(paths[slides['index']])
+        if slides['pending'] is not None and slides['pending'][1].done():
+            path, future, t0 = slides['pending']
+            slides['pending'] = None
+            slides['due'] = now_t + WALLPAPER_INTERVAL
+            try:
+                pixels = future.result()
+            except (OSError, ValueError) as e:
+                print(f"Wallpaper: {path}: {e}; keeping the current one")
+            else:
+                keep['wallpaper'] = (path, pixels)
+                wallpaper.fade_to(pixels)
+                print(f"Wallpaper: {path} ready in {1000.0 * (time.perf_counter() - t0):.0f} ms, "
+                      f"{wallpaper.nbytes / 2**20:.1f} MB of texture")
+        wallpaper.update(now_t)
+
+    if keep['wallpaper'] is not None:
+        wallpaper.show(keep['wallpaper'][1])
+    elif slides['pending'] is None:
+        request_wallpaper(WALLPAPER)
+    if headless and slides['pending'] is not None:
+        slides['pending'][1].exception()    # the benchmark starts with its wallpaper in place
+
+    # persistent streams for per-frame geometry (damage mask, clock vectors), one quad VAO per program
+    line_stream = StreamBuffer(ctx, '2f', ('in_pos',), 2)
+    color_stream = StreamBuffer(ctx, '2f 4f', ('in_pos', 'in_color'), 6)
+    vectors = VectorBatch(vector_prog, color_stream)
+    quad_vaos = {}
+
+    # persistent frame: each loop redraws only the damaged regions into it, then blits it out
+    frame_fbo = ctx.framebuffer(color_attachments=[ctx.renderbuffer((WIDTH, HEIGHT))],
+                                depth_attachment=ctx.depth_renderbuffer((WIDTH, HEIGHT)))
+    damage = DamageTracker(ctx, frame_fbo, mask_prog, line_stream)
+
+    def quad_vao_for(prog):
+        vao = quad_vaos.get(prog)
+        if vao is None:
+            vao = ctx.vertex_array(prog, quad_vbo, 'in_pos')
+            quad_vaos[prog] = vao
+        return vao
 
     # helper arrays/buffers
-    particle_vbo = ctx.buffer(reserve=PARTICLE_COUNT * 8, dynamic=True)
-    particle_vao = ctx.vertex_array(particle_prog, particle_vbo, 'in_pos')
+    particles = keep['particles']
+    particles.upload(ctx, particle_prog)
 
     # scroller and tesseract
-    scroller = SingleScroller(FEED_W, SCROLL_H)
-    tesseract = Tesseract()
+    scroller = keep['scroller']
+    tesseract = keep['tesseract']
+    tesseract.upload(ctx, tess_prog)
+
+    def make_ticker():
+        # visual never holds more than the band's rows + the partial one + one spare below
+        return TickerStrip(ctx, state, strip_prog, quad_vbo, (CLOCK_W, 0, FEED_W, SCROLL_H), LINE_H,
+                           scroller.visible_rows + 3)
+
+    ticker = make_ticker()
 
     # helper functions (now we have glyph_uvs/glyph_widths)
     def text_pixel_width(text, font_h=FONT_SIZE):
         """Return pixel width for text when rendered at font_h by selecting the correct atlas."""
-        if font_h<=TINY_FONT_SIZE:
-            gw=glyph_widths_tiny
-            scale=float(font_h)/float(TINY_FONT_SIZE) if TINY_FONT_SIZE>0 else 1.0
-        else:
-            gw=glyph_widths_main
-            scale=float(font_h)/float(FONT_SIZE) if FONT_SIZE>0 else 1.0
+        return _text_pixel_width(text, font_h)
+
+    def atlas_font_size(font_h):
+        """The atlas size text of height font_h is scaled from: tiny up to TINY_FONT_SIZE, else main."""
+        return TINY_FONT_SIZE if font_h<=TINY_FONT_SIZE else FONT_SIZE
+
+    @lru_cache(maxsize=TEXT_RUN_CACHE_SIZE)
+    def _text_pixel_width(text, font_h):
+        size=atlas_font_size(font_h)
+        scale=float(font_h)/float(size) if size>0 else 1.0
         total=0
         for ch in text:
-            w=gw.get(ch,FONT_SIZE//2)
+            w=glyphs.widths.get((size,ch),FONT_SIZE//2)
             total+=max(1,int(round(w*scale)))
         return total
 
-    def render_sdf_text(text, px, py, font_h=FONT_SIZE, text_color=(1.0,1.0,1.0,1.0), glow_color=(1.0,0.85,0.35,0.14)):
-        """Render text using SDF atlas scaled to font_h. Chooses tiny atlas when font_h <= TINY_FONT_SIZE."""
-        cur_x=px
-        if font_h<=TINY_FONT_SIZE:
-            gu=glyph_uvs_tiny; gw=glyph_widths_tiny; tex_use=tex_tiny; scale=float(font_h)/float(TINY_FONT_SIZE) if TINY_FONT_SIZE>0 else 1.0
-        else:
-            gu=glyph_uvs_main; gw=glyph_widths_main; tex_use=tex_main; scale=float(font_h)/float(FONT_SIZE) if FONT_SIZE>0 else 1.0
-        tex_use.use(location=0)
+    def layout_sdf_text(text, font_h, text_color, glow_color):
+        """Lay text out at the origin. Returns (atlas texture, TextBatch rows)."""
+        cur_x=0
+        size=atlas_font_size(font_h)
+        scale=float(font_h)/float(size) if size>0 else 1.0
+        quads=[]
         for ch in text:
-            if ch not in gu:
-                cur_x+=gw.get(ch,font_h//2)
+            key=(size,ch)
+            uv=glyphs.lookup(key)
+            if uv is None:
+                cur_x+=glyphs.widths.get(key,font_h//2)
                 continue
-            u1,v1,u2,v2=gu[ch]
-            w_atlas=gw.get(ch,font_h//2)
+            w_atlas=glyphs.widths.get(key,font_h//2)
             w_scaled=max(1,int(round(w_atlas*scale)))
-            sdf_prog['position'].value=(cur_x,py)
-            sdf_prog['size'].value=(w_scaled,font_h)
-            sdf_prog['uv_offset'].value=(u1,v1)
-            sdf_prog['uv_size'].value=(u2-u1,v2-v1)
-            sdf_prog['text_color'].value=text_color
-            sdf_prog['glow_color'].value=glow_color
-            sdf_prog['threshold'].value=0.5
-            sdf_prog['edge'].value=0.02
-            sdf_prog['glow_size'].value=0.10
-            quad_vao.render(moderngl.TRIANGLE_STRIP)
+            quads.append((cur_x, 0.0, w_scaled, font_h, uv, text_color, glow_color, 0.10))
             cur_x+=w_scaled
+        return glyphs.texture, sdf_rows(quads)
+
+    # reused runs keep their glyphs' atlas cells from looking cold
+    text_runs = TextRunCache(ctx, state, sdf_batch_prog, quad_vbo, layout_sdf_text, TEXT_RUN_CACHE_SIZE,
+                             on_hit=lambda key: glyphs.touch(atlas_font_size(key[1]), key[0]))
+    scroller.on_row_evicted = text_runs.release_text
+
+    def emit_sdf_rows(tex_use, rows):
+        """Queue SDF quads on the text batch, or draw them right away on the legacy path."""
+        if TEXT_BATCHING:
+            text_batch.add(tex_use, rows)
+            return
+        state.texture(tex_use)
+        for x, y, w, h, u, v, du, dv, tr, tg, tb, ta, gr, gg, gb, ga, glow_size in rows.tolist():
+            state.uniform(sdf_prog, 'position', (x,y))
+            state.uniform(sdf_prog, 'size', (w,h))
+            state.uniform(sdf_prog, 'uv_offset', (u,v))
+            state.uniform(sdf_prog, 'uv_size', (du,dv))
+            state.uniform(sdf_prog, 'text_color', (tr,tg,tb,ta))
+            state.uniform(sdf_prog, 'glow_color', (gr,gg,gb,ga))
+            state.uniform(sdf_prog, 'glow_size', glow_size)
+            quad_vao.render(moderngl.TRIANGLE_STRIP)
+
+    def render_sdf_text(text, px, py, font_h=FONT_SIZE, text_color=(1.0,1.0,1.0,1.0), glow_color=(1.0,0.85,0.35,0.14)):
+        """Render text using SDF atlas scaled to font_h. Uses the tiny glyphs when font_h <= TINY_FONT_SIZE."""
+        if TEXT_RUN_CACHE:
+            text_runs.draw((text, font_h, text_color, glow_color), px, py)
+            return
+        tex_use, rows = layout_sdf_text(text, font_h, text_color, glow_color)
+        rows[:, 0] += px
+        rows[:, 1] += py
+        emit_sdf_rows(tex_use, rows)
+
+    def emit_icon(key, x, y, color):
+        """Queue one icon layer from the atlas, tinted with color."""
+        emit_sdf_rows(glyphs.texture, sdf_rows([(x, y, ICON_SIZE, ICON_SIZE, glyphs.uvs[key],
+                                           (color[0], color[1], color[2], 1.0),
+                                           (color[0], color[1], color[2], 0.35), 0.12)]))
 
     # -------------------------
     # Draw Subdial with ticks + label above pivot
     # -------------------------
-    def draw_subdial(ctx, line_prog, radial_prog, quad_vbo, text_pixel_width, render_sdf_text,
-                     center_x, center_y, radius, tz_label, tz_name, now_t):
-
-        try:
-            dt_utc = datetime.fromtimestamp(now_t, timezone.utc)
-            dt_tz = dt_utc.astimezone(ZoneInfo(tz_name))
-            hour = dt_tz.hour % 12 + dt_tz.minute / 60.0 + dt_tz.second / 3600.0
-            minute = dt_tz.minute + dt_tz.second / 60.0
-        except Exception as e:
-            print(e)
-            t = time.localtime(now_t)
-            hour = t.tm_hour % 12 + t.tm_min / 60.0
-            minute = t.tm_min + t.tm_sec / 60.0
+    def draw_subdial(ctx, radial_prog, quad_vbo, text_pixel_width, render_sdf_text,
+                     center_x, center_y, radius, tz_label):
+        """Subdial face, label and ticks (queued on vectors); the hands are drawn by draw_subdial_hands."""
 
         # solid, slightly larger circle
         border_width = 0.02
-        circle_prog['position'].value = (center_x - radius - border_width - 1, center_y - radius - border_width - 1)
-        circle_prog['size'].value = (2.0 * (radius + border_width) + 2, 2.0 * (radius + border_width) + 2)
-        circle_prog['center'].value = (center_x, center_y)
-        circle_prog['radius'].value = radius + 1
-        circle_prog['solid_color'].value = (0.5, 0.8, 1.0, 1.0) #(0.0, 0.0, 0.5, 1.0)
-        vao = ctx.vertex_array(circle_prog, quad_vbo, 'in_pos')
-        vao.render(moderngl.TRIANGLE_STRIP)
-        vao.release()
+        state.uniform(circle_prog, 'position', (center_x - radius - border_width - 1, center_y - radius - border_width - 1))
+        state.uniform(circle_prog, 'size', (2.0 * (radius + border_width) + 2, 2.0 * (radius + border_width) + 2))
+        state.uniform(circle_prog, 'center', (center_x, center_y))
+        state.uniform(circle_prog, 'radius', radius + 1)
+        state.uniform(circle_prog, 'solid_color', (0.5, 0.8, 1.0, 1.0)) #(0.0, 0.0, 0.5, 1.0)
+        quad_vao_for(circle_prog).render(moderngl.TRIANGLE_STRIP)
 
         # face
-        radial_prog['position'].value = (center_x - radius, center_y - radius)
-        radial_prog['size'].value = (2 * radius, 2 * radius)
-        radial_prog['center'].value = (center_x, center_y)
-        radial_prog['radius'].value = radius
-        radial_prog['color1'].value = (0.08, 0.08, 0.1, 1.0)
-        radial_prog['color2'].value = (0.15, 0.15, 0.2, 1.0)
-        vao = ctx.vertex_array(radial_prog, quad_vbo, 'in_pos')
-        vao.render(moderngl.TRIANGLE_STRIP)
-        vao.release()
+        state.uniform(radial_prog, 'position', (center_x - radius, center_y - radius))
+        state.uniform(radial_prog, 'size', (2 * radius, 2 * radius))
+        state.uniform(radial_prog, 'center', (center_x, center_y))
+        state.uniform(radial_prog, 'radius', radius)
+        state.uniform(radial_prog, 'color1', (0.08, 0.08, 0.1, 1.0))
+        state.uniform(radial_prog, 'color2', (0.15, 0.15, 0.2, 1.0))
+        quad_vao_for(radial_prog).render(moderngl.TRIANGLE_STRIP)
 
         # label ABOVE pivot
         lbl_w = text_pixel_width(tz_label, font_h=TINY_FONT_SIZE)
@@ -1201,75 +3852,68 @@ def main():
             x1, y1 = center_x + inner * math.cos(angle), center_y + inner * math.sin(angle)
             x2, y2 = center_x + outer * math.cos(angle), center_y + outer * math.sin(angle)
             tick_vertices.extend([x1, y1, x2, y2])
-        tick_vbo = ctx.buffer(np.array(tick_vertices, 'f4').tobytes())
-        tick_vao = ctx.vertex_array(line_prog, tick_vbo, 'in_pos')
-        line_prog['line_color'].value = (0.8, 0.8, 0.8, 1.0)
-        ctx.line_width = 1.0
-        tick_vao.render(moderngl.LINES)
-        tick_vao.release()
-        tick_vbo.release()
+        vectors.lines(tick_vertices, 1.0, (0.8, 0.8, 0.8, 1.0))
+
+    def draw_subdial_hands(center_x, center_y, radius, tz_name, now_t):
+        hour_deg, minute_deg, _ = world_clock.angles(tz_name, now_t)
 
         # hands (subdial) — keep as lines (unchanged)
-        hour_ang = math.radians(hour * 30 - 90)
-        min_ang = math.radians(minute * 6 - 90)
+        hour_ang = math.radians(hour_deg - 90)
+        min_ang = math.radians(minute_deg - 90)
         hx, hy = center_x + (radius * 0.55) * math.cos(hour_ang), center_y + (radius * 0.55) * math.sin(hour_ang)
         mx, my = center_x + (radius * 0.8) * math.cos(min_ang), center_y + (radius * 0.8) * math.sin(min_ang)
 
-        hv = np.array([center_x, center_y, hx, hy], 'f4')
-        hvbo = ctx.buffer(hv.tobytes())
-        hvao = ctx.vertex_array(line_prog, hvbo, 'in_pos')
-        line_prog['line_color'].value = (0.5, 0.8, 1.0, 1.0)
-        ctx.line_width = 3.0
-        hvao.render(moderngl.LINES)
-        hvao.release()
-        hvbo.release()
-
-        mv = np.array([center_x, center_y, mx, my], 'f4')
-        mvbo = ctx.buffer(mv.tobytes())
-        mvao = ctx.vertex_array(line_prog, mvbo, 'in_pos')
-        line_prog['line_color'].value = (0.5, 0.8, 1.0, 1.0)
-        ctx.line_width = 2.0
-        mvao.render(moderngl.LINES)
-        mvao.release()
-        mvbo.release()
+        vectors.line(center_x, center_y, hx, hy, 3.0, (0.5, 0.8, 1.0, 1.0))
+        vectors.line(center_x, center_y, mx, my, 2.0, (0.5, 0.8, 1.0, 1.0))
 
-    def draw_clock(now_t):
+    clock_state = {}
+    world_clock = WorldClock()
+
+    def clock_geometry():
         r =  CLOCK_W * 0.5
         cx = r + 10
         cy = r + 10
+        # --- Subdials (SUBDIAL_ZONES) ---
+        sub_r = int(r * 0.25)
+        subdials = []
+        for label, zone, angle in SUBDIAL_ZONES:
+            a = math.radians(angle)
+            subdials.append((cx + r * 0.5 * round(math.cos(a), 6), cy + r * 0.5 * round(math.sin(a), 6), label, zone))
+        return r, cx, cy, sub_r, subdials
+
+    def world_clock_rows():
+        """(x, y, label, zone) of the WORLD_CLOCK_ROWS that fit below the digital clock."""
+        r, cx, cy, _, _ = clock_geometry()
+        top = cy + r + 15 + 2 * SMALL_FONT_SIZE + 6 + 12
+        row_h = TINY_FONT_SIZE + 4
+        per_col = max(0, int((HEIGHT - 10 - top) // row_h))
+        col_w = (CLOCK_W - 20) // 2
+        rows = []
+        for i, (label, zone) in enumerate(WORLD_CLOCK_ROWS[:2 * per_col]):
+            rows.append((10 + (i // per_col) * col_w, top + (i % per_col) * row_h, label, zone))
+        return rows
+
+    def draw_clock_face(day_angle):
+        """Everything on the clock that only changes with day_angle; baked into clock_layer."""
+        r, cx, cy, sub_r, subdials = clock_geometry()
 
         # solid, slightly larger circle
         border_width = 0.05
-        circle_prog['position'].value = (cx - r - border_width - 4, cy - r - border_width - 4)
-        circle_prog['size'].value = (2.0 * (r + border_width) + 8, 2.0 * (r + border_width) + 8)
-        circle_prog['center'].value = (cx, cy)
-        circle_prog['radius'].value = r + 4
-        circle_prog['solid_color'].value = (0.0, 0.0, 0.5, 1.0)  # Dark blue color
-        vao = ctx.vertex_array(circle_prog, quad_vbo, 'in_pos')
-        vao.render(moderngl.TRIANGLE_STRIP)
-        vao.release()
+        state.uniform(circle_prog, 'position', (cx - r - border_width - 4, cy - r - border_width - 4))
+        state.uniform(circle_prog, 'size', (2.0 * (r + border_width) + 8, 2.0 * (r + border_width) + 8))
+        state.uniform(circle_prog, 'center', (cx, cy))
+        state.uniform(circle_prog, 'radius', r + 4)
+        state.uniform(circle_prog, 'solid_color', (0.0, 0.0, 0.5, 1.0))  # Dark blue color
+        quad_vao_for(circle_prog).render(moderngl.TRIANGLE_STRIP)
 
         # face gradient
-        radial_prog['position'].value = (cx - r, cy - r)
-        radial_prog['size'].value = (2 * r, 2 * r)
-        radial_prog['center'].value = (cx, cy)
-        radial_prog['radius'].value = r
-        radial_prog['color1'].value = (0.03, 0.03, 0.06, 1.0)
-        radial_prog['color2'].value = (0.05, 0.18, 0.16, 1.0)
-        vao = ctx.vertex_array(radial_prog, quad_vbo, 'in_pos')
-        vao.render(moderngl.TRIANGLE_STRIP)
-        vao.release()
-
-        # face radial
-        radial_prog['position'].value = (cx - r, cy - r)
-        radial_prog['size'].value = (2.0 * r, 2.0 * r)
-        radial_prog['center'].value = (cx, cy)
-        radial_prog['radius'].value = r
-        radial_prog['color1'].value = (0.03, 0.03, 0.06, 1.0)
-        radial_prog['color2'].value = (0.05, 0.18, 0.16, 1.0)
-        radial_vao = ctx.vertex_array(radial_prog, quad_vbo, 'in_pos')
-        radial_vao.render(moderngl.TRIANGLE_STRIP)
-        radial_vao.release()
+        state.uniform(radial_prog, 'position', (cx - r, cy - r))
+        state.uniform(radial_prog, 'size', (2 * r, 2 * r))
+        state.uniform(radial_prog, 'center', (cx, cy))
+        state.uniform(radial_prog, 'radius', r)
+        state.uniform(radial_prog, 'color1', (0.03, 0.03, 0.06, 1.0))
+        state.uniform(radial_prog, 'color2', (0.05, 0.18, 0.16, 1.0))
+        quad_vao_for(radial_prog).render(moderngl.TRIANGLE_STRIP)
 
         # Control Center text above pivot
         label1 = "Control"
@@ -1283,14 +3927,9 @@ def main():
         render_sdf_text(label1, tx + (box_w - w_l1)/2.0, ty, font_h=TINY_FONT_SIZE, text_color=text_color, glow_color=text_color)
         render_sdf_text(label2, tx + (box_w - w_l2)/2.0, ty + TINY_FONT_SIZE, font_h=TINY_FONT_SIZE, text_color=text_color, glow_color=text_color)
 
-        # --- Subdials (RI, NV, IND) ---
-        sub_r = int(r * 0.25)
-        draw_subdial(ctx, line_prog, radial_prog, quad_vbo, text_pixel_width, render_sdf_text,
-                     cx - r * 0.5, cy, sub_r, "RI", "America/New_York", now_t)
-        draw_subdial(ctx, line_prog, radial_prog, quad_vbo, text_pixel_width, render_sdf_text,
-                     cx + r * 0.5, cy, sub_r, "NV", "America/Los_Angeles", now_t)
-        draw_subdial(ctx, line_prog, radial_prog, quad_vbo, text_pixel_width, render_sdf_text,
-                     cx, cy + r * 0.5, sub_r, "IND", "Asia/Calcutta", now_t)
+        for sx, sy, tz_label, tz_name in subdials:
+            draw_subdial(ctx, radial_prog, quad_vbo, text_pixel_width, render_sdf_text,
+                         sx, sy, sub_r, tz_label)
 
         # ticks
         tick_vertices = []
@@ -1304,13 +3943,10 @@ def main():
             x2 = cx + outer * math.cos(rad_ang)
             y2 = cy + outer * math.sin(rad_ang)
             tick_vertices.extend([x1, y1, x2, y2])
-        tick_vbo = ctx.buffer(np.array(tick_vertices, 'f4').tobytes())
-        tick_vao = ctx.vertex_array(line_prog, tick_vbo, 'in_pos')
-        line_prog['line_color'].value = (0.85, 0.85, 0.85, 1.0)
-        ctx.line_width = 1.4
-        tick_vao.render(moderngl.LINES)
-        tick_vao.release()
-        tick_vbo.release()
+        vectors.lines(tick_vertices, 1.4, (0.85, 0.85, 0.85, 1.0))
+        # the hour labels overlap the long ticks and are drawn at once from cached runs:
+        # the ticks (and the subdials') go first, as they always have
+        vectors.flush()
 
         # hour labels: 12, 3, 6, 9
         hour_labels = [
@@ -1330,26 +3966,47 @@ def main():
             ty = label_cy - label_font_h / 2.0
             render_sdf_text(txt, tx, ty, font_h=label_font_h, text_color=(1.0,1.0,1.0,1.0), glow_color=(1.0,0.85,0.35,0.14))
 
-        # hands: compute angles
-        dt_utc = datetime.fromtimestamp(now_t, timezone.utc)
-        # main (Warsaw) local time - use ZoneInfo
-        try:
-            dt_local = dt_utc.astimezone(ZoneInfo("Europe/Warsaw"))
-            frac_sec = dt_local.second % 60
-            minute = dt_local.minute + frac_sec / 60.0
-            hour = (dt_local.hour % 12) + minute / 60.0
-            day_angle = int(dt_local.hour * 15)
-        except Exception as e:
-            print(e)
-            tstruct = time.localtime(now_t)
-            frac_sec = tstruct.tm_sec % 60
-            minute = tstruct.tm_min + frac_sec / 60.0
-            hour = (tstruct.tm_hour % 12) + minute / 60.0
-            day_angle = int(tstruct.tm_hour * 15)
+        # outer ring subtle highlight
+        ring_verts = []
+        for i in range(0, day_angle, 8):
+            a1 = math.radians(i - 90)
+            a2 = math.radians(i + 4 - 90)
+            r_out = r + 4
+            x1, y1 = cx + r_out * math.cos(a1), cy + r_out * math.sin(a1)
+            x2, y2 = cx + r_out * math.cos(a2), cy + r_out * math.sin(a2)
+            ring_verts += [x1, y1, x2, y2]
+        vectors.lines(ring_verts, 2.0, (0.5, 0.8, 1.0, 1.0))
 
-        hour_angle = hour * 30 - 90
-        minute_angle = minute * 6 - 90
-        second_angle = frac_sec * 6 - 90
+        ring_verts = []
+        for i in range(day_angle + 1, 360, 8):
+            a1 = math.radians(i - 90)
+            a2 = math.radians(i + 4 - 90)
+            r_out = r + 4
+            x1, y1 = cx + r_out * math.cos(a1), cy + r_out * math.sin(a1)
+            x2, y2 = cx + r_out * math.cos(a2), cy + r_out * math.sin(a2)
+            ring_verts += [x1, y1, x2, y2]
+        vectors.lines(ring_verts, 2.0, (0.12, 0.14, 0.18, 0.9))
+
+        # the ring lies outside the labels and faces, so it can go last
+        vectors.flush()
+        text_batch.flush()
+
+    def draw_clock(now_t):
+        r, cx, cy, sub_r, subdials = clock_geometry()
+
+        # hands: compute angles (main clock: CLOCK_ZONE)
+        hour_deg, minute_deg, second_deg = world_clock.angles(CLOCK_ZONE, now_t)
+        day_angle = int(world_clock.hms(CLOCK_ZONE, now_t)[0] * 15)
+
+        hour_angle = hour_deg - 90
+        minute_angle = minute_deg - 90
+        second_angle = second_deg - 90
+
+        clock_layer.ensure((day_angle, CLOCK_W, WIDTH, HEIGHT), lambda: draw_clock_face(day_angle))
+        clock_layer.composite()
+
+        for sx, sy, tz_label, tz_name in subdials:
+            draw_subdial_hands(sx, sy, sub_r, tz_name, now_t)
 
         # drawing functions for hands
         def draw_hand(angle_deg, length_ratio, thickness, color, shadow=False):
@@ -1363,25 +4020,12 @@ def main():
                 ox, oy = 1.6, 1.6
             else:
                 ox, oy = 0.0, 0.0
-            v = np.array([x_start+ox, y_start+oy, x_tip+ox, y_tip+oy], 'f4')
-            vbo = ctx.buffer(v.tobytes())
-            vao = ctx.vertex_array(line_prog, vbo, 'in_pos')
-            line_prog['line_color'].value = color
-            ctx.line_width = thickness
-            vao.render(moderngl.LINES)
-            vao.release()
-            vbo.release()
+            vectors.line(x_start+ox, y_start+oy, x_tip+ox, y_tip+oy, thickness, color)
 
         def draw_diamond(angle_deg, length_ratio, base_width, color, shadow=False):
             """
-            Draws a simple 3D-style diamond clock hand using two triangles
+            Queues a simple 3D-style diamond clock hand: two triangles plus an outline
             """
-            # ---- helper to convert pixel -> NDC ----
-            def to_ndc(px, py):
-                nx = (px / WIDTH) * 2.0 - 1.0
-                ny = 1.0 - (py / HEIGHT) * 2.0
-                return nx, ny
-
             # ---- basic geometry ----
             rad = math.radians(angle_deg)
             dx = math.cos(rad)
@@ -1394,7 +4038,6 @@ def main():
             back_y = cy - dy * back_offset
 
             # Compute mid_frac to place the shared edge at the pivot (center)
-            total_length = back_offset + r * length_ratio
             mid_frac = 0.1
 
             # waist (midpoint between back and tip)
@@ -1406,81 +4049,32 @@ def main():
             py_v = dx
 
             half_waist = base_width / 2.0
-            mid_left_x = mid_cx + px_v * half_waist
-            mid_left_y = mid_cy + py_v * half_waist
-            mid_right_x = mid_cx - px_v * half_waist
-            mid_right_y = mid_cy - py_v * half_waist
-
-            vertices = []
+            tip = (tip_x, tip_y)
+            back = (back_x, back_y)
+            mid_left = (mid_cx + px_v * half_waist, mid_cy + py_v * half_waist)
+            mid_right = (mid_cx - px_v * half_waist, mid_cy - py_v * half_waist)
 
             # ---- optional shadow ----
             if shadow:
                 sox, soy = 1.6, 1.6
                 s_col = (0.0, 0.0, 0.0, 0.35)
-                # tip triangle shadow
-                for px_, py_ in [(tip_x + sox, tip_y + soy), (mid_left_x + sox, mid_left_y + soy),
-                                 (mid_right_x + sox, mid_right_y + soy)]:
-                    nx, ny = to_ndc(px_, py_)
-                    vertices += [nx, ny, *s_col]
-                # back triangle shadow
-                for px_, py_ in [(back_x + sox, back_y + soy), (mid_right_x + sox, mid_right_y + soy),
-                                 (mid_left_x + sox, mid_left_y + soy)]:
-                    nx, ny = to_ndc(px_, py_)
-                    vertices += [nx, ny, *s_col]
+                s_tip, s_back = (tip_x + sox, tip_y + soy), (back_x + sox, back_y + soy)
+                s_left = (mid_left[0] + sox, mid_left[1] + soy)
+                s_right = (mid_right[0] + sox, mid_right[1] + soy)
+                vectors.triangle(s_tip, s_left, s_right, s_col)
+                vectors.triangle(s_back, s_right, s_left, s_col)
 
             # ---- fill: two triangles forming "<>" ----
             left_bias = 0.94
             right_bias = 1.02
+            left_col = (color[0] * left_bias, color[1] * left_bias, color[2] * left_bias, color[3])
+            right_col = (color[0] * right_bias, color[1] * right_bias, color[2] * right_bias, color[3])
+            vectors.triangle(tip, mid_left, mid_right, color, left_col, right_col)
+            vectors.triangle(back, mid_right, mid_left, color, right_col, left_col)
 
-            # tip triangle
-            tri_tip = [
-                (tip_x, tip_y, *color),
-                (mid_left_x, mid_left_y, color[0] * left_bias, color[1] * left_bias, color[2] * left_bias, color[3]),
-                (mid_right_x, mid_right_y, color[0] * right_bias, color[1] * right_bias, color[2] * right_bias, color[3])
-            ]
-            # back triangle
-            tri_back = [
-                (back_x, back_y, *color),
-                (mid_right_x, mid_right_y, color[0] * right_bias, color[1] * right_bias, color[2] * right_bias, color[3]),
-                (mid_left_x, mid_left_y, color[0] * left_bias, color[1] * left_bias, color[2] * left_bias, color[3])
-            ]
-
-            for ax, ay, r_, g_, b_, a_ in (tri_tip + tri_back):
-                nx, ny = to_ndc(ax, ay)
-                vertices += [nx, ny, r_, g_, b_, a_]
-
-            # ---- draw fill ----
-            vdata = np.array(vertices, dtype='f4')
-            vbo = ctx.buffer(vdata.tobytes())
-            vao = ctx.vertex_array(simple_prog, [(vbo, '2f 4f', 'in_pos', 'in_color')])
-            vao.render(moderngl.TRIANGLES)
-            vao.release()
-            vbo.release()
-
-            # ---- outline ----
-            line_color = (0.35, 0.35, 0.35, 1.0)
-            line_pts = [
-                # Diamond edges: tip -> mid_right -> back -> mid_left -> tip
-                (tip_x, tip_y), (mid_right_x, mid_right_y),  # Line 1: tip -> mid_right
-                (mid_right_x, mid_right_y), (back_x, back_y),  # Line 2: mid_right -> back
-                (back_x, back_y), (mid_left_x, mid_left_y),  # Line 3: back -> mid_left
-                (mid_left_x, mid_left_y), (tip_x, tip_y),  # Line 4: mid_left -> tip
-                # Central line: tip -> back
-                (tip_x, tip_y), (back_x, back_y)  # Line 5: central
-            ]
-
-            line_vertices = []
-            for px, py in line_pts:
-                nx, ny = to_ndc(px, py)
-                line_vertices += [nx, ny, *line_color]
-
-            lvdata = np.array(line_vertices, dtype='f4')
-            lvbo = ctx.buffer(lvdata.tobytes())
-            lvao = ctx.vertex_array(simple_prog, [(lvbo, '2f 4f', 'in_pos', 'in_color')])
-            ctx.line_width = 1.0
-            lvao.render(moderngl.LINES)
-            lvao.release()
-            lvbo.release()
+            # ---- outline: tip -> mid_right -> back -> mid_left -> tip, then the central line ----
+            vectors.lines((*tip, *mid_right, *mid_right, *back, *back, *mid_left, *mid_left, *tip, *tip, *back),
+                          1.0, (0.35, 0.35, 0.35, 1.0))
 
         # draw shadows (kept dark for contrast)
         main_hands_shade = (0.1, 0.1, 0.1, 0.8)
@@ -1495,59 +4089,12 @@ def main():
         draw_hand(second_angle, 0.92, 1.6, (1.0, 0.15, 0.15, 1.0))
 
         # gray pivot dot (overlay)
-        pivot_radius = 3.0
-        circle_prog['position'].value = (cx - pivot_radius - 1.0, cy - pivot_radius - 1.0)
-        circle_prog['size'].value = (2.0 * pivot_radius + 2.0, 2.0 * pivot_radius + 2.0)
-        circle_prog['center'].value = (cx, cy)
-        circle_prog['radius'].value = pivot_radius
-        circle_prog['solid_color'].value = (0.55, 0.55, 0.55, 1.0)  # gray dot
-        cvao = ctx.vertex_array(circle_prog, quad_vbo, 'in_pos')
-        cvao.render(moderngl.TRIANGLE_STRIP)
-        cvao.release()
-
-        # outer ring subtle highlight
-        ring_verts = []
-        for i in range(0, day_angle, 8):
-            a1 = math.radians(i - 90)
-            a2 = math.radians(i + 4 - 90)
-            r_out = r + 4
-            x1, y1 = cx + r_out * math.cos(a1), cy + r_out * math.sin(a1)
-            x2, y2 = cx + r_out * math.cos(a2), cy + r_out * math.sin(a2)
-            ring_verts += [x1, y1, x2, y2]
-        if len(ring_verts) > 0:
-            rvbo = ctx.buffer(np.array(ring_verts, 'f4').tobytes())
-            rvao = ctx.vertex_array(line_prog, rvbo, 'in_pos')
-            line_prog['line_color'].value = (0.5, 0.8, 1.0, 1.0)
-            ctx.line_width = 2.0
-            rvao.render(moderngl.LINES)
-            rvao.release()
-            rvbo.release()
-
-        ring_verts = []
-        for i in range(day_angle + 1, 360, 8):
-            a1 = math.radians(i - 90)
-            a2 = math.radians(i + 4 - 90)
-            r_out = r + 4
-            x1, y1 = cx + r_out * math.cos(a1), cy + r_out * math.sin(a1)
-            x2, y2 = cx + r_out * math.cos(a2), cy + r_out * math.sin(a2)
-            ring_verts += [x1, y1, x2, y2]
-        if len(ring_verts) > 0:
-            rvbo = ctx.buffer(np.array(ring_verts, 'f4').tobytes())
-            rvao = ctx.vertex_array(line_prog, rvbo, 'in_pos')
-            line_prog['line_color'].value = (0.12, 0.14, 0.18, 0.9)
-            ctx.line_width = 2.0
-            rvao.render(moderngl.LINES)
-            rvao.release()
-            rvbo.release()
+        vectors.circle(cx, cy, 3.0, (0.55, 0.55, 0.55, 1.0))
+        vectors.flush()
 
         # digital date/time below
-        try:
-            cal_text = dt_local.strftime("%a, %d-%m-%Y")
-            dig_text = dt_local.strftime("%H:%M:%S")
-        except Exception:
-            tstruct = time.localtime(now_t)
-            cal_text = time.strftime("%a, %d-%m-%Y", tstruct)
-            dig_text = time.strftime("%H:%M:%S", tstruct)
+        cal_text = world_clock.strftime("%a, %d-%m-%Y", CLOCK_ZONE, now_t)
+        dig_text = world_clock.strftime("%H:%M:%S", CLOCK_ZONE, now_t)
 
         w_cal = text_pixel_width(cal_text, font_h=SMALL_FONT_SIZE)
         w_dig = text_pixel_width(dig_text, font_h=SMALL_FONT_SIZE)
@@ -1557,66 +4104,329 @@ def main():
         text_color = (0.99, 0.99, 0.99, 1.0)  # Dark blue color  ## (0.92,0.92,0.92,1.0) (0.9,0.9,0.8,0.18) (1.0,1.0,1.0,1.0) (1.0,0.85,0.4,0.25)
         render_sdf_text(cal_text, tx + (box_w - w_cal)/2.0, ty, font_h=SMALL_FONT_SIZE, text_color=text_color, glow_color=text_color)
         render_sdf_text(dig_text, tx + (box_w - w_dig)/2.0, ty + SMALL_FONT_SIZE + 6, font_h=SMALL_FONT_SIZE, text_color=text_color, glow_color=text_color)
-
-    def draw_wallpaper():
-        tex_wall.use(location=0)
-        wall_vao = ctx.vertex_array(wall_prog, [(quad_vbo_wall, "2f", "in_pos")])
-        wall_vao.render(moderngl.TRIANGLE_STRIP)
-        wall_vao.release()
-
-    def draw_particles():
-        particle_coords = np.array([p.pos for p in particles], 'f4')
-        particle_vbo.write(particle_coords.tobytes())
-        for i,p in enumerate(particles):
-            particle_prog['size'].value = p.size
-            particle_prog['p_color'].value = p.color
-            particle_vao.render(moderngl.POINTS, vertices=1, first=i)
-
-    clock = pygame.time.Clock()
+        # the time string changes every second: hand the previous run's buffer straight back
+        if clock_state.get('dig_text') not in (None, dig_text):
+            text_runs.release_text(clock_state['dig_text'])
+        clock_state['dig_text'] = dig_text
+
+        # world clock rows; their text changes once a minute
+        row_color = (0.75, 0.85, 1.0, 1.0)
+        row_texts = []
+        for x, y, label, zone in world_rows:
+            text = label + " " + world_clock.strftime("%H:%M", zone, now_t)
+            render_sdf_text(text, x, y, font_h=TINY_FONT_SIZE, text_color=row_color, glow_color=row_color)
+            row_texts.append(text)
+        for text in set(clock_state.get('row_texts', ())) - set(row_texts):
+            text_runs.release_text(text)
+        clock_state['row_texts'] = row_texts
+
+    def draw_ticker_row(item):
+        scroller.render_row(item, 0.0, glyphs.uvs, glyphs.size[1], emit_icon, render_sdf_text)
+        text_batch.flush()
+
+    # damage sources: scroller band, tesseract box, clock column (changes once a second), particles
+    _, clock_cx, clock_cy, _, _ = clock_geometry()
+    world_rows = world_clock_rows()
+    if len(world_rows) < len(WORLD_CLOCK_ROWS):
+        print(f"World clock: {len(WORLD_CLOCK_ROWS) - len(world_rows)} of {len(WORLD_CLOCK_ROWS)} rows don't fit")
+    clock_rect = (0, 0, CLOCK_W + 20, HEIGHT if world_rows else clock_cy + clock_cx + 2 * SMALL_FONT_SIZE + 30)
+    scroll_rect = (CLOCK_W, 0, FEED_W, SCROLL_H if TICKER_STRIP else HEIGHT)
+    tess_pad = 6.0             # line width + shadow offset
+    particle_radius = 3.0
+    damage_state = {}
+
+    def track_damage(now_t, dt):
+        """Add this frame's damage; returns the fastest on-screen motion in pixels/s."""
+        speed = 0.0
+        advance_wallpaper(now_t)
+        if wallpaper.key != damage_state.get('wall'):
+            damage.add_full()
+        damage_state['wall'] = wallpaper.key
+
+        view = scroller.view()
+        if view != damage_state.get('scroll'):
+            damage.add(*scroll_rect)
+            if view[0] != 0.0:
+                speed = scroller.speed
+        damage_state['scroll'] = view
+
+        second = int(now_t)
+        if second != damage_state.get('second'):
+            damage.add(*clock_rect)
+        damage_state['second'] = second
+
+        pts = tesseract.screen_points()
+        prev = damage_state.get('tess')
+        if prev is None or not np.array_equal(pts, prev):
+            both = pts if prev is None else np.vstack((pts, prev))
+            lo = both.min(axis=0) - tess_pad
+            hi = both.max(axis=0) + tess_pad
+            damage.add(lo[0], lo[1], hi[0] - lo[0], hi[1] - lo[1])
+            if prev is not None:
+                speed = max(speed, float(np.abs(pts - prev).max()) / max(dt, 1e-3))
+        damage_state['tess'] = pts
+
+        if particles.t0 is not None and 2 * particles.count > DAMAGE_MAX_BOXES:
+            # a field spread over the whole screen: no per-particle work on the CPU
+            damage.add_full()
+            damage_state.pop('particles', None)
+            speed = max(speed, particles.max_speed)
+        elif particles.t0 is not None and particles.count:
+            pts = particles.positions(now_t - particles.t0)
+            damage.add_points(pts, particle_radius)
+            if 'particles' in damage_state:
+                damage.add_points(damage_state['particles'], particle_radius)
+            damage_state['particles'] = pts
+            speed = max(speed, particles.max_speed)
+        return speed
+
+    def reconfigure(changed):
+        """Rebuild only what the changed settings feed into; all other GL and fetch state stays."""
+        nonlocal glyphs
+        nonlocal particles, tesseract, ticker, world_rows, clock_rect, scroll_rect
+        todo = {part for key in changed for part in CONFIG_LIVE[key]}
+        if 'atlas' in todo:
+            old = glyphs
+            glyphs = upload_atlas()
+            old.release()
+            # laid-out runs and widths point into the old atlas
+            _text_pixel_width.cache_clear()
+            text_runs.clear()
+        if 'scroller' in todo:
+            scroller.speed = SCROLL_SPEED
+            scroller.inject_every = max(1, int(INJECT_EVERY))
+            scroller.max_rss_per_fetch = MAX_RSS_PER_FETCH
+            scroller.set_line_height(LINE_H)
+        if 'fetch' in todo or 'weather' in todo:
+            scroller.set_sources(FEED_URLS, restart={'weather'} if 'weather' in todo else ())
+        if 'dedup' in todo:
+            scroller.dedup.ttl = DEDUP_TTL
+            scroller.dedup.capacity = DEDUP_CAPACITY
+        if 'ticker' in todo:
+            scroller.icon_layers.clear()
+            if ticker.line_h != LINE_H:
+                ticker.release()
+                ticker = make_ticker()
+            ticker.invalidate()
+        if 'wallpaper' in todo:
+            slides['index'] = 0
+            request_wallpaper(WALLPAPER)
+        if 'particles' in todo:
+            field = ParticleField(PARTICLE_COUNT)
+            field.upload(ctx, particle_prog)
+            particles.release()
+            particles = keep['particles'] = field
+            damage_state.pop('particles', None)
+        if 'tesseract' in todo:
+            tess = Tesseract(TESS_SIZE, TESS_CHANGE_INTERVAL, TESS_ROT_SPEED)
+            tess.upload(ctx, tess_prog)
+            tesseract.release()
+            tesseract = keep['tesseract'] = tess
+        if 'clock' in todo or 'atlas' in todo:
+            clock_layer.invalidate()
+            world_rows = world_clock_rows()
+            clock_rect = (0, 0, CLOCK_W + 20, HEIGHT if world_rows else clock_cy + clock_cx + 2 * SMALL_FONT_SIZE + 30)
+        scroll_rect = (CLOCK_W, 0, FEED_W, SCROLL_H if TICKER_STRIP else HEIGHT)
+        damage.add_full()
+        print(f"Config: applied {', '.join(sorted(changed))}"
+              + (f"; rebuilt {', '.join(sorted(todo))}" if todo else ""))
+
+    def glyphs_changed(added, evicted):
+        """Re-lay out text that used evicted cells or went without the new glyphs; rebake rows and face."""
+        chars = {(size, c) for size, c in added + evicted}
+        text_runs.release_where(lambda key: any(c in key[0] and size == atlas_font_size(key[1])
+                                                for size, c in chars))
+        _text_pixel_width.cache_clear()
+        if added:
+            ticker.invalidate()
+            clock_layer.invalidate()
+            damage.add_full()
+
+    watcher = keep['watcher']
+
+    presenter = OffscreenPresenter(ctx) if headless else DamagePresenter()
+    profiler = keep['profiler']
+    profiler.attach(ctx)
+    profiler.sections['gl_state'] = state.stats
+    clock = keep['clock']
+    now = clock.now if headless else time.time
+    profile_t = now()
+    snapshot_t = now()
+    frame_times = keep['frame_times']
     running = True
+    outcome = 'quit'
+
+    # GL allocation accounting: frames that created GL objects since the last report
+    alloc_report_t = now()
+    alloc_frames = 0
+    alloc_objects = 0
+    frames_counted = 0
+    frames_presented = 0
+    pixels_drawn = 0
+
+    startup.mark("session")
 
     # main loop
     while running:
-        for event in pygame.event.get():
+        frame_t0 = time.perf_counter()
+        for event in ([] if headless else pygame.event.get()):
             if event.type == QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
                 running = False
+            elif event.type in (VIDEOEXPOSE, WINDOWEXPOSED):
+                damage.add_full()
+        if monitor is not None and monitor.poll() == 'disconnected':
+            print(f"Display: {DISPLAY_NAME} disconnected; rendering paused")
+            outcome = 'unplugged'
+            break
+
+        if watcher is not None and watcher.changed():
+            try:
+                changed = apply_config(read_config(config))
+            except (OSError, ValueError) as e:
+                print(f"Config: {config}: {e}; keeping the current settings")
+            else:
+                if changed:
+                    reconfigure(changed)
+
+        added, evicted = glyphs.update()
+        if added or evicted:
+            glyphs_changed(added, evicted)
 
-        now_t = time.time()
+        now_t = now()
         dt = clock.get_time() / 1000.0 if clock.get_time() > 0 else 1.0 / FPS
+        objects_before = gl_objects.created
+        profiler.begin_frame()
 
         # updates
-        update_particles(dt)
-        scroller.update(dt)
-        tesseract.update(dt)
-
-        # clear
-        ctx.clear(0.0, 0.0, 0.0, 1.0)
-
-        # Draw wallpaper background
-        draw_wallpaper()
-
-        # particles
-        draw_particles()
-
-        # clock
-        draw_clock(now_t)
-
-        # scroller rendering (visual-queue approach)
-        tex_main.use(location=0)
-        scroller.render(glyph_uvs_main, atlas_size_main, sdf_prog, quad_vao, render_sdf_text)
-
-        # Tesseract dim background
-        tesseract.dim(ctx, dim_prog_circ, quad_vbo)
-        # Render tesseract (shadow + coloring split)
-        tesseract.render(ctx, line_prog)
-
-        # present (swap buffers)
-        pygame.display.flip()
-        clock.tick(FPS)
-
-    # cleanup
-    scroller.stop()
+        with profiler.phase('scroller.update'):
+            scroller.update(dt)
+        with profiler.phase('tesseract.update'):
+            tesseract.update(dt)
+
+        # damage: what changed since the last presented frame, and how fast things move
+        with profiler.phase('damage'):
+            speed = track_damage(now_t, dt)
+            if not DAMAGE_TRACKING:
+                damage.add_full()
+
+        if damage.dirty:
+            # clear (whole frame) or mask the damaged regions
+            pixels_drawn += damage.begin()
+
+            # Draw wallpaper background (baked once, then a 1:1 copy per frame)
+            with profiler.phase('wallpaper'):
+                if wallpaper.fade_t0 is not None:
+                    wallpaper.draw()    # changes every frame of a crossfade: skip the bake
+                else:
+                    wall_layer.ensure(wallpaper.key, wallpaper.draw)
+                    wall_layer.composite()
+
+            # particles
+            with profiler.phase('particles'):
+                frame.set_time(particles.elapsed(now_t))
+                particles.draw()
+
+            # clock
+            with profiler.phase('draw_clock'):
+                draw_clock(now_t)
+
+            # scroller rendering (visual-queue approach); shares the batch with the date text
+            with profiler.phase('scroller.render'):
+                if TICKER_STRIP:
+                    text_batch.flush()
+                    ticker.sync(scroller.head, scroller.visual, draw_ticker_row)
+                    ticker.composite(scroller.base_offset())
+                else:
+                    scroller.render(glyphs.uvs, glyphs.size[1], emit_icon, render_sdf_text)
+                    text_batch.flush()
+
+            # Tesseract dim background
+            with profiler.phase('tesseract.dim'):
+                tesseract.dim(state, dim_prog_circ, quad_vao_for(dim_prog_circ))
+            # Render tesseract (shadow + coloring split)
+            with profiler.phase('tesseract.render'):
+                tesseract.render(state)
+
+            # present (swap buffers)
+            with profiler.phase('present'):
+                rects = damage.end()
+                ctx.copy_framebuffer(display_fbo, frame_fbo)
+                display_fbo.use()
+                presenter.present(rects)
+            frames_presented += 1
+            state.end_frame()
+            if keep['replugged_at'] is not None:
+                t = time.perf_counter()
+                print(f"Display: {DISPLAY_NAME} back; first frame {1000.0 * (t - keep['replugged_at']):.0f} ms "
+                      f"after it was plugged in, {1000.0 * (t - session_t0):.0f} ms of that rebuilding the GL state")
+                keep['replugged_at'] = None
+            if startup.done("first frame"):
+                restored = (f"{scroller.restored[1]} rows from a snapshot {scroller.restored[0] / 60.0:.0f} min old"
+                            if scroller.restored else "no snapshot restored")
+                print(f"Startup: first frame {startup.report()}; {restored}")
+        profiler.end_frame()
+        clock.tick(frame_rate(speed) if DAMAGE_TRACKING else FPS)
+        if headless:
+            frame_times.append(time.perf_counter() - frame_t0)
+            running = len(frame_times) < frames
+
+        created = gl_objects.created - objects_before
+        frames_counted += 1
+        if created:
+            alloc_frames += 1
+            alloc_objects += created
+        if now_t - alloc_report_t >= GL_ALLOC_REPORT_INTERVAL:
+            print(f"GL objects: {alloc_objects} created in {alloc_frames}/{frames_counted} frames "
+                  f"over the last {now_t - alloc_report_t:.0f} s")
+            print(f"Frames: {frames_presented}/{frames_counted} presented, "
+                  f"{100.0 * pixels_drawn / max(1, frames_presented * WIDTH * HEIGHT):.0f}% of pixels redrawn")
+            print(state.take())
+            alloc_report_t = now_t
+            alloc_frames = alloc_objects = frames_counted = frames_presented = pixels_drawn = 0
+        if now_t - profile_t >= PROFILE_INTERVAL:
+            profiler.dump()
+            profile_t = now_t
+        if now_t - snapshot_t >= SNAPSHOT_INTERVAL:
+            scroller.save_snapshot()
+            snapshot_t = now_t
+
+    profiler.dump()
+    if outcome == 'unplugged':
+        if headless:
+            ctx.release()
+        return outcome
+
+    if headless:
+        timed = np.array(frame_times[warmup:] or frame_times) * 1000.0
+        print(f"Rendered {len(frame_times)} frames; after {min(warmup, len(frame_times) - len(timed))} warm-up: "
+              f"{1000.0 / timed.mean():.1f} frames/s, {percentiles_ms(timed)}")
+        summary = profiler.summary()
+        for name, phase in summary["phases"].items():
+            cpu, gpu = phase["cpu_ms"], phase["gpu_ms"]
+            print(f"  {name:<17} cpu p50 {cpu['p50'] if cpu else '-':>7} p95 {cpu['p95'] if cpu else '-':>7}"
+                  f"   gpu p50 {gpu['p50'] if gpu else '-':>7} p95 {gpu['p95'] if gpu else '-':>7}")
+        print(state.take())
+        if shot:
+            from PIL import Image
+            img = Image.frombytes("RGB", (WIDTH, HEIGHT), display_fbo.read(components=3))
+            img.transpose(Image.FLIP_TOP_BOTTOM).save(shot)
+    return outcome
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Clock, news and weather display for the HDMI OLED panel.")
+    parser.add_argument("--headless", action="store_true",
+                        help="benchmark: render offscreen (EGL/llvmpipe) with a virtual clock and canned feeds")
+    parser.add_argument("--frames", type=int, default=600, help="frames to render in --headless mode")
+    parser.add_argument("--warmup", type=int, default=10, help="leading frames left out of the statistics")
+    parser.add_argument("--shot", metavar="PNG", help="save the last headless frame")
+    parser.add_argument("--bench", action="store_true", help="time atlas SDF generation for growing charsets and exit")
+    parser.add_argument("--config", metavar="TOML", help=f"settings file (default {CONFIG_FILE}; none with --headless)")
+    parser.add_argument("--watch-output", action="store_true",
+                        help="--headless: pause while DISPLAY_NAME is unplugged, as the windowed mode does")
+    args = parser.parse_args()
+    if args.bench:
+        bench_atlas()
+        raise SystemExit
+    main(headless=args.headless, frames=args.frames, warmup=args.warmup, shot=args.shot,
+         config=args.config or (None if args.headless else CONFIG_FILE), watch_output=args.watch_output)
     
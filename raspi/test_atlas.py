@@ -0,0 +1,36 @@
+"""atlas_tile_sdfs(): the same tiles from the process pool as in process."""
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("scipy")
+
+
+@pytest.fixture
+def tiles():
+    rng = np.random.default_rng(1)
+    return [(rng.random((h, w)) > 0.5, 8) for h, w in rng.integers(4, 24, (16, 2))]
+
+
+def test_pool_matches_in_process(oled, tiles):
+    if threading.active_count() > 1:
+        pytest.skip("other threads running: the pool is never forked")
+    pooled = oled.atlas_tile_sdfs(tiles, workers=2)
+    for sdf, expected in zip(pooled, oled.atlas_tile_sdfs(tiles, workers=1), strict=True):
+        assert np.array_equal(sdf, expected)
+
+
+def test_no_fork_with_threads_running(oled, tiles, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("forked from a multithreaded process")
+    monkeypatch.setattr(oled, "ProcessPoolExecutor", no_pool)
+    done = threading.Event()
+    thread = threading.Thread(target=done.wait)
+    thread.start()
+    try:
+        sdfs = oled.atlas_tile_sdfs(tiles, workers=2)
+    finally:
+        done.set()
+        thread.join()
+    assert [sdf.shape for sdf in sdfs] == [(b.shape[0] + 2 * pad, b.shape[1] + 2 * pad) for b, pad in tiles]
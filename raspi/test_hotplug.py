@@ -0,0 +1,125 @@
+"""OutputMonitor and wait_for_output() against a fake sysfs tree and a stub wlr-randr."""
+import errno
+import os
+import threading
+import time
+
+import pytest
+
+
+class Connector:
+    """<root>/sys/card1-<name>/status, written as the kernel would."""
+    def __init__(self, root, name):
+        self.sysfs = os.path.join(root, "sys")
+        self.status = os.path.join(self.sysfs, f"card1-{name}", "status")
+        os.makedirs(os.path.dirname(self.status))
+
+    def plug(self, state):
+        with open(self.status, "w") as f:
+            f.write(state + "\n")
+
+
+class Socket:
+    """Stand-in for the uevent socket: recv() returns or raises the scripted items in turn."""
+    def __init__(self, *script):
+        self.script = list(script)
+        self.closed = False
+
+    def recv(self, size):
+        item = self.script.pop(0)
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def name(oled):
+    return oled.DISPLAY_NAME
+
+
+@pytest.fixture
+def connector(tmp_path, name):
+    connector = Connector(str(tmp_path), name)
+    connector.plug("disconnected")
+    return connector
+
+
+@pytest.fixture
+def wlr_randr(tmp_path, name, monkeypatch):
+    """A wlr-randr first on PATH listing `name` as the second enabled output."""
+    stub = tmp_path / "bin" / "wlr-randr"
+    stub.parent.mkdir()
+    stub.write_text(f"#!/bin/sh\nprintf 'DSI-1 \"Panel\"\\n  Enabled: yes\\n{name} \"OLED\"\\n  Enabled: yes\\n'\n")
+    stub.chmod(0o755)
+    monkeypatch.setenv("PATH", str(stub.parent) + os.pathsep + os.environ.get("PATH", ""))
+    return stub
+
+
+@pytest.fixture
+def monitor(oled, connector, name, monkeypatch):
+    # no uevents for writes to a fake tree: re-read it often
+    monkeypatch.setattr(oled, "HOTPLUG_RECHECK", 0.1)
+    monitor = oled.OutputMonitor(name, connector.sysfs)
+    yield monitor
+    monitor.close()
+
+
+def test_unplugged_connector_read_as_disconnected(monitor):
+    assert monitor.connected is False
+
+
+def test_unknown_connector(oled, tmp_path):
+    monitor = oled.OutputMonitor("HDMI-A-9", str(tmp_path))
+    assert monitor.connected is None
+    monitor.close()
+
+
+def test_replug_waits_out_the_settle_time(oled, monitor, connector, wlr_randr):
+    plugged = {}
+
+    def replug():
+        time.sleep(0.3)
+        plugged["t"] = time.perf_counter()
+        connector.plug("connected")
+    threading.Thread(target=replug, daemon=True).start()
+    index, connected_at = oled.wait_for_output(monitor, settle=0.2)
+    assert index == 1
+    assert time.perf_counter() - plugged["t"] >= 0.2
+    assert connected_at >= plugged["t"]
+
+
+def test_unplug_reported(monitor, connector):
+    connector.plug("connected")
+    monitor.next_check = 0.0
+    assert monitor.poll() == 'connected'
+    connector.plug("disconnected")
+    monitor.next_check = 0.0
+    assert monitor.poll() == 'disconnected'
+    assert monitor.poll() is None
+
+
+def test_no_wlr_randr_means_display_0(oled, name, tmp_path, monkeypatch):
+    monkeypatch.setenv("PATH", str(tmp_path))
+    assert oled.get_display_index(name) == 0
+
+
+def test_uevent_overflow_rereads_the_status(monitor, connector):
+    monitor.close()
+    monitor.sock = Socket(OSError(errno.ENOBUFS, "No buffer space available"), BlockingIOError())
+    monitor.next_check = float("inf")
+    connector.plug("connected")
+    assert monitor.poll() == 'connected'
+    assert monitor.sock is not None
+
+
+def test_uevent_socket_error_falls_back_to_rechecks(monitor, connector):
+    monitor.close()
+    sock = monitor.sock = Socket(OSError(errno.EBADF, "Bad file descriptor"))
+    monitor.next_check = float("inf")
+    connector.plug("connected")
+    assert monitor.poll() == 'connected'
+    assert monitor.sock is None and sock.closed
+    assert monitor.poll() is None
@@ -0,0 +1,124 @@
+"""HttpCache against a local http.server standing in for the feed and weather hosts."""
+import email.utils
+import http.server
+import threading
+from collections import Counter
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+# path -> Cache-Control sent with it (no entry: no cache headers at all)
+CACHE_CONTROL = {"etag": "no-cache", "lm": "no-cache", "maxage": "max-age=60",
+                 "nostore": "no-store", "nocache": "no-cache", "maxage0": "max-age=0"}
+
+
+class Server:
+    def __init__(self):
+        self.version = Counter()     # path -> bumps since the start (body "<path> v<n+1>")
+        self.served = Counter()      # (path, status) -> count
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.strip("/")
+                version = server.version[path] + 1
+                headers = {}
+                if path in CACHE_CONTROL:
+                    headers["Cache-Control"] = CACHE_CONTROL[path]
+                not_modified = False
+                if path == "etag":
+                    headers["ETag"] = f'"v{version}"'
+                    not_modified = self.headers.get("If-None-Match") == headers["ETag"]
+                elif path == "lm":
+                    headers["Last-Modified"] = email.utils.formatdate(1767268800.0 + version, usegmt=True)
+                    not_modified = self.headers.get("If-Modified-Since") == headers["Last-Modified"]
+                status = 304 if not_modified else 200
+                server.served[path, status] += 1
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                if not_modified:
+                    self.end_headers()
+                    return
+                body = f"{path} v{version}".encode()
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def server():
+    server = Server()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+@pytest.fixture
+def session():
+    with requests.Session() as session:
+        yield session
+
+
+@pytest.fixture
+def cache(oled, session, tmp_path):
+    return oled.HttpCache(session, str(tmp_path))
+
+
+@pytest.mark.parametrize("path", ["etag", "lm"])
+def test_revalidated_with_304(cache, server, path):
+    first = cache.get(server.base + path, bytes.decode)
+    again = cache.get(server.base + path, bytes.decode)
+    assert first == again == f"{path} v1"
+    assert server.served[path, 200] == 1 and server.served[path, 304] == 1
+    assert cache.stats()["not_modified"] == 1
+
+
+def test_revalidated_from_disk_after_restart(oled, cache, server, session, tmp_path):
+    cache.get(server.base + "etag", bytes.decode)
+    restarted = oled.HttpCache(session, str(tmp_path))
+    assert restarted.get(server.base + "etag", bytes.decode) == "etag v1"
+    assert server.served["etag", 304] == 1 and restarted.stats()["not_modified"] == 1
+
+
+@pytest.mark.parametrize("path", ["etag", "lm"])
+def test_changed_resource_downloaded(cache, server, path):
+    cache.get(server.base + path, bytes.decode)
+    server.version[path] += 1
+    assert cache.get(server.base + path, bytes.decode) == f"{path} v2"
+    assert server.served[path, 200] == 2
+
+
+def test_max_age_served_without_request(cache, server):
+    cache.get(server.base + "maxage", bytes.decode)
+    assert cache.get(server.base + "maxage", bytes.decode) == "maxage v1"
+    assert server.served["maxage", 200] == 1 and cache.stats()["fresh"] == 1
+
+
+def test_no_store_kept_nowhere(oled, cache, server, session, tmp_path):
+    cache.get(server.base + "nostore", bytes.decode)
+    server.version["nostore"] += 1
+    assert cache.get(server.base + "nostore", bytes.decode) == "nostore v2"
+    assert server.served["nostore", 200] == 2
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("path", ["nocache", "maxage0"])
+def test_ttl_hint_does_not_override_cache_control(cache, server, path):
+    for _ in range(2):
+        cache.get(server.base + path, bytes.decode, ttl=lambda value: 3600.0)
+    assert server.served[path, 200] == 2
+
+
+def test_ttl_hint_applies_without_cache_headers(cache, server):
+    for _ in range(2):
+        cache.get(server.base + "plain", bytes.decode, ttl=lambda value: 3600.0)
+    assert server.served["plain", 200] == 1
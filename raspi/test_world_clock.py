@@ -0,0 +1,53 @@
+"""WorldClock's cached zone offsets against datetime.astimezone."""
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+ZONES = ["Europe/Warsaw", "America/New_York", "America/Los_Angeles", "Asia/Calcutta",
+         "Australia/Lord_Howe", "Asia/Kathmandu", "America/Sao_Paulo", "UTC"]
+START = 1767268800.0    # 2026-01-01 12:00 UTC
+
+
+def expected_hms(zone, t):
+    dt = datetime.fromtimestamp(t, timezone.utc).astimezone(ZoneInfo(zone))
+    return dt.hour, dt.minute, dt.second
+
+
+@pytest.mark.parametrize("zone", ZONES)
+def test_matches_astimezone_over_a_year(oled, zone):
+    clock = oled.WorldClock()
+    # in time order, as frames come: every 30 min 7 s (odd, so it drifts through the minutes)
+    for t in range(int(START), int(START) + 366 * 86400, 1807):
+        assert clock.hms(zone, t + 0.25) == expected_hms(zone, t + 0.25), t
+    # one resolve per transition (Lord Howe, New York, ... have two a year), not per frame
+    assert clock.resolves <= 3
+
+
+@pytest.mark.parametrize("zone, utc, before, after", [
+    ("America/New_York", datetime(2026, 3, 8, 7, tzinfo=timezone.utc), (1, 59, 59), (3, 0, 0)),
+    ("Europe/Warsaw", datetime(2026, 10, 25, 1, tzinfo=timezone.utc), (2, 59, 59), (2, 0, 0)),
+    ("Australia/Lord_Howe", datetime(2026, 4, 4, 15, tzinfo=timezone.utc), (1, 59, 59), (1, 30, 0)),
+])
+def test_switches_on_the_transition_second(oled, zone, utc, before, after):
+    clock = oled.WorldClock()
+    t = utc.timestamp()
+    clock.hms(zone, t - 3600.0)
+    assert clock.hms(zone, t - 0.5) == before
+    assert clock.hms(zone, t) == after
+    assert clock.resolves == 2
+
+
+def test_angles(oled):
+    clock = oled.WorldClock()
+    # 2026-01-01 12:00 UTC is 13:00 in Warsaw: hour hand on 1, the others on 12
+    assert clock.angles("Europe/Warsaw", START) == (30.0, 0.0, 0.0)
+    h, m, s = clock.angles("UTC", START + 3 * 3600 + 15 * 60 + 30)
+    assert (h, m, s) == (3.0 * 30.0 + 15.5 * 0.5, 15.5 * 6.0, 180.0)
+
+
+def test_unknown_zone_uses_local_time(oled, capsys):
+    clock = oled.WorldClock()
+    assert clock.offset("Nowhere/Atlantis", START) == oled.time.localtime(START).tm_gmtoff
+    clock.offset("Nowhere/Atlantis", START + 7200.0)
+    assert capsys.readouterr().out.count("World clock:") == 1